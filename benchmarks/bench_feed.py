@@ -0,0 +1,109 @@
+"""
+Host benchmark comparing NmeaParser.update() (one character at a time) against NmeaParser.feed() (whole chunks).
+Both call the same sentence functions, so the last comparison replaces them with a stub to show framing, CRC checks
+and statistics on their own.
+Run from the repository root: python3 benchmarks/bench_feed.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mgps.nmea_parser import NmeaParser
+
+SENTENCES = (
+    'GPRMC,081836.000,A,3751.6500,S,14507.3600,E,000.0,360.0,130998,011.3,E',
+    'GPGGA,081836.000,3751.6500,S,14507.3600,E,1,08,0.9,545.4,M,46.9,M,,',
+    'GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1',
+    'GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,00,13,06,292,00',
+    'GPGSV,3,2,11,14,25,170,00,16,57,208,39,18,67,296,40,19,40,246,00',
+    'GPGSV,3,3,11,22,42,067,42,24,14,311,43,27,05,244,00',
+    'GPVTG,360.0,T,348.7,M,000.0,N,000.0,K',
+    'GPGLL,3751.6500,S,14507.3600,E,081836.000,A',
+)
+
+CHUNK_SIZE = 255
+
+
+def framed(body):
+    crc_xor = 0
+    for char in body:
+        crc_xor ^= ord(char)
+    return '$%s*%02X\r\n' % (body, crc_xor)
+
+
+def stream(repeat):
+    return ''.join(framed(body) for body in SENTENCES) * repeat
+
+
+def receiver_reads(repeat, idle_reads=1):
+    """Chunks as GPS.get_raw_bytes() returns them: one epoch of sentences per second read in CHUNK_SIZE blocks,
+    with the XA1110 padding the last block of the epoch and any idle polls with 0x0A"""
+    epoch = ''.join(framed(body) for body in SENTENCES).encode()
+    reads = []
+    for position in range(0, len(epoch), CHUNK_SIZE):
+        block = epoch[position:position + CHUNK_SIZE]
+        reads.append(block + b'\n' * (CHUNK_SIZE - len(block)))
+    reads.extend([b'\n' * CHUNK_SIZE] * idle_reads)
+    return reads * repeat
+
+
+def stub(parser):
+    return True
+
+
+def new_parser(stubbed):
+    parser = NmeaParser()
+    if stubbed:
+        parser.supported_sentences = dict((sentence_type, stub) for sentence_type in parser.supported_sentences)
+    return parser
+
+
+def bench_update(chunks, stubbed=False):
+    parser = new_parser(stubbed)
+    start = time.perf_counter()
+    for chunk in chunks:
+        for character in chunk.decode():
+            parser.update(character)
+    return time.perf_counter() - start, parser
+
+
+def bench_feed(chunks, stubbed=False):
+    parser = new_parser(stubbed)
+    start = time.perf_counter()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return time.perf_counter() - start, parser
+
+
+def snapshot(parser):
+    return (parser.clean_sentences, parser.parsed_sentences, parser.crc_fails, parser.timestamp, parser.date,
+            parser._latitude, parser._longitude, parser.speed, parser.course, parser.altitude, parser.hdop,
+            parser.pdop, parser.vdop, parser.satellites_used, parser.satellite_data)
+
+
+def compare(title, chunks, sentences, stubbed=False):
+    update_time, update_parser = bench_update(chunks, stubbed)
+    feed_time, feed_parser = bench_feed(chunks, stubbed)
+
+    print(title)
+    print('  update(): %10.0f sentences/s' % (sentences / update_time))
+    print('  feed():   %10.0f sentences/s' % (sentences / feed_time))
+    print('  speedup:  %10.1fx' % (update_time / feed_time))
+    print('  identical results:', snapshot(update_parser) == snapshot(feed_parser))
+
+
+def main(repeat=2000):
+    sentences = len(SENTENCES) * repeat
+
+    data = stream(repeat).encode()
+    compare('back to back sentences', [data[position:position + CHUNK_SIZE]
+                                       for position in range(0, len(data), CHUNK_SIZE)], sentences)
+    compare('receiver reads with idle padding', receiver_reads(repeat), sentences)
+    compare('receiver reads, sentence functions stubbed', receiver_reads(repeat), sentences, True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark of framing.crc_xor() and framing.find_start() in bytes/second, the pure Python versions against the ones
+in use (viper on MicroPython, crc_xor_folded() on CPython), and a check that both return the same results.
+find_start() is run over memoryviews of the chunks, as fixed buffer mode gets them from a pipeline or readinto()
+Run from the repository root: python3 benchmarks/bench_framing.py
+or on the MicroPython unix port: micropython benchmarks/bench_framing.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+
+from mgps.framing import ACCELERATED, crc_xor, crc_xor_python, find_start, find_start_python
+
+try:
+    import utime
+
+    def elapsed_s(start):
+        return utime.ticks_diff(utime.ticks_us(), start) / 1000000
+
+    def now():
+        return utime.ticks_us()
+except ImportError:
+    import time
+
+    def elapsed_s(start):
+        return time.perf_counter() - start
+
+    def now():
+        return time.perf_counter()
+
+SENTENCES = (
+    'GPRMC,081836.000,A,3751.6500,S,14507.3600,E,000.0,360.0,130998,011.3,E',
+    'GPGGA,081836.000,3751.6500,S,14507.3600,E,1,08,0.9,545.4,M,46.9,M,,',
+    'GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1',
+    'GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,00,13,06,292,00',
+    'GPGSV,3,2,11,14,25,170,00,16,57,208,39,18,67,296,40,19,40,246,00',
+    'GPGSV,3,3,11,22,42,067,42,24,14,311,43,27,05,244,00',
+    'GPVTG,360.0,T,348.7,M,000.0,N,000.0,K',
+    'GPGLL,3751.6500,S,14507.3600,E,081836.000,A',
+)
+
+CHUNK_SIZE = 255
+
+
+def framed(body, crc_offset=0):
+    crc = 0
+    for char in body:
+        crc ^= ord(char)
+    return '$%s*%02X\r\n' % (body, crc ^ crc_offset)
+
+
+def epoch_data():
+    """One epoch of sentences, then one with a bad CRC, one cut short and one padded with LF in the middle"""
+    text = ''.join(framed(body) for body in SENTENCES)
+    text += framed(SENTENCES[0], 1) + '$GPGGA,081836.000,3751'
+    padded = framed(SENTENCES[1])
+    text += padded[:30] + '\n' * 8 + padded[30:]
+    return text.encode()
+
+
+def crc_pass(function, chunks):
+    result = 0
+    for chunk in chunks:
+        result ^= function(chunk, 0, len(chunk))
+    return result
+
+
+def start_pass(function, chunks):
+    """Sum of the positions of every '$' in the chunks"""
+    result = 0
+    for chunk in chunks:
+        end = len(chunk)
+        position = function(chunk, 0, end)
+        while position < end:
+            result += position
+            position = function(chunk, position + 1, end)
+    return result
+
+
+def timed(run, size):
+    start = now()
+    result = run()
+    seconds = elapsed_s(start)
+    return result, size / seconds if seconds > 0 else 0
+
+
+def main(repeat=200):
+    data = bytearray(epoch_data() * repeat)
+    chunks = [data[position:position + CHUNK_SIZE] for position in range(0, len(data), CHUNK_SIZE)]
+    size = len(data)
+
+    print('%d bytes in %d chunks, viper version %s' % (size, len(chunks), 'in use' if ACCELERATED else 'not available'))
+    python_crc, python_crc_rate = timed(lambda: crc_pass(crc_xor_python, chunks), size)
+    current_crc, current_crc_rate = timed(lambda: crc_pass(crc_xor, chunks), size)
+    name = 'viper crc_xor()' if ACCELERATED else crc_xor.__name__ + '()'
+    print('  %-19s %12.0f bytes/s' % ('crc_xor_python()', python_crc_rate))
+    print('  %-19s %12.0f bytes/s  %.1fx' % (name, current_crc_rate, current_crc_rate / python_crc_rate))
+    print('  identical results:', current_crc == python_crc)
+
+    views = [memoryview(chunk) for chunk in chunks]
+    python_start, python_start_rate = timed(lambda: start_pass(find_start_python, views), size)
+    current_start, current_start_rate = timed(lambda: start_pass(find_start, views), size)
+    name = 'viper find_start()' if ACCELERATED else 'find_start()'
+    print('  %-19s %12.0f bytes/s' % ('find_start_python()', python_start_rate))
+    print('  %-19s %12.0f bytes/s  %.1fx' % (name, current_start_rate, current_start_rate / python_start_rate))
+    print('  identical results:', current_start == python_start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Host benchmark of the geodesy helpers: error of the equirectangular fast path against haversine at increasing
+distances, and the cost of single and batch queries.
+Run from the repository root: python3 benchmarks/bench_geodesy.py
+"""
+
+import math
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mgps.geodesy import Navigator, haversine_distance, initial_bearing, equirectangular_distance, METRES_PER_E7
+
+DISTANCES_M = (100, 1000, 10000, 20000, 100000, 1000000)
+LATITUDES = (0, 37.8, 60.0, 75.0)
+SAMPLES = 2000
+
+
+def targets(latitude_e7, longitude_e7, distance_m, rng):
+    """Points distance_m (on the local plane) away from a position in random directions"""
+    east_scale = METRES_PER_E7 * math.cos(math.radians(latitude_e7 / 1e7))
+    points = []
+    for _ in range(SAMPLES):
+        angle = rng.uniform(0, 2 * math.pi)
+        points.append((latitude_e7 + int(distance_m * math.cos(angle) / METRES_PER_E7),
+                       longitude_e7 + int(distance_m * math.sin(angle) / east_scale)))
+    return points
+
+
+def accuracy(rng):
+    print('error of Navigator against haversine (worst relative distance error, worst bearing error)')
+    for latitude in LATITUDES:
+        latitude_e7 = int(latitude * 1e7)
+        longitude_e7 = 1451226000
+        navigator = Navigator(fast_limit_m=10 ** 9)  # Fast path only
+        navigator.set_position(latitude_e7, longitude_e7)
+        for distance_m in DISTANCES_M:
+            worst_distance = worst_bearing = 0.0
+            for target in targets(latitude_e7, longitude_e7, distance_m, rng):
+                reference = haversine_distance(latitude_e7, longitude_e7, target[0], target[1])
+                distance, bearing = navigator.distance_bearing(target[0], target[1])
+                worst_distance = max(worst_distance, abs(distance - reference) / reference)
+                bearing_error = abs(bearing - initial_bearing(latitude_e7, longitude_e7, target[0], target[1]))
+                worst_bearing = max(worst_bearing, min(bearing_error, 360 - bearing_error))
+            print('  lat %5.1f  %8d m: %9.5f%%  %7.4f deg' % (latitude, distance_m, worst_distance * 100, worst_bearing))
+
+
+def cost(function, arguments, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for argument in arguments:
+            function(*argument)
+    return (time.perf_counter() - start) / (repeat * len(arguments)) * 1e6
+
+
+def speed(rng):
+    latitude_e7 = 377775000
+    longitude_e7 = 1451226000
+    navigator = Navigator()
+    navigator.set_position(latitude_e7, longitude_e7)
+    near = targets(latitude_e7, longitude_e7, 5000, rng)
+    far = targets(latitude_e7, longitude_e7, 500000, rng)
+    pairs = [(latitude_e7, longitude_e7) + target for target in near]
+
+    print('cost per call')
+    print('  haversine_distance():       %6.2f us' % cost(haversine_distance, pairs))
+    print('  equirectangular_distance(): %6.2f us' % cost(equirectangular_distance, pairs))
+    print('  Navigator.distance() near:  %6.2f us' % cost(navigator.distance, near))
+    print('  Navigator.distance() far:   %6.2f us' % cost(navigator.distance, far))
+    print('  Navigator.distance_bearing() near: %6.2f us' % cost(navigator.distance_bearing, near))
+
+    latitudes = array('i', [target[0] for target in near])
+    longitudes = array('i', [target[1] for target in near])
+    out = array('f', [0.0] * len(near))
+    start = time.perf_counter()
+    for _ in range(20):
+        navigator.distances(latitudes, longitudes, out)
+    batch = (time.perf_counter() - start) / (20 * len(near)) * 1e6
+    print('  Navigator.distances() near: %6.2f us per target' % batch)
+
+
+if __name__ == '__main__':
+    rng = random.Random(1)
+    accuracy(rng)
+    speed(rng)
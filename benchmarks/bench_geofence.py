@@ -0,0 +1,95 @@
+"""
+Host benchmark of GeofenceSet: checks a synthetic drive against thousands of random circle and polygon fences,
+through the grid index and with a naive loop over every fence, and compares the events.
+Run from the repository root: python3 benchmarks/bench_geofence.py
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mgps.geofence import GeofenceSet, ENTER, EXIT
+
+CENTRE_LATITUDE_E7 = -378136000
+CENTRE_LONGITUDE_E7 = 1449631000
+AREA_E7 = 5000000  # Fences within +-0.5 degrees of the centre
+FENCES = (1000, 5000)
+FIXES = 3600
+
+
+def synthetic_fences(count, seed=1):
+    rng = random.Random(seed)
+    fences = GeofenceSet()
+    for index in range(count):
+        latitude_e7 = CENTRE_LATITUDE_E7 + rng.randint(-AREA_E7, AREA_E7)
+        longitude_e7 = CENTRE_LONGITUDE_E7 + rng.randint(-AREA_E7, AREA_E7)
+        if index % 2:
+            fences.add_circle('circle %d' % index, latitude_e7, longitude_e7, rng.uniform(50, 2000))
+        else:
+            size = rng.randint(5000, 200000)
+            sides = rng.randint(3, 12)
+            vertices = []
+            for side in range(sides):
+                angle = 2 * math.pi * side / sides
+                reach = size * rng.uniform(0.4, 1.0)
+                vertices.append((latitude_e7 + int(reach * math.cos(angle)),
+                                 longitude_e7 + int(reach * math.sin(angle))))
+            fences.add_polygon('polygon %d' % index, vertices)
+    fences.build()
+    return fences
+
+
+def drive(seed=2):
+    """1 Hz fixes of a vehicle wandering around the fence area at 20 m/s"""
+    rng = random.Random(seed)
+    latitude_e7 = CENTRE_LATITUDE_E7
+    longitude_e7 = CENTRE_LONGITUDE_E7
+    heading = 0.0
+    fixes = []
+    for _ in range(FIXES):
+        heading += rng.uniform(-0.2, 0.2)
+        latitude_e7 += int(1800 * math.cos(heading))
+        longitude_e7 += int(2280 * math.sin(heading))
+        fixes.append((latitude_e7, longitude_e7))
+    return fixes
+
+
+def naive_check(fences, inside, latitude_e7, longitude_e7, events):
+    for index in range(len(fences)):
+        now = fences.contains(index, latitude_e7, longitude_e7)
+        if now != inside[index]:
+            inside[index] = now
+            events.append((ENTER if now else EXIT, index))
+
+
+def main():
+    fixes = drive()
+    for count in FENCES:
+        fences = synthetic_fences(count)
+        events = []
+        fences.add_callback(lambda event, index, name: events.append((event, index)))
+        start = time.perf_counter()
+        for latitude_e7, longitude_e7 in fixes:
+            fences.check(latitude_e7, longitude_e7)
+        indexed = time.perf_counter() - start
+        tests = fences.tests
+
+        naive_events = []
+        inside = [False] * count
+        start = time.perf_counter()
+        for latitude_e7, longitude_e7 in fixes:
+            naive_check(fences, inside, latitude_e7, longitude_e7, naive_events)
+        naive = time.perf_counter() - start
+
+        print('%d fences, %dx%d cells of %.2f degrees' % (count, fences.rows, fences.columns, fences.cell_e7 / 1e7))
+        print('  grid:  %8.1f us per fix, %.1f exact tests per fix' % (indexed / FIXES * 1e6, tests / FIXES))
+        print('  naive: %8.1f us per fix' % (naive / FIXES * 1e6))
+        print('  events: %d, identical: %s' % (len(events), sorted(events) == sorted(naive_events)))
+
+
+if __name__ == '__main__':
+    main()
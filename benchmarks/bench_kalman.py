@@ -0,0 +1,125 @@
+"""
+Host check of KalmanSmoother: position and speed error of raw and smoothed fixes on a synthetic track with HDOP
+scaled noise, and the cost of an update. With a capture file (see mgps/capture.py) the recorded track is replayed
+instead and the jitter of raw and smoothed positions is compared.
+Run from the repository root: python3 benchmarks/bench_kalman.py [capture_file]
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mgps.kalman import KalmanSmoother, METRES_PER_E7
+
+START_LATITUDE_E7 = -377775000
+START_LONGITUDE_E7 = 1451226000
+UERE_M = 4.0
+
+
+def synthetic_track(seconds, seed=1):
+    """(time_ms, true_x, true_y, true_speed, latitude_e7, longitude_e7, hdop_e2, speed_mms, course_e2) at 1 Hz for a
+    vehicle driving straight, turning and stopping"""
+    rng = random.Random(seed)
+    east_scale = METRES_PER_E7 * math.cos(math.radians(START_LATITUDE_E7 / 1e7))
+    x = y = 0.0
+    heading = 0.0
+    fixes = []
+    for second in range(seconds):
+        phase = second % 300
+        if phase < 100:
+            speed, turn = 15.0, 0.0
+        elif phase < 160:
+            speed, turn = 8.0, 3.0
+        elif phase < 200:
+            speed, turn = 0.0, 0.0
+        else:
+            speed, turn = 25.0, -0.5
+        heading += math.radians(turn)
+        x += speed * math.sin(heading)
+        y += speed * math.cos(heading)
+
+        hdop = rng.choice((0.8, 0.9, 1.0, 1.2, 1.6, 2.5))
+        sigma = hdop * UERE_M / math.sqrt(2)
+        measured_x = x + rng.gauss(0, sigma)
+        measured_y = y + rng.gauss(0, sigma)
+        fixes.append((second * 1000 % 86400000, x, y, speed,
+                      START_LATITUDE_E7 + int(round(measured_y / METRES_PER_E7)),
+                      START_LONGITUDE_E7 + int(round(measured_x / east_scale)),
+                      int(hdop * 100), int(abs(speed + rng.gauss(0, 0.3)) * 1000),
+                      int(math.degrees(heading) * 100) % 36000))
+    return fixes
+
+
+def plane(latitude_e7, longitude_e7):
+    east_scale = METRES_PER_E7 * math.cos(math.radians(START_LATITUDE_E7 / 1e7))
+    return ((longitude_e7 - START_LONGITUDE_E7) * east_scale, (latitude_e7 - START_LATITUDE_E7) * METRES_PER_E7)
+
+
+def bench_synthetic(seconds=3600):
+    fixes = synthetic_track(seconds)
+    smoother = KalmanSmoother(uere_m=UERE_M)
+    raw_error = smoothed_error = raw_speed_error = smoothed_speed_error = 0.0
+    start = time.perf_counter()
+    for fix in fixes:
+        smoother.update(fix[0], fix[4], fix[5], fix[6], fix[7], fix[8])
+    elapsed = time.perf_counter() - start
+
+    smoother = KalmanSmoother(uere_m=UERE_M)
+    for time_ms, x, y, speed, latitude_e7, longitude_e7, hdop_e2, speed_mms, course_e2 in fixes:
+        smoother.update(time_ms, latitude_e7, longitude_e7, hdop_e2, speed_mms, course_e2)
+        raw_x, raw_y = plane(latitude_e7, longitude_e7)
+        smoothed_x, smoothed_y = plane(smoother.latitude_e7, smoother.longitude_e7)
+        raw_error += (raw_x - x) ** 2 + (raw_y - y) ** 2
+        smoothed_error += (smoothed_x - x) ** 2 + (smoothed_y - y) ** 2
+        raw_speed_error += (speed_mms / 1000 - speed) ** 2
+        smoothed_speed_error += (smoother.speed_mms / 1000 - speed) ** 2
+
+    print('synthetic track, %d fixes' % seconds)
+    print('  position rms error: raw %6.2f m, smoothed %6.2f m' % (math.sqrt(raw_error / seconds),
+                                                                  math.sqrt(smoothed_error / seconds)))
+    print('  speed rms error:    raw %6.2f m/s, smoothed %6.2f m/s' % (math.sqrt(raw_speed_error / seconds),
+                                                                      math.sqrt(smoothed_speed_error / seconds)))
+    print('  update:  %8.1f us' % (elapsed / seconds * 1e6))
+
+
+def jitter(points):
+    """rms of the second difference of a track, in m"""
+    total = 0.0
+    for index in range(2, len(points)):
+        for axis in (0, 1):
+            total += (points[index][axis] - 2 * points[index - 1][axis] + points[index - 2][axis]) ** 2
+    return math.sqrt(total / max(len(points) - 2, 1))
+
+
+def bench_capture(capture_file):
+    from mgps.capture import replay
+    from mgps.epoch import EpochAssembler
+    from mgps.nmea_parser import NmeaParser
+
+    parser = NmeaParser(fixed_point=True)
+    epochs = EpochAssembler(parser, sentences=('RMC', 'GGA'))
+    smoother = KalmanSmoother()
+    raw = []
+    smoothed = []
+
+    def record(smoother):
+        raw.append((smoother.raw_longitude_e7 * METRES_PER_E7, smoother.raw_latitude_e7 * METRES_PER_E7))
+        smoothed.append((smoother.longitude_e7 * METRES_PER_E7, smoother.latitude_e7 * METRES_PER_E7))
+
+    smoother.attach(epochs)
+    smoother.add_callback(record)
+    replay(parser, capture_file)
+
+    print('%s, %d fixes, %d restarts' % (capture_file, smoother.updates, smoother.restarts))
+    print('  jitter: raw %6.2f m, smoothed %6.2f m' % (jitter(raw), jitter(smoothed)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        bench_capture(sys.argv[1])
+    else:
+        bench_synthetic()
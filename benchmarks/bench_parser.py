@@ -0,0 +1,209 @@
+"""
+NmeaParser benchmark suite. Feeds workloads from workload.py through update(), feed() and feed() in fixed buffer
+mode and reports characters/s, sentences/s and bytes allocated per sentence, then microseconds per sentence of each
+type through feed(). Allocations come from tracemalloc on CPython, as the sum of each chunk's peak, and from
+gc.mem_alloc() with the collector held off on MicroPython. update() includes decoding each chunk to characters.
+Results are compared with benchmarks/baseline.json when it exists, --save records the current results there.
+Run from the repository root: python3 benchmarks/bench_parser.py [--save]
+or on the MicroPython unix port: micropython benchmarks/bench_parser.py [--save]
+"""
+
+import gc
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+try:
+    import json
+except ImportError:
+    import ujson as json
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from mgps.nmea_parser import NmeaParser
+from workload import Workload, TYPES
+
+try:
+    import utime
+
+    def now():
+        return utime.ticks_us()
+
+    def elapsed_s(start):
+        return utime.ticks_diff(utime.ticks_us(), start) / 1000000
+except ImportError:
+    import time
+
+    def now():
+        return time.perf_counter()
+
+    def elapsed_s(start):
+        return time.perf_counter() - start
+
+BASELINE_FILE = 'benchmarks/baseline.json'
+
+SECONDS = 60  # Of receiver output per workload
+PASSES = 5  # Over the output of a workload, so it only has to be held in memory once
+ALLOCATION_SECONDS = 10  # Measured separately, without timing
+
+WORKLOADS = (
+    ('gps_1hz', dict(rate_hz=1, talkers=('GP',))),
+    ('multi_gnss_10hz', dict(rate_hz=10, talkers=('GP', 'GL', 'GA'))),
+    ('noisy_5hz', dict(rate_hz=5, talkers=('GP', 'GL'), corruption=0.02, truncation=0.02)),
+)
+
+
+def update_method(parser):
+    def run(chunk):
+        update = parser.update
+        for character in chunk.decode():
+            update(character)
+    return run
+
+
+METHODS = (
+    ('update', lambda: update_method(NmeaParser())),
+    ('feed', lambda: NmeaParser().feed),
+    ('feed_fixed', lambda: NmeaParser(fixed_buffer=True).feed),
+)
+
+
+def timed(run, chunks):
+    """Seconds per pass of every chunk to run"""
+    gc.collect()
+    start = now()
+    for _ in range(PASSES):
+        for chunk in chunks:
+            run(chunk)
+    return elapsed_s(start) / PASSES
+
+
+def allocated(run, chunks):
+    """Bytes allocated while passing every chunk to run, None when the platform can't tell"""
+    total = 0
+    if tracemalloc is not None:
+        tracemalloc.start()
+        for chunk in chunks:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            run(chunk)
+            total += tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        return total
+    if hasattr(gc, 'mem_alloc'):
+        gc.collect()
+        gc.disable()
+        try:
+            for chunk in chunks:
+                before = gc.mem_alloc()
+                run(chunk)
+                total += gc.mem_alloc() - before
+                gc.collect()
+        finally:
+            gc.enable()
+        return total
+    return None
+
+
+def bench_workloads():
+    results = dict()
+    for name, options in WORKLOADS:
+        workload = Workload(**options)
+        chunks = workload.chunks(SECONDS)
+        characters = sum(len(chunk) for chunk in chunks)
+        sentences = workload.sentences
+
+        sample = Workload(**options)
+        sample_chunks = sample.chunks(ALLOCATION_SECONDS)
+
+        results[name] = dict()
+        for method, create in METHODS:
+            seconds = timed(create(), chunks)
+            allocation = allocated(create(), sample_chunks)
+            results[name][method] = {
+                'chars_per_s': int(characters / seconds),
+                'sentences_per_s': int(sentences / seconds),
+                'alloc_bytes_per_sentence': None if allocation is None else round(allocation / sample.sentences, 1),
+            }
+    return results
+
+
+def bench_types():
+    """Microseconds per sentence through feed(), and of that in the sentence function, for each type"""
+    results = dict()
+    for sentence_type in TYPES:
+        workload = Workload(rate_hz=1, talkers=('GP', 'GL'), types=(sentence_type,))
+        chunks = workload.chunks(SECONDS)
+        parser = NmeaParser()
+        seconds = timed(parser.feed, chunks)
+        parse_us = parser.stats()[sentence_type]['parse_us'] / PASSES
+        results[sentence_type] = {
+            'us_per_sentence': round(seconds * 1000000 / workload.sentences, 2),
+            'parse_us_per_sentence': round(parse_us / workload.sentences, 2),
+        }
+    return results
+
+
+def load_baseline():
+    try:
+        with open(BASELINE_FILE) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def ratio(current, baseline):
+    if current is None or not baseline:
+        return ''
+    return '%6.2fx' % (current / baseline)
+
+
+def report(results, baseline):
+    print('%s %s' % (results['implementation'], results['version']))
+    if baseline is not None:
+        print('compared with baseline from %s %s' % (baseline['implementation'], baseline['version']))
+    print('%-18s %-11s %12s %12s %12s' % ('workload', 'method', 'chars/s', 'sentences/s', 'alloc B/sent'))
+    for name, methods in results['workloads'].items():
+        for method, values in methods.items():
+            allocation = values['alloc_bytes_per_sentence']
+            line = '%-18s %-11s %12d %12d %12s' % (name, method, values['chars_per_s'], values['sentences_per_s'],
+                                                   '-' if allocation is None else '%.1f' % allocation)
+            if baseline is not None:
+                previous = baseline['workloads'].get(name, dict()).get(method)
+                if previous is not None:
+                    line += '  speed %s  alloc %s' % (ratio(values['sentences_per_s'], previous['sentences_per_s']),
+                                                      ratio(allocation, previous['alloc_bytes_per_sentence']))
+            print(line)
+
+    print('%-18s %12s %12s' % ('sentence type', 'us/sentence', 'parse us'))
+    for sentence_type, values in results['types'].items():
+        line = '%-18s %12.2f %12.2f' % (sentence_type, values['us_per_sentence'], values['parse_us_per_sentence'])
+        if baseline is not None:
+            previous = baseline['types'].get(sentence_type)
+            if previous is not None:
+                line += '  time %s' % ratio(values['us_per_sentence'], previous['us_per_sentence'])
+        print(line)
+
+
+def main():
+    results = {
+        'implementation': sys.implementation.name,
+        'version': sys.version.split()[0],
+        'seconds': SECONDS,
+        'passes': PASSES,
+        'workloads': bench_workloads(),
+        'types': bench_types(),
+    }
+    report(results, load_baseline())
+    if '--save' in sys.argv:
+        with open(BASELINE_FILE, 'w') as handle:
+            json.dump(results, handle)
+        print('saved to', BASELINE_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Host benchmark of the waypoint index: builds a file of random waypoints, then checks nearest() against a brute
+force search and measures cells read and time per query, and how often NearestWaypoint goes to the file on a drive.
+Run from the repository root: python3 benchmarks/bench_waypoints.py
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mgps.waypoints import build, WaypointIndex, NearestWaypoint
+
+CENTRE_LATITUDE_E7 = -378136000
+CENTRE_LONGITUDE_E7 = 1449631000
+AREA_E7 = 20000000  # +-2 degrees
+WAYPOINTS = 5000
+QUERIES = 2000
+
+
+def main():
+    rng = random.Random(1)
+    waypoints = [('site %d' % index, CENTRE_LATITUDE_E7 + rng.randint(-AREA_E7, AREA_E7),
+                  CENTRE_LONGITUDE_E7 + rng.randint(-AREA_E7, AREA_E7)) for index in range(WAYPOINTS)]
+    target_file = os.path.join(tempfile.mkdtemp(), 'waypoints.bin')
+    cells = build(waypoints, target_file)
+    index = WaypointIndex(target_file)
+    print('%d waypoints, %d cells, %d bytes' % (WAYPOINTS, cells, os.path.getsize(target_file)))
+
+    queries = [(CENTRE_LATITUDE_E7 + rng.randint(-AREA_E7 * 2, AREA_E7 * 2),
+                CENTRE_LONGITUDE_E7 + rng.randint(-AREA_E7 * 2, AREA_E7 * 2)) for _ in range(QUERIES)]
+    start = time.perf_counter()
+    results = [index.nearest(latitude_e7, longitude_e7) for latitude_e7, longitude_e7 in queries]
+    elapsed = time.perf_counter() - start
+
+    # nearest() ranks on a plane scaled at the query latitude, so the brute force does too
+    mismatches = 0
+    for (latitude_e7, longitude_e7), result in zip(queries, results):
+        scale = math.cos(math.radians(latitude_e7 / 1e7))
+        best = min(waypoints, key=lambda waypoint: (waypoint[1] - latitude_e7) ** 2 +
+                   ((waypoint[2] - longitude_e7) * scale) ** 2)
+        if best[0] != result[0]:
+            mismatches += 1
+    print('  nearest(): %.1f us, %.1f cells read per query, %d of %d differ from brute force'
+          % (elapsed / QUERIES * 1e6, index.reads / QUERIES, mismatches, QUERIES))
+
+    tracker = NearestWaypoint(index, requery_m=200)
+    latitude_e7 = CENTRE_LATITUDE_E7
+    longitude_e7 = CENTRE_LONGITUDE_E7
+    heading = 0.0
+    for second in range(3600):
+        heading += rng.uniform(-0.1, 0.1)
+        latitude_e7 += int(1800 * math.cos(heading))
+        longitude_e7 += int(2280 * math.sin(heading))
+        tracker.update(latitude_e7, longitude_e7)
+    print('  drive of 3600 fixes at 20 m/s: %d queries, nearest now %s at %.0f m'
+          % (tracker.queries, tracker.name, tracker.distance_m))
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Deterministic generator of receiver output for benchmarks: RMC/GGA/GSA/GSV epochs at 1-10 Hz from one or more
+constellations, with optional corruption and truncation. The same arguments always produce the same bytes, on
+CPython and MicroPython alike, so results can be compared between runs and against a baseline.
+"""
+
+# Talkers of the constellations a multi-GNSS receiver reports, GN is used for the combined RMC/GGA
+CONSTELLATIONS = {'GP': (1, 32), 'GL': (65, 88), 'GA': (301, 336), 'GB': (401, 437)}
+
+TYPES = ('RMC', 'GGA', 'GSA', 'GSV')
+
+
+class Random(object):
+    """Small linear congruential generator, so the workload doesn't depend on the random module of the platform"""
+
+    def __init__(self, seed):
+        self.state = seed & 0x7FFFFFFF
+
+    def next(self):
+        self.state = (self.state * 1103515245 + 12345) & 0x7FFFFFFF
+        return self.state
+
+    def below(self, limit):
+        """Integer in 0..limit-1"""
+        return (self.next() >> 8) % limit
+
+    def chance(self, probability):
+        """True with the given probability"""
+        return probability > 0 and (self.next() >> 8) < probability * 0x800000
+
+
+def framed(body):
+    crc = 0
+    for char in body:
+        crc ^= ord(char)
+    return '$%s*%02X\r\n' % (body, crc)
+
+
+class Workload(object):
+    """Receiver output for a drive starting at 08:18:36 UTC on 13 Sep 2018 near Melbourne.
+        rate_hz: Epochs per second, 1-10. GSV groups are only sent once per second as receivers do
+        talkers: Constellations, e.g. ('GP', 'GL', 'GA'). With more than one, RMC and GGA use the GN talker and GSA
+                 and GSV are sent per constellation
+        types: Sentence types to send, a subset of TYPES
+        corruption: Probability that a sentence has one character changed, failing its CRC
+        truncation: Probability that a sentence is cut off at a random point
+        satellites: Satellites in view per constellation
+    The counters sentences, intact, corrupted and truncated, and counts per sentence type, cover everything
+    generated so far"""
+
+    def __init__(self, rate_hz=1, talkers=('GP',), types=TYPES, corruption=0.0, truncation=0.0, satellites=12,
+                 seed=1):
+        if not 1 <= rate_hz <= 10:
+            raise ValueError("rate_hz must be 1 to 10")
+        self.rate_hz = rate_hz
+        self.talkers = talkers
+        self.types = types
+        self.corruption = corruption
+        self.truncation = truncation
+        self.satellites = satellites
+        self.random = Random(seed)
+
+        self.epoch = 0
+        self.sentences = 0
+        self.intact = 0
+        self.corrupted = 0
+        self.truncated = 0
+        self.counts = dict((sentence_type, 0) for sentence_type in TYPES)
+
+        # Sky, per constellation: (prn, elevation, azimuth) of the satellites in view
+        self.sky = dict()
+        for talker in talkers:
+            first, last = CONSTELLATIONS[talker]
+            prns = list(range(first, last + 1))
+            view = []
+            for _ in range(min(satellites, len(prns))):
+                prn = prns.pop(self.random.below(len(prns)))
+                view.append((prn, 5 + self.random.below(85), self.random.below(360)))
+            self.sky[talker] = view
+
+    ########################################
+    # Sentences
+    ########################################
+    def position(self):
+        """(latitude, longitude, speed knots, course) along the drive at the current epoch"""
+        seconds = self.epoch / self.rate_hz
+        latitude = -37.86 + seconds * 0.00005
+        longitude = 145.1227 + seconds * 0.00007
+        return latitude, longitude, 16.4 + (self.epoch % 20) / 10, 54.3
+
+    @staticmethod
+    def ddm(value, positive, negative, degree_digits):
+        hemisphere = positive if value >= 0 else negative
+        value = abs(value)
+        degrees = int(value)
+        return '%0*d%07.4f' % (degree_digits, degrees, (value - degrees) * 60), hemisphere
+
+    def utc(self):
+        """hhmmss.sss of the current epoch"""
+        milliseconds = 29916000 + self.epoch * 1000 // self.rate_hz
+        seconds = milliseconds // 1000
+        return '%02d%02d%02d.%03d' % (seconds // 3600 % 24, seconds // 60 % 60, seconds % 60, milliseconds % 1000)
+
+    def epoch_bodies(self):
+        """(sentence_type, body) of every sentence of the current epoch"""
+        latitude, longitude, speed, course = self.position()
+        latitude, north = self.ddm(latitude, 'N', 'S', 2)
+        longitude, east = self.ddm(longitude, 'E', 'W', 3)
+        utc = self.utc()
+        combined = 'GN' if len(self.talkers) > 1 else self.talkers[0]
+        in_use = sum(min(len(view), 12) for view in self.sky.values())
+        bodies = []
+
+        if 'RMC' in self.types:
+            bodies.append(('RMC', '%sRMC,%s,A,%s,%s,%s,%s,%.1f,%.1f,130918,,,A' %
+                           (combined, utc, latitude, north, longitude, east, speed, course)))
+        if 'GGA' in self.types:
+            bodies.append(('GGA', '%sGGA,%s,%s,%s,%s,%s,1,%02d,0.9,45.4,M,-3.1,M,,' %
+                           (combined, utc, latitude, north, longitude, east, min(in_use, 99))))
+        if 'GSA' in self.types:
+            for talker in self.talkers:
+                prns = ['%02d' % satellite[0] for satellite in self.sky[talker][:12]]
+                prns += [''] * (12 - len(prns))
+                bodies.append(('GSA', '%sGSA,A,3,%s,1.6,0.9,1.3' % (talker, ','.join(prns))))
+        if 'GSV' in self.types and self.epoch % self.rate_hz == 0:
+            for talker in self.talkers:
+                view = self.sky[talker]
+                messages = (len(view) + 3) // 4
+                for message in range(messages):
+                    fields = []
+                    for prn, elevation, azimuth in view[message * 4:message * 4 + 4]:
+                        fields.append('%02d,%02d,%03d,%02d' % (prn, elevation, azimuth, 20 + (prn + self.epoch) % 25))
+                    bodies.append(('GSV', '%sGSV,%d,%d,%02d,%s' % (talker, messages, message + 1, len(view),
+                                                                  ','.join(fields))))
+        return bodies
+
+    def next_epoch(self):
+        """Bytes the receiver sends for the next epoch"""
+        random = self.random
+        parts = []
+        for sentence_type, body in self.epoch_bodies():
+            sentence = framed(body)
+            self.sentences += 1
+            self.counts[sentence_type] += 1
+            if random.chance(self.corruption):
+                # Change a character after the '$' and before the CRC
+                position = 1 + random.below(len(body))
+                replacement = '0' if sentence[position] != '0' else '1'
+                sentence = sentence[:position] + replacement + sentence[position + 1:]
+                self.corrupted += 1
+            elif random.chance(self.truncation):
+                sentence = sentence[:1 + random.below(len(sentence) - 3)]
+                self.truncated += 1
+            else:
+                self.intact += 1
+            parts.append(sentence)
+        self.epoch += 1
+        return ''.join(parts).encode()
+
+    ########################################
+    # Streams
+    ########################################
+    def stream(self, seconds):
+        """Bytes of seconds worth of epochs"""
+        return b''.join(self.next_epoch() for _ in range(seconds * self.rate_hz))
+
+    def chunks(self, seconds, size=255):
+        """seconds worth of epochs as the receiver returns them through GPS.get_raw_bytes(): each epoch read in
+        blocks of size bytes, the last one padded with LF"""
+        chunks = []
+        for _ in range(seconds * self.rate_hz):
+            data = self.next_epoch()
+            for position in range(0, len(data), size):
+                block = data[position:position + size]
+                chunks.append(block + b'\n' * (size - len(block)))
+        return chunks
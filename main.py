@@ -20,11 +20,14 @@ from machine import RTC
 
 from mgps.micro_gps import GPS
 from mgps.nmea_parser import NmeaParser
+from mgps.time_sync import TimeSync
+from mgps.pipeline import Pipeline
+from mgps.waypoints import WaypointIndex, NearestWaypoint
 
 gc.collect()
 
 from gui.core.writer import CWriter
-from gui.widgets.label import ALIGN_CENTER
+from gui.widgets.label import Label, ALIGN_CENTER
 from gui.core.nanogui import refresh
 gc.collect()
 import gui.fonts.font10 as font
@@ -43,135 +46,99 @@ if epaper and not hasattr(ssd, "set_partial"):
 
 rtc = None
 
+# built on the host with: python3 -m mgps.waypoints waypoints.csv waypoints.bin
+WAYPOINT_FILE = 'waypoints.bin'
+
 async def main():
     # rtc.datetime((2023, 3, 18, 5, 10, 0, 0, 0))
 
     gps = GPS()
-    parser = NmeaParser(-4)
+    # the clock only needs time and date. ZDA carries both with a 4 digit year, RMC is used by receivers without it
+    parser = NmeaParser(-4, subscribe={'RMC', 'ZDA'})
+    # carries the time of the last RMC/ZDA forward from when the receiver sent it
+    sync = TimeSync(parser)
 
-    gps_initialize(gps, parser)
+    gps_initialize(gps, parser, sync)
 
-    asyncio.create_task(gps_update(gps, parser))
-    asyncio.create_task(clock_writer())
+    # Read and parse the receiver only while a sentence is wanted, yielding between chunks and sentences so the
+    # display is never starved
+    pipeline = Pipeline(gps.get_raw_bytes, parser)
+    sync.use_pipeline(pipeline)
+    asyncio.create_task(gps_update(pipeline, parser, sync))
+    asyncio.create_task(clock_writer(pipeline, open_waypoints(parser)))
 
     while True:
         await asyncio.sleep(10_000)  # foreverrrrrrr
 
 
-def gps_initialize(gps, parser):
+# largest estimated RTC error accepted at start up, ms
+SYNC_ERROR_MS = 100
+
+
+def gps_initialize(gps, parser, sync):
     global rtc
 
     while rtc is None:
         print('aquiring gps for RTC update')
         try:
-            for character in gps.get_raw_data():
-                parser.update(character)
+            ticks = time.ticks_ms()
+            sync.feed(gps.get_raw_bytes(), ticks)
         except Exception as e:
             sys.print_exception(e)
             time.sleep(5)  # blocking because we rely on rtc being updated once
             continue  # continue operations even if failure
 
-        _timestamp = tuple(int(x) for x in parser.timestamp)  # hours, minutes, seconds
-        _date = tuple(int(x) for x in parser.date)  # day, month, year
-
-        print(f"_timestamp: {_timestamp}")
-        print(f"_date: {_date}")
-
-        if _timestamp != (0,0,0) and _date != (0,0,0):
-            try:
-                year = int(f"20{_date[2]}")
-                month = _date[1]
-                day = _date[0]
-                hour = _timestamp[0]
-                minute = _timestamp[1]
-                second = _timestamp[2]
-
-                # Validate date and time values
-                if (1 <= month <= 12 and
-                        1 <= day <= 31 and
-                        0 <= hour <= 23 and
-                        0 <= minute <= 59 and
-                        0 <= second <= 59):
-                    rtc = RTC()
-                    print(f"year: {year}")
-                    print(f"month: {month}")
-                    print(f"day: {day}")
-                    print(f"hour: {hour}")
-                    print(f"minute: {minute}")
-                    print(f"second: {second}")
-                    rtc.datetime((year, month, day, _calculate_weekday(year, month, day), hour, minute, second, 0))
-                else:
-                    raise ValueError("Invalid date or time values")
-            except ValueError as ve:
-                print(f"Error: {ve}")
-                rtc = None
-                time.sleep(5)  # blocking because we rely on rtc being updated once
-        else:
+        if sync.now() is None:
             time.sleep(5)  # blocking because we rely on rtc being updated once
+            continue
+
+        if sync.error_ms > SYNC_ERROR_MS:
+            # time sentences are arriving, poll quickly so the next one can be placed precisely
+            time.sleep_ms(50)
+            continue
+
+        rtc = RTC()
+        residual = sync.set_rtc(rtc, parser.local_offset)
+        print(f"datetime: {rtc.datetime()} residual error: {residual} ms latency: {sync.latency_ms} ms")
     print('end of gps initialize')
 
 
-async def gps_update(gps, parser):
+async def gps_update(pipeline, parser, sync):
     global rtc
+    rmc = pipeline.subscribe({'RMC', 'ZDA'}, capacity=1)
     while True:
         print(f"current datetime: {rtc.datetime()}")
         print(f"current localtime: {time.localtime()}")
         try:
-            for character in gps.get_raw_data():
-                parser.update(character)
-
-            _timestamp = tuple(int(x) for x in parser.timestamp)  # hours, minutes, seconds
-            _date = tuple(int(x) for x in parser.date)  # day, month, year
-
-            print(f"_timestamp: {_timestamp}")
-            print(f"_date: {_date}")
-
-            if _timestamp != (0,0,0) and _date != (0,0,0):
-                try:
-                    year = int(f"20{_date[2]}")
-                    month = _date[1]
-                    day = _date[0]
-                    hour = _timestamp[0]
-                    minute = _timestamp[1]
-                    second = _timestamp[2]
-
-                    # Validate date and time values
-                    if (1 <= month <= 12 and
-                            1 <= day <= 31 and
-                            0 <= hour <= 23 and
-                            0 <= minute <= 59 and
-                            0 <= second <= 59):
-                        print(f"year: {year}")
-                        print(f"month: {month}")
-                        print(f"day: {day}")
-                        print(f"hour: {hour}")
-                        print(f"minute: {minute}")
-                        print(f"second: {second}")
-                        rtc.datetime((year, month, day, _calculate_weekday(year, month, day), hour, minute, second, 0))
-                    else:
-                        raise ValueError("Invalid date or time values")
-                except ValueError as ve:
-                    sys.print_exception(ve)
+            # Poll the receiver until a time sentence is placed precisely. The first read after the sleep holds
+            # whatever the receiver buffered meanwhile
+            await pipeline.next(rmc)
+            while sync.error_ms > SYNC_ERROR_MS:
+                await pipeline.next(rmc)
+
+            residual = await sync.set_rtc_async(rtc, parser.local_offset)
+            if residual is None:
+                raise ValueError("Invalid date or time values")
+
+            print(f"datetime: {rtc.datetime()} residual error: {residual} ms latency: {sync.latency_ms} ms")
         except Exception as e:
             sys.print_exception(e)
 
         await asyncio.sleep(43_200)  # 12 hours
 
 
-def _calculate_weekday(year, month, day):
-    # Zeller's Congruence algorithm to calculate the weekday
-    # Adjust month and year for the algorithm
-    if month < 3:
-        month += 12
-        year -= 1
-    k = year % 100
-    j = year // 100
-    # Zeller's Congruence formula
-    day_of_week = (day + ((13*(month+1))//5) + k + (k//4) + (j//4) + (5*j)) % 7
-    return (day_of_week + 6) % 7  # Adjusting to match MicroPython's weekday numbering (0-6)
+def open_waypoints(parser):
+    """Follow the nearest waypoint when a waypoint file is on flash, None otherwise"""
+    try:
+        index = WaypointIndex(WAYPOINT_FILE)
+    except (OSError, ValueError):
+        return None
+    nearest = NearestWaypoint(index, requery_m=200)
+    nearest.listen(parser, ('RMC',))
+    return nearest
 
 
-async def clock_writer():
+async def clock_writer(pipeline, nearest=None):
     clock_wri = CWriter(ssd, font, verbose=False)
     clock_wri.set_clip(True, True, False)  # Clip to screen, no wrap
 
@@ -204,7 +171,16 @@ async def clock_writer():
     date_info_grid[0, 0] = f"{date_cal.day_str} {date_cal.mday}"
     date_info_grid[1, 0] = f"{date_cal.month_str}"
 
+    waypoint_label = None
+    if nearest is not None:
+        rmc = pipeline.subscribe({'RMC'}, capacity=1)
+        waypoint_label = Label(clock_wri, 220, start_col_2, grid_width, fgcolor=WHITE, bgcolor=BLACK,
+                               align=ALIGN_CENTER)
+
     while True:
+        if waypoint_label is not None:
+            # Wait for a fresh position for the nearest waypoint
+            await pipeline.next(rmc)
         t = time.localtime()
         print(f"localtime: {t}")
         if 30 <= t[4] < 31:  # weird way to do this... but it works
@@ -213,6 +189,8 @@ async def clock_writer():
             ssd.set_partial()
         ssd.wait_until_ready()
         ec.value(t)
+        if waypoint_label is not None and nearest.name is not None:
+            waypoint_label.value(f"{nearest.name} {nearest.distance_m / 1000:.1f} km")
         refresh(ssd)
         ssd.wait_until_ready()
 
@@ -0,0 +1,181 @@
+"""
+# Aggregator - one NmeaParser per receiver, best fix selection and a monotonic merged UTC time
+# The MIT License (MIT) - see LICENSE file
+"""
+
+from array import array
+
+from .nmea_parser import NmeaParser
+from .ticks import ticks_ms, ticks_diff
+
+# Score of a source without a usable fix
+NO_FIX = -1
+
+# Sentence types the aggregator scores or takes time from, the subscriptions of each source's parser by default
+SENTENCES = ('RMC', 'GGA', 'GNS', 'GLL', 'GSA', 'ZDA')
+
+
+class Aggregator(object):
+    """Runs one NmeaParser per receiver and keeps track of the best of them.
+    Sources are read functions such as GPS.get_raw_bytes of each receiver, or CaptureReader.read for replayed
+    captures. Each source's fix is scored after every position sentence: fix type first, then HDOP, then
+    satellites in use, and a source whose last fix is older than max_age_ms has no score. best is only handed to
+    another source when its score is higher by switch_margin (0.1 HDOP by default) or the current one loses its
+    fix, so two similar receivers don't take turns.
+    Time is merged from the RMC/ZDA sentences of all sources: the first source to report a new UTC second sets it,
+    and it never moves backwards, so a lagging source or a change of best doesn't make the time jump. A time more
+    than max_step_ms ahead of the current one is rejected unless the current time source has gone quiet for
+    max_age_ms.
+    Per source state lives in arrays indexed by source, and the parsers are only created by add_source(). They are
+    subscribed to SENTENCES only, so GSV, VTG and the like are dropped before they are buffered, and keep no
+    statistics, so a source costs little more than the parser's own state"""
+
+    def __init__(self, max_age_ms=3000, switch_margin=10, max_step_ms=5000):
+        self.max_age_ms = max_age_ms
+        self.switch_margin = switch_margin
+        self.max_step_ms = max_step_ms
+
+        self.reads = []
+        self.parsers = []
+        self.names = []
+        self.scores = array('i')
+        self.fixes = array('I')  # Position sentences parsed per source
+        self.best = -1  # Index of the best source, -1 while no source has a fix
+        self.switches = 0
+
+        # Merged time: epoch_seconds.epoch_ms was current at time_ticks, reported first by time_source
+        self.epoch_seconds = -1
+        self.epoch_ms = 0
+        self.time_ticks = 0
+        self.time_source = -1
+        self.rejected_times = 0
+        self.callbacks = []
+
+    def add_source(self, read, name=None, **parser_options):
+        """Add a receiver read function, creating its NmeaParser with parser_options. The parser is subscribed to
+        SENTENCES and keeps no statistics unless parser_options say otherwise. Returns the source index"""
+        index = len(self.parsers)
+        options = dict(subscribe=SENTENCES, statistics=False)
+        options.update(parser_options)
+        parser = NmeaParser(**options)
+        self.reads.append(read)
+        self.parsers.append(parser)
+        self.names.append(name if name is not None else 'source %d' % index)
+        self.scores.append(NO_FIX)
+        self.fixes.append(0)
+        # The listener only needs to know which source it belongs to
+        parser.add_listener(lambda parser, sentence_type: self.sentence(index, parser, sentence_type))
+        return index
+
+    def add_callback(self, callback):
+        """Call callback(aggregator) whenever best changes to another source"""
+        self.callbacks.append(callback)
+
+    @property
+    def parser(self):
+        """NmeaParser of the best source, None while no source has a fix"""
+        return self.parsers[self.best] if self.best >= 0 else None
+
+    ########################################
+    # Reading
+    ########################################
+    def feed(self, index, chunk):
+        """Feed a chunk read from a source into its parser. Returns the number of sentences parsed"""
+        return self.parsers[index].feed(chunk)
+
+    def poll(self):
+        """Read every source once. Returns False when every source has run out of data"""
+        active = False
+        for index in range(len(self.reads)):
+            chunk = self.reads[index]()
+            if chunk:
+                active = True
+                self.parsers[index].feed(chunk)
+        self.rescore()
+        return active
+
+    async def run(self, interval_ms=100):
+        """Poll the sources until they all run out of data, yielding interval_ms between polls"""
+        import asyncio
+        while self.poll():
+            await asyncio.sleep(interval_ms / 1000)
+
+    ########################################
+    # Scoring
+    ########################################
+    def sentence(self, index, parser, sentence_type):
+        """Listener of each source's parser"""
+        if sentence_type in ('RMC', 'ZDA'):
+            self.merge_time(index, parser)
+        if sentence_type in ('RMC', 'GGA', 'GNS', 'GLL', 'GSA'):
+            self.fixes[index] += 1
+            self.scores[index] = self.score(parser)
+            self.select()
+
+    def score(self, parser):
+        """Score of a parser's current fix, higher is better, NO_FIX without a recent valid fix"""
+        age = parser.time_since_fix()
+        if age < 0 or age > self.max_age_ms or not (parser.valid or parser.fix_stat > 0):
+            return NO_FIX
+        hdop_e2 = parser.hdop_e2 if parser.fixed_point else int(parser.hdop * 100)
+        if hdop_e2 <= 0:
+            hdop_e2 = 9999  # Unknown
+        return (parser.fix_type * 10000 - min(hdop_e2, 9999)) * 100 + min(parser.satellites_in_use, 99)
+
+    def rescore(self):
+        """Score every source again, so sources that stopped sending lose their fix"""
+        for index in range(len(self.parsers)):
+            if self.scores[index] != NO_FIX:
+                self.scores[index] = self.score(self.parsers[index])
+        self.select()
+
+    def select(self):
+        """Hand best to another source if it is clearly better"""
+        best = self.best
+        candidate = best
+        for index in range(len(self.scores)):
+            score = self.scores[index]
+            if score == NO_FIX:
+                continue
+            if candidate < 0 or self.scores[candidate] == NO_FIX or \
+                    score > self.scores[candidate] + (self.switch_margin * 100 if candidate == best else 0):
+                candidate = index
+        if candidate >= 0 and self.scores[candidate] == NO_FIX:
+            candidate = -1
+        if candidate != best:
+            self.best = candidate
+            self.switches += 1
+            for callback in self.callbacks:
+                callback(self)
+
+    ########################################
+    # Time
+    ########################################
+    def merge_time(self, index, parser):
+        """Take a source's time if it is the first report of a newer UTC time"""
+        seconds = parser.epoch_seconds
+        if seconds < 0:
+            return
+        milliseconds = parser.epoch_ms
+        if self.epoch_seconds >= 0:
+            now = ticks_ms()
+            ahead = (seconds - self.epoch_seconds) * 1000 + milliseconds - self.epoch_ms
+            if ahead <= 0:
+                return  # Already known, or a lagging source
+            quiet = ticks_diff(now, self.time_ticks) > self.max_age_ms
+            if ahead > self.max_step_ms + ticks_diff(now, self.time_ticks) and not quiet:
+                self.rejected_times += 1
+                return
+        self.epoch_seconds = seconds
+        self.epoch_ms = milliseconds
+        self.time_ticks = ticks_ms()
+        self.time_source = index
+
+    def now(self):
+        """Current UTC as (seconds since 2000-01-01, milliseconds) carried forward from the merged time, or None
+        before any source reported one"""
+        if self.epoch_seconds < 0:
+            return None
+        total_ms = self.epoch_ms + ticks_diff(ticks_ms(), self.time_ticks)
+        seconds = total_ms // 1000
+        return self.epoch_seconds + seconds, total_ms - seconds * 1000
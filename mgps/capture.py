@@ -0,0 +1,213 @@
+"""
+# Capture - compact binary recording of raw receiver reads, with timestamped replay into NmeaParser
+# The MIT License (MIT) - see LICENSE file
+#
+# File layout: b'MGPC' and a version byte, followed by one record per read:
+#   varint  milliseconds since the previous read (since capture start for the first one)
+#   varint  length of the stored data
+#   varint  number of trailing 0x0A padding bytes removed from the read
+#   data
+"""
+
+from .ticks import ticks_ms, ticks_diff, sleep_ms
+
+MAGIC = b'MGPC'
+VERSION = 1
+
+# Idle padding the XA1110 returns when its buffer has no more data
+PADDING = 0x0A
+
+_READ_SIZE = 4096
+
+
+def encode_varint(value, target, position):
+    """Write an unsigned LEB128 varint into target at position. Returns the position after it"""
+    while value > 0x7F:
+        target[position] = (value & 0x7F) | 0x80
+        value >>= 7
+        position += 1
+    target[position] = value
+    return position + 1
+
+
+def decode_varint(source, position):
+    """Read an unsigned LEB128 varint from source at position. Returns (value, position after it), or
+    (-1, position) if source ends inside the varint"""
+    value = 0
+    shift = 0
+    end = len(source)
+    while position < end:
+        byte = source[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+    return -1, position
+
+
+class CaptureWriter(object):
+    """Records raw reads, e.g. from GPS.get_raw_bytes() or GPS.get_raw_data(), together with the time between reads.
+    With suppress_padding the trailing run of 0x0A idle padding is stored as a count instead of as data, which
+    shrinks the mostly empty 255 byte reads of an idle receiver to a few bytes"""
+
+    def __init__(self, target_file, suppress_padding=True):
+        self.handle = open(target_file, 'wb')
+        self.handle.write(MAGIC)
+        self.handle.write(bytes((VERSION,)))
+        self.suppress_padding = suppress_padding
+        self.header = bytearray(15)  # Room for 3 varints of up to 5 bytes
+        self.last_ticks = ticks_ms()
+        self.records = 0
+        self.read_bytes = 0
+        self.stored_bytes = 5
+
+    def record(self, chunk, ticks=None):
+        """Store one read. chunk is bytes-like or a str of byte values as returned by GPS.get_raw_data(). ticks
+        defaults to the current ticks_ms()"""
+        if isinstance(chunk, str):
+            chunk = bytes(ord(char) for char in chunk)
+        if ticks is None:
+            ticks = ticks_ms()
+        delta = ticks_diff(ticks, self.last_ticks)
+        self.last_ticks = ticks
+
+        length = len(chunk)
+        padding = 0
+        if self.suppress_padding:
+            while length > 0 and chunk[length - 1] == PADDING:
+                length -= 1
+            padding = len(chunk) - length
+
+        position = encode_varint(delta if delta > 0 else 0, self.header, 0)
+        position = encode_varint(length, self.header, position)
+        position = encode_varint(padding, self.header, position)
+        self.handle.write(memoryview(self.header)[:position])
+        if length:
+            self.handle.write(memoryview(chunk)[:length])
+
+        self.records += 1
+        self.read_bytes += len(chunk)
+        self.stored_bytes += position + length
+
+    def close(self):
+        """Close the capture file"""
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+
+class CaptureReader(object):
+    """Reads a capture back as (delta_ms, chunk) pairs, restoring the suppressed padding so the parser sees exactly
+    the bytes the receiver returned. Also usable as a read source in place of GPS.get_raw_bytes() through read()"""
+
+    def __init__(self, source_file):
+        self.handle = open(source_file, 'rb')
+        header = self.handle.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC or len(header) != len(MAGIC) + 1:
+            self.handle.close()
+            raise ValueError("Not a capture file")
+        if header[len(MAGIC)] != VERSION:
+            self.handle.close()
+            raise ValueError("Unsupported capture version")
+        self.data = b''
+        self.position = 0
+        self.padding = bytes((PADDING,)) * 255
+        self.records = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        record = self.next_record()
+        if record is None:
+            raise StopIteration
+        return record
+
+    def fill(self, needed):
+        """Make sure needed bytes past position are loaded. Returns False at the end of the file"""
+        while len(self.data) - self.position < needed:
+            more = self.handle.read(max(_READ_SIZE, needed))
+            if not more:
+                return False
+            self.data = self.data[self.position:] + more
+            self.position = 0
+        return True
+
+    def next_record(self):
+        """Next (delta_ms, chunk) pair, or None at the end of the capture"""
+        # Headers are at most 15 bytes, load enough for the largest unless the file is ending
+        self.fill(15)
+        start = self.position
+        delta, position = decode_varint(self.data, start)
+        length, position = decode_varint(self.data, position)
+        padding, position = decode_varint(self.data, position)
+        if padding < 0:
+            return None
+        self.position = position
+
+        if not self.fill(length):
+            return None
+        chunk = self.data[self.position:self.position + length]
+        self.position += length
+
+        if padding:
+            while len(self.padding) < padding:
+                self.padding += self.padding
+            chunk += self.padding[:padding]
+        self.records += 1
+        return delta, chunk
+
+    def read(self):
+        """Next chunk without its timing, b'' at the end of the capture"""
+        record = self.next_record()
+        if record is None:
+            return b''
+        return record[1]
+
+    def close(self):
+        """Close the capture file"""
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+
+def replay(parser, source_file, realtime=False, speed=1.0):
+    """Feed a capture into parser.feed(). With realtime the original time between reads is kept (divided by speed),
+    otherwise reads are fed as fast as possible. Returns the number of sentences parsed"""
+    reader = CaptureReader(source_file)
+    parsed = 0
+    try:
+        start = ticks_ms()
+        elapsed = 0
+        for delta, chunk in reader:
+            if realtime:
+                elapsed += delta
+                wait = int(elapsed / speed) - ticks_diff(ticks_ms(), start)
+                if wait > 0:
+                    sleep_ms(wait)
+            parsed += parser.feed(chunk)
+    finally:
+        reader.close()
+    return parsed
+
+
+async def replay_async(parser, source_file, realtime=True, speed=1.0):
+    """replay() as a coroutine, yielding to other tasks between reads"""
+    import asyncio
+    reader = CaptureReader(source_file)
+    parsed = 0
+    try:
+        start = ticks_ms()
+        elapsed = 0
+        for delta, chunk in reader:
+            if realtime:
+                elapsed += delta
+                wait = int(elapsed / speed) - ticks_diff(ticks_ms(), start)
+                await asyncio.sleep(wait / 1000 if wait > 0 else 0)
+            else:
+                await asyncio.sleep(0)
+            parsed += parser.feed(chunk)
+    finally:
+        reader.close()
+    return parsed
@@ -0,0 +1,237 @@
+"""
+# EpochAssembler - merges the RMC/GGA/GSA/ZDA sentences of one receiver epoch into a single Fix snapshot
+# The MIT License (MIT) - see LICENSE file
+"""
+
+from .nmea_parser import ddm_to_e7
+
+# Bits of Fix.sentences
+RMC = 1
+GGA = 2
+GSA = 4
+ZDA = 8
+
+_SENTENCE_BITS = {'RMC': RMC, 'GGA': GGA, 'GSA': GSA, 'ZDA': ZDA}
+
+# Milliseconds in a day
+DAY_MS = 86400000
+
+
+def elapsed_ms(time_ms, previous_ms):
+    """Milliseconds from previous_ms to time_ms, both milliseconds since midnight, as Fix.time_ms() has them.
+    Going back by more than half a day is taken as passing midnight"""
+    elapsed = time_ms - previous_ms
+    if elapsed < -DAY_MS // 2:
+        elapsed += DAY_MS
+    return elapsed
+
+
+class Fix(object):
+    """Snapshot of one receiver epoch. Written only by EpochAssembler, consumers must treat it as read only.
+    Position, motion and DOP are always fixed point ints, whatever mode the parser runs in:
+        hours, minutes, seconds, milliseconds: Timestamp as NmeaParser.timestamp has it (local_offset applied)
+        day, month: Date stamp as NmeaParser.date has it, year: 4 digit year as NmeaParser.year has it
+        epoch_seconds, epoch_ms: Validated UTC time as NmeaParser has it, -1 if unknown, see nmea_parser.rtc_tuple()
+        valid (bool): RMC data valid flag
+        fix_stat (int): GGA fix quality, fix_type (int): GSA fix type (1 none, 2 2D, 3 3D)
+        latitude_e7, longitude_e7: Signed 1e-7 degrees
+        altitude_cm, speed_mms, course_e2 (1/100 degree)
+        hdop_e2, pdop_e2, vdop_e2 (1/100), satellites_in_use
+        sentences: RMC | GGA | GSA | ZDA bits of the sentences merged into this fix
+        fix_time: NmeaParser.fix_time when the fix was completed
+    """
+
+    __slots__ = ('hours', 'minutes', 'seconds', 'milliseconds', 'day', 'month', 'year', 'valid', 'fix_stat',
+                 'fix_type', 'latitude_e7', 'longitude_e7', 'altitude_cm', 'speed_mms', 'course_e2', 'hdop_e2',
+                 'pdop_e2', 'vdop_e2', 'satellites_in_use', 'sentences', 'fix_time', 'epoch_seconds', 'epoch_ms')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Reset every field before the fix is reused for a new epoch"""
+        self.hours = 0
+        self.minutes = 0
+        self.seconds = 0
+        self.milliseconds = 0
+        self.day = 0
+        self.month = 0
+        self.year = 0
+        self.valid = False
+        self.fix_stat = 0
+        self.fix_type = 1
+        self.latitude_e7 = 0
+        self.longitude_e7 = 0
+        self.altitude_cm = 0
+        self.speed_mms = 0
+        self.course_e2 = 0
+        self.hdop_e2 = 0
+        self.pdop_e2 = 0
+        self.vdop_e2 = 0
+        self.satellites_in_use = 0
+        self.sentences = 0
+        self.fix_time = 0
+        self.epoch_seconds = -1
+        self.epoch_ms = 0
+
+    def time_ms(self):
+        """Timestamp as milliseconds since midnight"""
+        return (((self.hours * 60) + self.minutes) * 60 + self.seconds) * 1000 + self.milliseconds
+
+    def has_position(self):
+        """Check if the fix has a valid position, from the RMC status or the GGA fix quality"""
+        return self.valid or self.fix_stat > 0
+
+    def same_time(self, timestamp):
+        """Check if a NmeaParser timestamp belongs to this fix's epoch"""
+        return (self.hours == timestamp[0] and self.minutes == timestamp[1] and
+                self.seconds * 1000 + self.milliseconds == int(round(timestamp[2] * 1000)))
+
+
+class EpochAssembler(object):
+    """Groups the sentences a receiver sends for one UTC timestamp and emits them as one Fix, so consumers never
+    see RMC data of one second mixed with GGA data of another. A Fix is emitted once all sentence types in
+    sentences have been merged, or when a sentence for a new timestamp arrives first.
+    Fix objects come from a ring of pool_size preallocated snapshots, so an emitted Fix is only overwritten when
+    the epoch pool_size epochs later starts"""
+
+    def __init__(self, parser, sentences=('RMC', 'GGA', 'GSA'), pool_size=3):
+        self.parser = parser
+        self.required = 0
+        for sentence_type in sentences:
+            self.required |= _SENTENCE_BITS[sentence_type]
+        self.pool = [Fix() for _ in range(max(pool_size, 2))]
+        self.pool_index = 0
+        self.current = None
+        self.latest = None
+        self.epochs = 0
+        self.callbacks = []
+        self.listener = self.sentence
+        parser.add_listener(self.listener)
+
+    def close(self):
+        """Stop receiving sentences from the parser"""
+        self.parser.remove_listener(self.listener)
+
+    def add_callback(self, callback):
+        """Call callback(fix) with every emitted Fix"""
+        self.callbacks.append(callback)
+
+    def sentence(self, parser, sentence_type):
+        """NmeaParser listener, merges a parsed sentence into the current epoch"""
+        bit = _SENTENCE_BITS.get(sentence_type)
+        if bit is None:
+            return
+
+        current = self.current
+        if bit == GSA:
+            # GSA has no timestamp, it belongs to the epoch in progress
+            if current is None:
+                return
+        elif current is not None and not current.same_time(parser.timestamp):
+            self.emit()
+            current = None
+
+        if current is None:
+            current = self.start(parser.timestamp)
+
+        if bit == RMC:
+            self.merge_rmc(current, parser)
+        elif bit == GGA:
+            self.merge_gga(current, parser)
+        elif bit == ZDA:
+            self.merge_zda(current, parser)
+        else:
+            self.merge_gsa(current, parser)
+        current.sentences |= bit
+
+        if current.sentences & self.required == self.required:
+            self.emit()
+
+    def start(self, timestamp):
+        """Take the next Fix from the pool for a new epoch"""
+        self.pool_index = (self.pool_index + 1) % len(self.pool)
+        current = self.pool[self.pool_index]
+        current.clear()
+        current.hours = timestamp[0]
+        current.minutes = timestamp[1]
+        milliseconds = int(round(timestamp[2] * 1000))
+        current.seconds = milliseconds // 1000
+        current.milliseconds = milliseconds % 1000
+        self.current = current
+        return current
+
+    def emit(self):
+        """Publish the epoch in progress as the latest Fix"""
+        current = self.current
+        current.fix_time = self.parser.fix_time
+        self.current = None
+        self.latest = current
+        self.epochs += 1
+        for callback in self.callbacks:
+            callback(current)
+
+    ########################################
+    # Sentence Merging
+    ########################################
+    @staticmethod
+    def merge_rmc(fix, parser):
+        """Date, validity, position, speed and course"""
+        date = parser.date
+        fix.day = date[0]
+        fix.month = date[1]
+        fix.year = parser.year
+        fix.epoch_seconds = parser.epoch_seconds
+        fix.epoch_ms = parser.epoch_ms
+        fix.valid = parser.valid
+        if parser.fixed_point:
+            fix.latitude_e7 = parser.latitude_e7
+            fix.longitude_e7 = parser.longitude_e7
+            fix.speed_mms = parser.speed_mms
+            fix.course_e2 = parser.course_e2
+        else:
+            fix.latitude_e7 = ddm_to_e7(parser._latitude)
+            fix.longitude_e7 = ddm_to_e7(parser._longitude)
+            fix.speed_mms = int(round(parser.speed[0] * 514.444))
+            fix.course_e2 = int(round(parser.course * 100))
+
+    @staticmethod
+    def merge_gga(fix, parser):
+        """Fix quality, satellites in use, HDOP, position and altitude"""
+        fix.fix_stat = parser.fix_stat
+        fix.satellites_in_use = parser.satellites_in_use
+        if parser.fixed_point:
+            fix.hdop_e2 = parser.hdop_e2
+            if parser.fix_stat:
+                fix.latitude_e7 = parser.latitude_e7
+                fix.longitude_e7 = parser.longitude_e7
+                fix.altitude_cm = parser.altitude_cm
+        else:
+            fix.hdop_e2 = int(round(parser.hdop * 100))
+            if parser.fix_stat:
+                fix.latitude_e7 = ddm_to_e7(parser._latitude)
+                fix.longitude_e7 = ddm_to_e7(parser._longitude)
+                fix.altitude_cm = int(round(parser.altitude * 100))
+
+    @staticmethod
+    def merge_gsa(fix, parser):
+        """Fix type and DOPs"""
+        fix.fix_type = parser.fix_type
+        if parser.fixed_point:
+            fix.pdop_e2 = parser.pdop_e2
+            fix.hdop_e2 = parser.hdop_e2
+            fix.vdop_e2 = parser.vdop_e2
+        else:
+            fix.pdop_e2 = int(round(parser.pdop * 100))
+            fix.hdop_e2 = int(round(parser.hdop * 100))
+            fix.vdop_e2 = int(round(parser.vdop * 100))
+
+    @staticmethod
+    def merge_zda(fix, parser):
+        """Date with 4 digit year"""
+        date = parser.date
+        fix.day = date[0]
+        fix.month = date[1]
+        fix.year = parser.year
+        fix.epoch_seconds = parser.epoch_seconds
+        fix.epoch_ms = parser.epoch_ms
@@ -0,0 +1,108 @@
+"""
+# Framing - cutting receiver reads into sentences, with the checksum and start scan viper compiled on MicroPython
+# The MIT License (MIT) - see LICENSE file
+#
+# crc_xor() and find_start() are the pure Python versions below. On MicroPython ports with the viper emitter they
+# are replaced by the versions in framing_viper, which take the same arguments and return the same results. Elsewhere
+# than MicroPython crc_xor() is crc_xor_folded(). ACCELERATED tells whether the viper versions are in use,
+# crc_xor_python() and find_start_python() stay available for comparison. Compiled are the checksum and the scan for
+# the next '$' of the fixed buffer framer, which has no find() to use on a memoryview. The rest of the framing is
+# bytes.split() and find() in the callers, and SentenceBuffer.load() for fixed buffer mode, which stays Python.
+#
+# unpad(), unprintable() and printable() are shared by NmeaParser.feed(), reassembly.Reassembler and the pipeline
+# Framer.
+"""
+
+import sys
+
+# Characters NmeaParser.update() keeps and drops, for bytes.translate() where it exists (not on MicroPython)
+_PRINTABLE = bytes(range(10, 127))
+_UNPRINTABLE = bytes(range(10)) + bytes(range(127, 256))
+_TRANSLATE = hasattr(b'', 'translate')
+
+
+def unpad(part):
+    """Remove the idle padding the receiver returns when its buffer runs dry in the middle of a sentence, so the
+    two halves of the sentence join up again. part is the data following a '$'. NMEA sentences never contain a LF
+    before the end of their CRC digits, so any found there is padding. part is returned as is when it has none"""
+    newline = part.find(b'\n')
+    if newline < 0:
+        return part
+    star = part.find(b'*')
+    if 0 <= star and star + 3 <= newline:
+        return part
+    return part.replace(b'\n', b'')
+
+
+def unprintable(data):
+    """True when data (bytes) contains characters outside 10..126, which NmeaParser.update() drops. One pass that
+    deletes the printable characters where bytes.translate() exists, otherwise min() and max()"""
+    if _TRANSLATE:
+        return bool(data.translate(None, _PRINTABLE))
+    return bool(data) and (min(data) < 10 or max(data) > 126)
+
+
+def printable(data):
+    """data (bytes) without the characters outside 10..126, data itself when it has none"""
+    if not unprintable(data):
+        return data
+    if _TRANSLATE:
+        return data.translate(None, _UNPRINTABLE)
+    return bytes(char for char in data if 10 <= char <= 126)
+
+
+def crc_xor(buf, start, end):
+    """XOR of the bytes of buf[start:end], the NMEA checksum of a sentence body"""
+    if start or end != len(buf):
+        buf = buf[start:end]
+    crc = 0
+    for char in buf:
+        crc ^= char
+    return crc
+
+
+def find_start(buf, start, end):
+    """Position of the first '$' in buf[start:end], end if there is none"""
+    if not isinstance(buf, memoryview):
+        position = buf.find(b'$', start)
+        return end if position < 0 or position > end else position
+    # memoryview has no find() on MicroPython
+    while start < end and buf[start] != 36:
+        start += 1
+    return start
+
+
+def crc_xor_folded(buf, start, end):
+    """crc_xor() with buf[start:end] taken as one long int whose halves are XORed together until a byte is left, a
+    few long int operations instead of one loop iteration per byte. The long ints are allocated, so it's not used on
+    MicroPython"""
+    value = int.from_bytes(buf[start:end], 'little')
+    if end - start <= 128:
+        # Any sentence, folded in a fixed number of steps
+        value ^= value >> 512
+        value ^= value >> 256
+        value ^= value >> 128
+        value ^= value >> 64
+        value ^= value >> 32
+        value ^= value >> 16
+        value ^= value >> 8
+        return value & 0xFF
+    # Half the width in bits, the length rounded up to a power of two bytes
+    shift = 4 << (end - start - 1).bit_length()
+    while shift >= 8:
+        value ^= value >> shift
+        shift >>= 1
+    return value & 0xFF
+
+
+crc_xor_python = crc_xor
+find_start_python = find_start
+
+# Viper versions, only importable on MicroPython
+try:
+    from .framing_viper import crc_xor, find_start
+    ACCELERATED = True
+except (ImportError, SyntaxError, ValueError):
+    ACCELERATED = False
+    if sys.implementation.name != 'micropython':
+        crc_xor = crc_xor_folded
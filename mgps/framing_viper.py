@@ -0,0 +1,31 @@
+"""
+# Framing (viper) - MicroPython viper versions of framing.crc_xor() and framing.find_start(), see framing.py
+# The MIT License (MIT) - see LICENSE file
+#
+# Only imported through framing, which falls back to its pure Python version where this module can't be compiled.
+# Both versions must stay equivalent, bench_framing.py and tests/test_framing.py check they agree.
+"""
+
+import micropython
+
+
+@micropython.viper
+def crc_xor(buf, start: int, end: int) -> int:
+    data = ptr8(buf)
+    crc = 0
+    position = start
+    while position < end:
+        crc ^= int(data[position])
+        position += 1
+    return crc
+
+
+@micropython.viper
+def find_start(buf, start: int, end: int) -> int:
+    data = ptr8(buf)
+    position = start
+    while position < end:
+        if data[position] == 36:
+            return position
+        position += 1
+    return end
@@ -0,0 +1,215 @@
+"""
+# Geodesy - distance, bearing and ETA between fixes and targets, for single points and array columns
+# The MIT License (MIT) - see LICENSE file
+#
+# Coordinates are signed 1e-7 degree ints, as in epoch.Fix and FixHistory. Distances are on a sphere of the mean
+# earth radius, which is within 0.5% of the WGS84 ellipsoid.
+"""
+
+from array import array
+from math import asin, atan2, cos, degrees, sin, sqrt
+
+EARTH_RADIUS_M = 6371000
+
+# Metres per 1e-7 degree along a meridian
+METRES_PER_E7 = EARTH_RADIUS_M * 3.141592653589793 / 180 / 10000000
+
+_RADIANS_PER_E7 = 3.141592653589793 / 180 / 10000000
+_FULL_TURN_E7 = 3600000000
+_HALF_TURN_E7 = 1800000000
+
+
+def longitude_difference(longitude_e7, origin_e7):
+    """longitude_e7 - origin_e7 wrapped into -180..180 degrees"""
+    difference = longitude_e7 - origin_e7
+    if difference > _HALF_TURN_E7:
+        difference -= _FULL_TURN_E7
+    elif difference < -_HALF_TURN_E7:
+        difference += _FULL_TURN_E7
+    return difference
+
+
+def haversine_distance(latitude1_e7, longitude1_e7, latitude2_e7, longitude2_e7):
+    """Great circle distance in metres"""
+    latitude1 = latitude1_e7 * _RADIANS_PER_E7
+    latitude2 = latitude2_e7 * _RADIANS_PER_E7
+    half_north = (latitude2_e7 - latitude1_e7) * _RADIANS_PER_E7 / 2
+    half_east = longitude_difference(longitude2_e7, longitude1_e7) * _RADIANS_PER_E7 / 2
+    a = sin(half_north) ** 2 + cos(latitude1) * cos(latitude2) * sin(half_east) ** 2
+    return 2 * EARTH_RADIUS_M * asin(sqrt(min(a, 1.0)))
+
+
+def initial_bearing(latitude1_e7, longitude1_e7, latitude2_e7, longitude2_e7):
+    """Great circle bearing in degrees (0 north, 90 east) from the first point towards the second"""
+    latitude1 = latitude1_e7 * _RADIANS_PER_E7
+    latitude2 = latitude2_e7 * _RADIANS_PER_E7
+    east = longitude_difference(longitude2_e7, longitude1_e7) * _RADIANS_PER_E7
+    bearing = degrees(atan2(sin(east) * cos(latitude2),
+                            cos(latitude1) * sin(latitude2) - sin(latitude1) * cos(latitude2) * cos(east)))
+    return bearing + 360 if bearing < 0 else bearing
+
+
+def equirectangular_distance(latitude1_e7, longitude1_e7, latitude2_e7, longitude2_e7):
+    """Distance in metres on a plane scaled at the mean latitude. Accurate to well under 0.1% up to tens of km"""
+    east = longitude_difference(longitude2_e7, longitude1_e7) * \
+        cos((latitude1_e7 + latitude2_e7) * _RADIANS_PER_E7 / 2) * METRES_PER_E7
+    north = (latitude2_e7 - latitude1_e7) * METRES_PER_E7
+    return sqrt(east * east + north * north)
+
+
+def eta_seconds(distance_m, speed_mms, minimum_mms=500):
+    """Seconds to cover distance_m at speed_mms, or None when moving slower than minimum_mms"""
+    if speed_mms < minimum_mms:
+        return None
+    return int(distance_m * 1000 / speed_mms)
+
+
+class Navigator(object):
+    """Distance, bearing and ETA from the current position to targets.
+    Targets within fast_limit_m of the position use an equirectangular projection around the position, whose east
+    scale is cos(latitude) cached at the latitude it was last worked out for, and only refreshed once the position
+    has moved more than refresh_e7 (0.01 degrees by default) north or south. The cached sin(latitude) corrects the
+    scale to the mean latitude of each pair to first order. Targets further away fall back to haversine and the
+    great circle initial bearing.
+    The batch functions take array columns of target latitudes and longitudes, such as FixHistory columns, and
+    write into caller provided array('f') outputs so repeated queries don't allocate"""
+
+    def __init__(self, fast_limit_m=20000, refresh_e7=100000, minimum_mms=500):
+        self.fast_limit_m = fast_limit_m
+        self.refresh_e7 = refresh_e7
+        self.minimum_mms = minimum_mms
+
+        self.latitude_e7 = 0
+        self.longitude_e7 = 0
+        self.speed_mms = 0
+        self.valid = False
+
+        # Projection terms, cached at scale_latitude_e7
+        self.scale_latitude_e7 = 0
+        self.cos_latitude = 1.0
+        self.sin_latitude = 0.0
+        self.refreshes = 0
+
+    def attach(self, epochs):
+        """Follow the position of every Fix emitted by an EpochAssembler"""
+        epochs.add_callback(self.add_fix)
+
+    def add_fix(self, fix):
+        """Move to the position and speed of an epoch.Fix, ignoring fixes without a valid position"""
+        if fix.has_position():
+            self.set_position(fix.latitude_e7, fix.longitude_e7, fix.speed_mms)
+
+    def set_position(self, latitude_e7, longitude_e7, speed_mms=0):
+        """Set the current position and speed, refreshing the projection terms if needed"""
+        self.latitude_e7 = latitude_e7
+        self.longitude_e7 = longitude_e7
+        self.speed_mms = speed_mms
+        self.valid = True
+        if not self.refreshes or abs(latitude_e7 - self.scale_latitude_e7) > self.refresh_e7:
+            latitude = latitude_e7 * _RADIANS_PER_E7
+            self.cos_latitude = cos(latitude)
+            self.sin_latitude = sin(latitude)
+            self.scale_latitude_e7 = latitude_e7
+            self.refreshes += 1
+
+    ########################################
+    # Single Targets
+    ########################################
+    def offset(self, latitude_e7, longitude_e7):
+        """(east, north) metres from the position to a target on the local projection"""
+        north_e7 = latitude_e7 - self.latitude_e7
+        # cos() at the mean latitude of the pair, from the cached terms
+        scale = self.cos_latitude - self.sin_latitude * \
+            (self.latitude_e7 + north_e7 / 2 - self.scale_latitude_e7) * _RADIANS_PER_E7
+        east = longitude_difference(longitude_e7, self.longitude_e7) * scale * METRES_PER_E7
+        return east, north_e7 * METRES_PER_E7
+
+    def distance(self, latitude_e7, longitude_e7):
+        """Metres from the position to a target"""
+        east, north = self.offset(latitude_e7, longitude_e7)
+        distance = sqrt(east * east + north * north)
+        if distance > self.fast_limit_m:
+            return haversine_distance(self.latitude_e7, self.longitude_e7, latitude_e7, longitude_e7)
+        return distance
+
+    def bearing(self, latitude_e7, longitude_e7):
+        """Degrees (0 north, 90 east) from the position towards a target"""
+        return self.distance_bearing(latitude_e7, longitude_e7)[1]
+
+    def distance_bearing(self, latitude_e7, longitude_e7):
+        """(metres, degrees) from the position to a target"""
+        east, north = self.offset(latitude_e7, longitude_e7)
+        distance = sqrt(east * east + north * north)
+        if distance > self.fast_limit_m:
+            return (haversine_distance(self.latitude_e7, self.longitude_e7, latitude_e7, longitude_e7),
+                    initial_bearing(self.latitude_e7, self.longitude_e7, latitude_e7, longitude_e7))
+        bearing = degrees(atan2(east, north))
+        return distance, bearing + 360 if bearing < 0 else bearing
+
+    def eta(self, latitude_e7, longitude_e7):
+        """Seconds to reach a target in a straight line at the current speed, None when standing still"""
+        return eta_seconds(self.distance(latitude_e7, longitude_e7), self.speed_mms, self.minimum_mms)
+
+    ########################################
+    # Batches
+    ########################################
+    def distances(self, latitudes, longitudes, out=None, count=None):
+        """Metres from the position to the first count targets of the latitude and longitude columns (all of them
+        by default), written to out. Returns out, a new array('f') if none is given"""
+        if count is None:
+            count = len(latitudes)
+        if out is None:
+            out = array('f', [0.0] * count)
+        origin_latitude = self.latitude_e7
+        origin_longitude = self.longitude_e7
+        fast_limit = self.fast_limit_m
+        # Scale at the position, and its change per 1e-7 degree towards the target
+        scale = (self.cos_latitude - self.sin_latitude * (origin_latitude - self.scale_latitude_e7) *
+                 _RADIANS_PER_E7) * METRES_PER_E7
+        slope = self.sin_latitude * _RADIANS_PER_E7 * METRES_PER_E7 / 2
+
+        for index in range(count):
+            latitude_e7 = latitudes[index]
+            north_e7 = latitude_e7 - origin_latitude
+            east_e7 = longitudes[index] - origin_longitude
+            if east_e7 > _HALF_TURN_E7 or east_e7 < -_HALF_TURN_E7:
+                east_e7 = longitude_difference(longitudes[index], origin_longitude)
+            east = east_e7 * (scale - slope * north_e7)
+            north = north_e7 * METRES_PER_E7
+            distance = sqrt(east * east + north * north)
+            if distance > fast_limit:
+                distance = haversine_distance(origin_latitude, origin_longitude, latitude_e7, longitudes[index])
+            out[index] = distance
+        return out
+
+    def bearings(self, latitudes, longitudes, out=None, count=None):
+        """Degrees from the position towards the first count targets of the latitude and longitude columns, written
+        to out. Returns out, a new array('f') if none is given"""
+        if count is None:
+            count = len(latitudes)
+        if out is None:
+            out = array('f', [0.0] * count)
+        for index in range(count):
+            out[index] = self.distance_bearing(latitudes[index], longitudes[index])[1]
+        return out
+
+    def nearest(self, latitudes, longitudes, count=None):
+        """(index, metres) of the target closest to the position, or (-1, None) without targets. Ranks by squared
+        distance on the local projection, so only the winner is measured exactly"""
+        if count is None:
+            count = len(latitudes)
+        origin_latitude = self.latitude_e7
+        origin_longitude = self.longitude_e7
+        east_scale = self.cos_latitude
+        best = -1
+        best_squared = 0.0
+        for index in range(count):
+            north = latitudes[index] - origin_latitude
+            east = longitude_difference(longitudes[index], origin_longitude) * east_scale
+            squared = east * east + north * north
+            if best < 0 or squared < best_squared:
+                best = index
+                best_squared = squared
+        if best < 0:
+            return -1, None
+        return best, self.distance(latitudes[best], longitudes[best])
@@ -0,0 +1,285 @@
+"""
+# Geofence - enter/exit events for circle and polygon fences, looked up through a uniform lat/lon grid
+# The MIT License (MIT) - see LICENSE file
+#
+# Fence file (JSON, decimal degrees, radius in metres):
+#   {"fences": [{"name": "depot", "circle": [-37.8136, 144.9631, 250]},
+#               {"name": "yard", "polygon": [[-37.81, 144.96], [-37.81, 144.97], [-37.82, 144.97]]}]}
+# Fences must not cross the antimeridian.
+"""
+
+from array import array
+from math import cos, radians
+
+try:
+    import json
+except ImportError:
+    import ujson as json
+
+from .geodesy import METRES_PER_E7
+
+# Fence kinds
+CIRCLE = 0
+POLYGON = 1
+
+# Events passed to callbacks
+ENTER = 1
+EXIT = 2
+
+
+class GeofenceSet(object):
+    """Circle and polygon fences checked against each fix.
+    Fences are added with add_circle()/add_polygon() or load(), then build() buckets them into a grid of cell_e7
+    (1e-7 degree) square cells covering their bounding boxes, so a fix only tests the few fences whose bounding
+    box overlaps its cell. When the fences span too many cells for max_cells, the cells are made larger.
+    Vertices live in one flat array('i') of latitude/longitude pairs, bounding boxes in array('i') columns and each
+    cell's fences in an array('H'), so thousands of fences fit in a few hundred kB instead of lists of tuples.
+    check() fires callback(event, index, name) with ENTER or EXIT for every fence whose state changed"""
+
+    def __init__(self, cell_e7=1000000, max_cells=4096):
+        self.requested_cell_e7 = cell_e7
+        self.cell_e7 = cell_e7  # Cell size in use, may be larger after build()
+        self.max_cells = max_cells
+
+        # Fences, by index
+        self.names = []
+        self.kinds = bytearray()
+        self.first_vertex = array('I')  # Offset of the fence's first vertex pair in vertices
+        self.vertex_counts = array('H')
+        self.radii = array('f')  # Circles only, 0 for polygons
+        self.vertices = array('i')  # latitude_e7, longitude_e7 pairs, the centre of circles
+        self.south = array('i')
+        self.north = array('i')
+        self.west = array('i')
+        self.east = array('i')
+
+        # Grid, from build()
+        self.grid_south = 0
+        self.grid_west = 0
+        self.rows = 0
+        self.columns = 0
+        self.cells = dict()  # row * columns + column: array('H') of fence indexes
+        self.built = False
+
+        # Fix state
+        self.inside = bytearray()
+        self.inside_list = []
+        self.callbacks = []
+        self.checks = 0
+        self.tests = 0  # Exact containment tests, for measuring the index
+
+    def __len__(self):
+        return len(self.names)
+
+    ########################################
+    # Fences
+    ########################################
+    def add_circle(self, name, latitude_e7, longitude_e7, radius_m):
+        """Add a circle around a centre. Returns the fence index"""
+        north_e7 = int(radius_m / METRES_PER_E7) + 1
+        east_e7 = int(radius_m / (METRES_PER_E7 * max(cos(radians(latitude_e7 / 10000000)), 0.01))) + 1
+        return self.add_fence(name, CIRCLE, ((latitude_e7, longitude_e7),), radius_m,
+                              latitude_e7 - north_e7, latitude_e7 + north_e7,
+                              longitude_e7 - east_e7, longitude_e7 + east_e7)
+
+    def add_polygon(self, name, vertices):
+        """Add a polygon from a sequence of (latitude_e7, longitude_e7) vertices, closed implicitly. Returns the
+        fence index"""
+        if len(vertices) < 3:
+            raise ValueError("A polygon needs at least 3 vertices")
+        latitudes = [vertex[0] for vertex in vertices]
+        longitudes = [vertex[1] for vertex in vertices]
+        return self.add_fence(name, POLYGON, vertices, 0.0,
+                              min(latitudes), max(latitudes), min(longitudes), max(longitudes))
+
+    def add_fence(self, name, kind, vertices, radius_m, south, north, west, east):
+        """Store a fence, the grid has to be rebuilt afterwards"""
+        index = len(self.names)
+        if index >= 0xFFFF:
+            raise ValueError("Too many fences")
+        self.names.append(name)
+        self.kinds.append(kind)
+        self.first_vertex.append(len(self.vertices))
+        self.vertex_counts.append(len(vertices))
+        self.radii.append(radius_m)
+        for latitude_e7, longitude_e7 in vertices:
+            self.vertices.append(latitude_e7)
+            self.vertices.append(longitude_e7)
+        self.south.append(south)
+        self.north.append(north)
+        self.west.append(west)
+        self.east.append(east)
+        self.inside.append(0)
+        self.built = False
+        return index
+
+    def load(self, source_file):
+        """Add the fences of a JSON fence file and build the grid. Returns the number of fences loaded"""
+        with open(source_file) as handle:
+            fences = json.load(handle)['fences']
+        for fence in fences:
+            name = fence.get('name', '')
+            if 'circle' in fence:
+                latitude, longitude, radius = fence['circle']
+                self.add_circle(name, int(round(latitude * 10000000)), int(round(longitude * 10000000)), radius)
+            else:
+                self.add_polygon(name, [(int(round(vertex[0] * 10000000)), int(round(vertex[1] * 10000000)))
+                                        for vertex in fence['polygon']])
+        self.build()
+        return len(fences)
+
+    ########################################
+    # Grid
+    ########################################
+    def build(self):
+        """Bucket the fences into grid cells by bounding box"""
+        self.cells = dict()
+        self.built = True
+        if not self.names:
+            self.rows = self.columns = 0
+            return
+
+        self.grid_south = min(self.south)
+        self.grid_west = min(self.west)
+        height = max(self.north) - self.grid_south
+        width = max(self.east) - self.grid_west
+        cell = self.requested_cell_e7
+        while (height // cell + 1) * (width // cell + 1) > self.max_cells:
+            cell *= 2
+        self.cell_e7 = cell
+        self.rows = height // cell + 1
+        self.columns = width // cell + 1
+
+        buckets = dict()
+        for index in range(len(self.names)):
+            first_row = (self.south[index] - self.grid_south) // cell
+            last_row = (self.north[index] - self.grid_south) // cell
+            first_column = (self.west[index] - self.grid_west) // cell
+            last_column = (self.east[index] - self.grid_west) // cell
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    key = row * self.columns + column
+                    bucket = buckets.get(key)
+                    if bucket is None:
+                        buckets[key] = bucket = []
+                    bucket.append(index)
+
+        for key, bucket in buckets.items():
+            self.cells[key] = array('H', bucket)
+
+    def cell_fences(self, latitude_e7, longitude_e7):
+        """Fence indexes of the cell containing a position, or None outside the grid"""
+        row = (latitude_e7 - self.grid_south) // self.cell_e7
+        column = (longitude_e7 - self.grid_west) // self.cell_e7
+        if not (0 <= row < self.rows and 0 <= column < self.columns):
+            return None
+        return self.cells.get(row * self.columns + column)
+
+    ########################################
+    # Containment
+    ########################################
+    def contains(self, index, latitude_e7, longitude_e7):
+        """Check if a position is inside a fence"""
+        self.tests += 1
+        vertices = self.vertices
+        first = self.first_vertex[index]
+
+        if self.kinds[index] == CIRCLE:
+            centre_latitude = vertices[first]
+            north = (latitude_e7 - centre_latitude) * METRES_PER_E7
+            east = (longitude_e7 - vertices[first + 1]) * METRES_PER_E7 * \
+                cos(radians((latitude_e7 + centre_latitude) / 20000000))
+            radius = self.radii[index]
+            return east * east + north * north <= radius * radius
+
+        # Even-odd rule, casting a ray towards the east
+        inside = False
+        last = first + 2 * (self.vertex_counts[index] - 1)
+        previous_latitude = vertices[last]
+        previous_longitude = vertices[last + 1]
+        for position in range(first, last + 2, 2):
+            vertex_latitude = vertices[position]
+            vertex_longitude = vertices[position + 1]
+            if (vertex_latitude > latitude_e7) != (previous_latitude > latitude_e7):
+                crossing = vertex_longitude + (previous_longitude - vertex_longitude) * \
+                    (latitude_e7 - vertex_latitude) / (previous_latitude - vertex_latitude)
+                if longitude_e7 < crossing:
+                    inside = not inside
+            previous_latitude = vertex_latitude
+            previous_longitude = vertex_longitude
+        return inside
+
+    def fences_at(self, latitude_e7, longitude_e7):
+        """Indexes of the fences containing a position"""
+        if not self.built:
+            self.build()
+        candidates = self.cell_fences(latitude_e7, longitude_e7)
+        if candidates is None:
+            return []
+        south = self.south
+        north = self.north
+        west = self.west
+        east = self.east
+        found = []
+        for index in candidates:
+            if south[index] <= latitude_e7 <= north[index] and west[index] <= longitude_e7 <= east[index] and \
+                    self.contains(index, latitude_e7, longitude_e7):
+                found.append(index)
+        return found
+
+    ########################################
+    # Events
+    ########################################
+    def attach(self, epochs):
+        """Check the position of every Fix emitted by an EpochAssembler"""
+        epochs.add_callback(self.add_fix)
+
+    def add_callback(self, callback):
+        """Call callback(event, index, name) for every ENTER and EXIT"""
+        self.callbacks.append(callback)
+
+    def add_fix(self, fix):
+        """check() an epoch.Fix, ignoring fixes without a valid position"""
+        if fix.has_position():
+            self.check(fix.latitude_e7, fix.longitude_e7)
+
+    def check(self, latitude_e7, longitude_e7):
+        """Update which fences contain the position and fire the ENTER and EXIT events. Returns the number of
+        events"""
+        self.checks += 1
+        inside = self.inside
+        found = self.fences_at(latitude_e7, longitude_e7)
+        events = 0
+
+        # Flag 2 marks fences still inside, everything left at 1 was exited
+        for index in found:
+            if inside[index]:
+                inside[index] = 2
+            else:
+                inside[index] = 2
+                self.inside_list.append(index)
+                events += 1
+                self.fire(ENTER, index)
+
+        remaining = []
+        for index in self.inside_list:
+            if inside[index] == 2:
+                inside[index] = 1
+                remaining.append(index)
+            else:
+                inside[index] = 0
+                events += 1
+                self.fire(EXIT, index)
+        self.inside_list = remaining
+        return events
+
+    def fire(self, event, index):
+        """Pass an event to the callbacks"""
+        for callback in self.callbacks:
+            callback(event, index, self.names[index])
+
+    def reset(self):
+        """Forget which fences contain the position, without firing EXIT events"""
+        for index in self.inside_list:
+            self.inside[index] = 0
+        self.inside_list = []
@@ -0,0 +1,189 @@
+"""
+# FixHistory - fixed capacity ring buffer of recent fixes stored in parallel array columns
+# The MIT License (MIT) - see LICENSE file
+"""
+
+from array import array
+
+# Column indexes
+TIME = 0       # Milliseconds since midnight of the fix timestamp
+LATITUDE = 1   # Signed 1e-7 degrees
+LONGITUDE = 2  # Signed 1e-7 degrees
+ALTITUDE = 3   # cm
+SPEED = 4      # mm/s
+HDOP = 5       # 1/100
+
+# Columns with rolling mean/min/max
+_STATISTICS = (ALTITUDE, SPEED, HDOP)
+
+
+class FixHistory(object):
+    """Ring buffer of the last capacity fixes, at most 65536. Each field lives in its own array column, so N fixes
+    cost about 23 * N bytes (4 bytes for time, position, altitude and speed, 2 for HDOP, 1 for the valid flag), plus
+    12 * N for the min/max queues, instead of N Python objects. Rolling mean/min/max of altitude, speed and HDOP
+    over the valid fixes in the buffer are kept up to date on every append: sums for the means, and for min/max a
+    monotonic queue of slots per column, so no append ever rescans the buffer.
+    Slots are addressed by index 0 (oldest) to len() - 1 (newest). Columns can be read without copying through
+    column() or segments()"""
+
+    def __init__(self, capacity=60):
+        self.capacity = capacity
+        self.columns = (array('i', [0] * capacity),  # TIME
+                        array('i', [0] * capacity),  # LATITUDE
+                        array('i', [0] * capacity),  # LONGITUDE
+                        array('i', [0] * capacity),  # ALTITUDE
+                        array('i', [0] * capacity),  # SPEED
+                        array('H', [0] * capacity))  # HDOP
+        self.valid = bytearray(capacity)
+        self.head = 0  # Slot the next fix is written to
+        self.count = 0
+        self.valid_count = 0
+        self.last_valid = -1  # Slot of the newest valid fix, -1 if there is none
+
+        # Rolling statistics over the valid fixes, per column index
+        self.sums = [0] * len(self.columns)
+
+        # Min and max queues, two per statistics column, each a ring of capacity slots in extremes. A min queue holds
+        # the slots of the valid fixes that are still the minimum of some newer window, oldest first, so their
+        # values increase and the first one is the minimum. Max queues are the same with values decreasing
+        self.extremes = array('H', [0] * (2 * len(_STATISTICS) * capacity))
+        self.fronts = [0] * (2 * len(_STATISTICS))
+        self.lengths = [0] * (2 * len(_STATISTICS))
+
+    def __len__(self):
+        return self.count
+
+    def attach(self, epochs):
+        """Append every Fix emitted by an EpochAssembler"""
+        epochs.add_callback(self.add_fix)
+
+    def add_fix(self, fix):
+        """Append an epoch.Fix"""
+        self.append(fix.time_ms(), fix.latitude_e7, fix.longitude_e7, fix.altitude_cm, fix.speed_mms, fix.hdop_e2,
+                    fix.has_position())
+
+    def append(self, time_ms, latitude_e7, longitude_e7, altitude_cm, speed_mms, hdop_e2, valid=True):
+        """Append a fix in amortized O(1), overwriting the oldest one once the buffer is full"""
+        slot = self.head
+        columns = self.columns
+
+        # Drop the oldest fix from the statistics, it can only be first in the queues
+        if self.count == self.capacity and self.valid[slot]:
+            self.valid[slot] = 0
+            self.valid_count -= 1
+            for index in _STATISTICS:
+                self.sums[index] -= columns[index][slot]
+            for queue in range(len(self.fronts)):
+                if self.lengths[queue] and self.extremes[queue * self.capacity + self.fronts[queue]] == slot:
+                    self.fronts[queue] = (self.fronts[queue] + 1) % self.capacity
+                    self.lengths[queue] -= 1
+            if self.last_valid == slot:
+                self.last_valid = -1
+
+        columns[TIME][slot] = time_ms
+        columns[LATITUDE][slot] = latitude_e7
+        columns[LONGITUDE][slot] = longitude_e7
+        columns[ALTITUDE][slot] = altitude_cm
+        columns[SPEED][slot] = speed_mms
+        columns[HDOP][slot] = hdop_e2
+
+        self.head = (slot + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+        if valid:
+            self.valid[slot] = 1
+            self.valid_count += 1
+            self.last_valid = slot
+            for queue, index in enumerate(_STATISTICS):
+                self.sums[index] += columns[index][slot]
+                self.enqueue(2 * queue, columns[index], slot, False)
+                self.enqueue(2 * queue + 1, columns[index], slot, True)
+        else:
+            self.valid[slot] = 0
+
+    def enqueue(self, queue, column, slot, maximum):
+        """Add the newest slot to a min or max queue, first dropping the slots it is at least as good as. Each slot
+        is added and dropped once, so this is amortized O(1)"""
+        extremes = self.extremes
+        base = queue * self.capacity
+        front = self.fronts[queue]
+        length = self.lengths[queue]
+        value = column[slot]
+        while length:
+            last = column[extremes[base + (front + length - 1) % self.capacity]]
+            if (last > value) if maximum else (last < value):
+                break
+            length -= 1
+        extremes[base + (front + length) % self.capacity] = slot
+        self.lengths[queue] = length + 1
+
+    def extreme(self, column, maximum):
+        """First slot of the min or max queue of a statistics column"""
+        queue = 2 * _STATISTICS.index(column) + maximum
+        return self.extremes[queue * self.capacity + self.fronts[queue]]
+
+    def clear(self):
+        """Forget all fixes"""
+        self.head = 0
+        self.count = 0
+        self.valid_count = 0
+        self.last_valid = -1
+        for slot in range(self.capacity):
+            self.valid[slot] = 0
+        for index in range(len(self.columns)):
+            self.sums[index] = 0
+        for queue in range(len(self.fronts)):
+            self.fronts[queue] = 0
+            self.lengths[queue] = 0
+
+    ########################################
+    # Queries
+    ########################################
+    def slot(self, index):
+        """Ring slot of the index-th fix, 0 being the oldest and -1 the newest"""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError
+        return (self.head - self.count + index) % self.capacity
+
+    def value(self, column, index=-1):
+        """Value of a column for the index-th fix, newest by default"""
+        return self.columns[column][self.slot(index)]
+
+    def is_valid(self, index=-1):
+        """Check if the index-th fix, newest by default, was valid"""
+        return bool(self.valid[self.slot(index)])
+
+    def last_valid_value(self, column):
+        """Value of a column for the newest valid fix, None if there is none"""
+        if self.last_valid < 0:
+            return None
+        return self.columns[column][self.last_valid]
+
+    def column(self, column):
+        """memoryview of a whole column in ring slot order, see slot()"""
+        return memoryview(self.columns[column])
+
+    def segments(self, column):
+        """Column as two memoryviews that together hold the fixes from oldest to newest"""
+        view = memoryview(self.columns[column])
+        start = (self.head - self.count) % self.capacity
+        if start + self.count <= self.capacity:
+            return view[start:start + self.count], view[0:0]
+        return view[start:], view[:self.head]
+
+    def mean(self, column):
+        """Mean of ALTITUDE, SPEED or HDOP over the valid fixes, None if there are none"""
+        if not self.valid_count:
+            return None
+        return self.sums[column] / self.valid_count
+
+    def minimum(self, column):
+        """Minimum of ALTITUDE, SPEED or HDOP over the valid fixes, None if there are none"""
+        return self.columns[column][self.extreme(column, False)] if self.valid_count else None
+
+    def maximum(self, column):
+        """Maximum of ALTITUDE, SPEED or HDOP over the valid fixes, None if there are none"""
+        return self.columns[column][self.extreme(column, True)] if self.valid_count else None
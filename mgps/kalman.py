@@ -0,0 +1,242 @@
+"""
+# KalmanSmoother - constant velocity Kalman filter smoothing the position and velocity of fixes
+# The MIT License (MIT) - see LICENSE file
+"""
+
+from array import array
+from math import atan2, cos, degrees, radians, sin, sqrt
+
+from .epoch import RMC, elapsed_ms
+from .geodesy import METRES_PER_E7
+
+# Indexes into KalmanSmoother.state
+X = 0    # m east of the origin
+Y = 1    # m north of the origin
+VX = 2   # m/s east
+VY = 3   # m/s north
+P00 = 4  # Position variance (m^2), the same for both axes
+P01 = 5  # Position/velocity covariance
+P11 = 6  # Velocity variance (m^2/s^2)
+
+
+class KalmanSmoother(object):
+    """Smooths fixes with a constant velocity model on a local tangent plane, east and north metres around an
+    origin near the fixes. Both axes see the same HDOP derived measurement noise and the same process noise, so they
+    share one 2x2 covariance and an update is a few dozen float operations in a preallocated array('f'), whatever
+    the length of the track.
+    Measurement noise is (hdop * uere_m) ** 2 / 2 per axis, process noise is white acceleration of acceleration_m
+    m/s^2. When the fix has RMC speed and course, the Doppler velocity is applied as a second measurement with
+    velocity_m (m/s) noise per axis, which is far better than the velocity the positions imply. A gap of more than
+    max_gap_ms, or a fix out of order, restarts the filter at the measured position.
+    The origin moves to the current position once it is more than recentre_m away, which keeps float32 precision
+    at the millimetre level.
+    latitude_e7, longitude_e7, speed_mms and course_e2 hold the smoothed values, raw_latitude_e7, raw_longitude_e7,
+    raw_speed_mms and raw_course_e2 the last measured ones and error_m the 1 sigma position uncertainty per axis"""
+
+    def __init__(self, uere_m=4.0, acceleration_m=1.0, velocity_m=0.3, max_gap_ms=10000, recentre_m=10000):
+        self.uere_m = uere_m
+        self.velocity_noise = velocity_m * velocity_m
+        self.acceleration_m = acceleration_m
+        self.max_gap_ms = max_gap_ms
+        self.recentre_m = recentre_m
+        self.state = array('f', [0.0] * 7)
+
+        # Local tangent plane origin
+        self.origin_latitude_e7 = 0
+        self.origin_longitude_e7 = 0
+        self.east_metres_per_e7 = METRES_PER_E7
+
+        self.time_ms = -1  # Time of day of the last update, -1 before the first fix
+        self.updates = 0
+        self.restarts = 0
+        self.callbacks = []
+
+        # Smoothed
+        self.latitude_e7 = 0
+        self.longitude_e7 = 0
+        self.speed_mms = 0
+        self.course_e2 = 0
+        self.error_m = 0.0
+
+        # Measured
+        self.raw_latitude_e7 = 0
+        self.raw_longitude_e7 = 0
+        self.raw_speed_mms = 0
+        self.raw_course_e2 = 0
+
+    def attach(self, epochs):
+        """Smooth every Fix emitted by an EpochAssembler"""
+        epochs.add_callback(self.add_fix)
+
+    def add_callback(self, callback):
+        """Call callback(smoother) after every update"""
+        self.callbacks.append(callback)
+
+    def add_fix(self, fix):
+        """Update with an epoch.Fix, ignoring fixes without a valid position"""
+        if not fix.has_position():
+            return
+        if fix.sentences & RMC:
+            speed_mms = fix.speed_mms
+            course_e2 = fix.course_e2
+        else:
+            speed_mms = None
+            course_e2 = 0
+        self.update(fix.time_ms(), fix.latitude_e7, fix.longitude_e7, fix.hdop_e2, speed_mms, course_e2)
+
+    def reset(self):
+        """Forget the track, the next fix restarts the filter"""
+        self.time_ms = -1
+
+    def update(self, time_ms, latitude_e7, longitude_e7, hdop_e2=0, speed_mms=None, course_e2=0):
+        """Update the filter with a measured position at time_ms, milliseconds since midnight, and the measured
+        velocity unless speed_mms is None. An unknown HDOP (0) is taken as 2.0"""
+        self.raw_latitude_e7 = latitude_e7
+        self.raw_longitude_e7 = longitude_e7
+        if speed_mms is not None:
+            self.raw_speed_mms = speed_mms
+            self.raw_course_e2 = course_e2
+
+        hdop = hdop_e2 / 100 if hdop_e2 > 0 else 2.0
+        noise = hdop * self.uere_m
+        noise = noise * noise / 2
+
+        elapsed = elapsed_ms(time_ms, self.time_ms) if self.time_ms >= 0 else -1
+        self.time_ms = time_ms
+
+        if elapsed <= 0 or elapsed > self.max_gap_ms:
+            self.restart(latitude_e7, longitude_e7, noise)
+        else:
+            self.step(elapsed / 1000, latitude_e7, longitude_e7, noise)
+        if speed_mms is not None:
+            course = radians(course_e2 / 100)
+            self.correct_velocity(speed_mms / 1000 * sin(course), speed_mms / 1000 * cos(course))
+
+        self.updates += 1
+        self.publish()
+        for callback in self.callbacks:
+            callback(self)
+
+    ########################################
+    # Filter
+    ########################################
+    def restart(self, latitude_e7, longitude_e7, noise):
+        """Start over at a measured position, standing still until a velocity is known"""
+        self.set_origin(latitude_e7, longitude_e7)
+        state = self.state
+        state[X] = 0.0
+        state[Y] = 0.0
+        state[VX] = 0.0
+        state[VY] = 0.0
+        state[P00] = noise
+        state[P01] = 0.0
+        state[P11] = 900.0  # Up to about 30 m/s
+        self.restarts += 1
+
+    def step(self, dt, latitude_e7, longitude_e7, noise):
+        """Predict dt seconds ahead and correct with a measured position"""
+        state = self.state
+        east_e7 = longitude_e7 - self.origin_longitude_e7
+        if east_e7 > 1800000000:
+            east_e7 -= 3600000000  # Across the antimeridian
+        elif east_e7 < -1800000000:
+            east_e7 += 3600000000
+        measured_x = east_e7 * self.east_metres_per_e7
+        measured_y = (latitude_e7 - self.origin_latitude_e7) * METRES_PER_E7
+
+        # Predict
+        dt2 = dt * dt
+        q = self.acceleration_m * self.acceleration_m
+        p00 = state[P00]
+        p01 = state[P01]
+        p11 = state[P11]
+        p00 += 2 * dt * p01 + dt2 * p11 + q * dt2 * dt2 / 4
+        p01 += dt * p11 + q * dt2 * dt / 2
+        p11 += q * dt2
+        x = state[X] + state[VX] * dt
+        y = state[Y] + state[VY] * dt
+
+        # Correct, the same gains apply to both axes
+        gain_position = p00 / (p00 + noise)
+        gain_velocity = p01 / (p00 + noise)
+        residual_x = measured_x - x
+        residual_y = measured_y - y
+        state[X] = x + gain_position * residual_x
+        state[Y] = y + gain_position * residual_y
+        state[VX] += gain_velocity * residual_x
+        state[VY] += gain_velocity * residual_y
+        state[P00] = (1 - gain_position) * p00
+        state[P01] = (1 - gain_position) * p01
+        state[P11] = p11 - gain_velocity * p01
+
+        if abs(state[X]) > self.recentre_m or abs(state[Y]) > self.recentre_m:
+            self.recentre()
+
+    def correct_velocity(self, measured_vx, measured_vy):
+        """Correct with a measured velocity, the same gains apply to both axes"""
+        state = self.state
+        p01 = state[P01]
+        p11 = state[P11]
+        gain_position = p01 / (p11 + self.velocity_noise)
+        gain_velocity = p11 / (p11 + self.velocity_noise)
+        residual_x = measured_vx - state[VX]
+        residual_y = measured_vy - state[VY]
+        state[X] += gain_position * residual_x
+        state[Y] += gain_position * residual_y
+        state[VX] += gain_velocity * residual_x
+        state[VY] += gain_velocity * residual_y
+        state[P00] -= gain_position * p01
+        state[P01] = (1 - gain_velocity) * p01
+        state[P11] = (1 - gain_velocity) * p11
+
+    def set_origin(self, latitude_e7, longitude_e7):
+        """Move the tangent plane origin, caching the east scale at its latitude"""
+        self.origin_latitude_e7 = latitude_e7
+        self.origin_longitude_e7 = longitude_e7
+        self.east_metres_per_e7 = METRES_PER_E7 * cos(radians(latitude_e7 / 10000000))
+
+    def recentre(self):
+        """Move the origin to the current estimate"""
+        state = self.state
+        latitude_e7, longitude_e7 = self.position_e7()
+        self.set_origin(latitude_e7, longitude_e7)
+        state[X] = 0.0
+        state[Y] = 0.0
+
+    ########################################
+    # Results
+    ########################################
+    def position_e7(self):
+        """Estimated (latitude_e7, longitude_e7)"""
+        state = self.state
+        latitude_e7 = self.origin_latitude_e7 + int(round(state[Y] / METRES_PER_E7))
+        if self.east_metres_per_e7 > 0:
+            longitude_e7 = self.origin_longitude_e7 + int(round(state[X] / self.east_metres_per_e7))
+            if longitude_e7 > 1800000000:
+                longitude_e7 -= 3600000000
+            elif longitude_e7 < -1800000000:
+                longitude_e7 += 3600000000
+        else:
+            longitude_e7 = self.origin_longitude_e7
+        return latitude_e7, longitude_e7
+
+    def publish(self):
+        """Update the smoothed values from the state"""
+        state = self.state
+        self.latitude_e7, self.longitude_e7 = self.position_e7()
+        speed = sqrt(state[VX] * state[VX] + state[VY] * state[VY])
+        self.speed_mms = int(speed * 1000)
+        # Keep the last course while standing still
+        if self.speed_mms > 0:
+            self.course_e2 = int(round(degrees(atan2(state[VX], state[VY])) * 100)) % 36000
+        self.error_m = sqrt(state[P00]) if state[P00] > 0 else 0.0
+
+    @property
+    def latitude(self):
+        """Smoothed latitude in decimal degrees"""
+        return self.latitude_e7 / 10000000
+
+    @property
+    def longitude(self):
+        """Smoothed longitude in decimal degrees"""
+        return self.longitude_e7 / 10000000
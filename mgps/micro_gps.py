@@ -1,4 +1,5 @@
 from .micro_i2c import MicroPythonI2C
+from .reassembly import Reassembler
 import machine
 class GPS(object):
     MAX_I2C_BUFFER = 32
@@ -23,41 +24,29 @@ class GPS(object):
     def __init__(self):
         self._i2c = MicroPythonI2C()
         self.address = 0x10  # same as address at i2c.scan()[0]
+        self.reassembler = Reassembler()
 
 
     def get_raw_data(self):
-        raw_sentences = ""
+        """get_raw_bytes() as a str of byte values"""
+        return ''.join(chr(raw_byte) for raw_byte in self.get_raw_bytes())
+    def get_raw_bytes(self):
+        """Read up to MAX_GPS_BUFFER bytes from the receiver as a single bytearray, for NmeaParser.feed(). Stops at
+        the first block that ends in idle padding, the receiver has nothing more to send"""
+        raw_data = bytearray()
         buffer_tracker = self.MAX_GPS_BUFFER
-        raw_data = []
         while buffer_tracker != 0:
-            if buffer_tracker > self.MAX_I2C_BUFFER:
-                raw_data += self._i2c.readBlock(self.address, 0x00, self.MAX_I2C_BUFFER)
-                buffer_tracker = buffer_tracker - self.MAX_I2C_BUFFER
-                if raw_data[0] == 0x0A:
-                    break
-            elif buffer_tracker < self.MAX_I2C_BUFFER:
-                raw_data += self._i2c.readBlock(self.address, 0x00, buffer_tracker)
-                buffer_tracker = 0
-                if raw_data[0] == 0x0A:
-                    break
-            for raw_bytes in raw_data:
-                raw_sentences = raw_sentences + chr(raw_bytes)
-        return raw_sentences
+            block_size = min(buffer_tracker, self.MAX_I2C_BUFFER)
+            raw_data += self._i2c.readBlock(self.address, 0x00, block_size)
+            buffer_tracker = buffer_tracker - block_size
+            # A sentence ends in CR LF, a LF after anything else is padding
+            if raw_data[-1] == 0x0A and (block_size < 2 or raw_data[-2] != 0x0D):
+                break
+        return raw_data
     def prepare_data(self):
-        sentences = self.get_raw_data()
-        clean_gnss_list = []
-        complete_sentence_list = []
-        gnss_list = sentences.split('\n')
-        for sentence in gnss_list:
-            if sentence is not '':
-                clean_gnss_list.append(sentence)
-        for index,sentence in enumerate(clean_gnss_list):
-            if not sentence.startswith('$') and index is not 0:
-                joined = clean_gnss_list[index - 1] + sentence
-                complete_sentence_list.append(joined)
-            else:
-                complete_sentence_list.append(sentence)
-        return complete_sentence_list
+        """Read the receiver once and return the complete sentences as str, from '$' to the CRC digits. A sentence
+        cut off by the end of the read is completed by a later call, see reassembly.Reassembler"""
+        return [sentence.decode() for sentence in self.reassembler.push(self.get_raw_bytes())]
     def add_to_gnss_messages(self, sentence):
         try:
             self.gnss_messages['Time'] = sentence.timestamp
@@ -0,0 +1,194 @@
+"""
+# NmeaLog - buffered, rotating log of received NMEA data
+# The MIT License (MIT) - see LICENSE file
+"""
+
+try:
+    import os
+except ImportError:
+    import uos as os
+
+from .ticks import ticks_ms, ticks_diff
+
+# Flush policies
+BLOCK = 'block'  # Write whole blocks of block_size bytes
+SENTENCE = 'sentence'  # Write whenever the buffer ends in a complete sentence
+
+
+class NmeaLog(object):
+    """Collects logged characters in a preallocated RAM buffer and writes them to flash in large pieces, instead of
+    one write call per received character.
+    With flush=BLOCK the file is only written in whole block_size blocks, which should match the flash erase size
+    (512 bytes on most boards). With flush=SENTENCE the buffer is written out up to its last complete sentence each
+    time a sentence ends.
+    When max_bytes or max_age_ms is set the log rotates into numbered files (target_file.0, target_file.1, ...),
+    keeping at most max_files of them if max_files is set. Otherwise everything goes to target_file"""
+
+    def __init__(self, target_file, mode='append', block_size=512, flush=BLOCK, max_bytes=0, max_age_ms=0,
+                 max_files=0):
+        self.target_file = target_file
+        self.block_size = block_size
+        self.flush_policy = flush
+        self.max_bytes = max_bytes
+        self.max_age_ms = max_age_ms
+        self.max_files = max_files
+        self.rotating = max_bytes > 0 or max_age_ms > 0
+
+        self.buffer = bytearray(block_size)
+        self.view = memoryview(self.buffer)
+        self.fill = 0
+        self.file_bytes = 0
+        self.total_bytes = 0
+        self.writes = 0
+        self.opened = 0
+        self.handle = None
+
+        # Continue after the highest existing numbered file, or start over
+        self.file_number = -1
+        if self.rotating:
+            numbers = self.file_numbers()
+            if numbers:
+                if mode == 'new':
+                    for number in numbers:
+                        self.remove(number)
+                else:
+                    self.file_number = numbers[-1]
+
+        self.open(mode)
+
+    ########################################
+    # Files
+    ########################################
+    def file_name(self, number):
+        """Name of the numbered log file"""
+        return '{}.{}'.format(self.target_file, number)
+
+    def file_numbers(self):
+        """Sorted numbers of the existing numbered log files"""
+        directory, _, base = self.target_file.rpartition('/')
+        prefix = base + '.'
+        numbers = []
+        for name in os.listdir(directory or '.'):
+            if name.startswith(prefix) and name[len(prefix):].isdigit():
+                numbers.append(int(name[len(prefix):]))
+        numbers.sort()
+        return numbers
+
+    def remove(self, number):
+        """Delete a numbered log file if it exists"""
+        try:
+            os.remove(self.file_name(number))
+        except OSError:
+            pass
+
+    def open(self, mode='append'):
+        """Open the log file, or the next numbered file when rotating"""
+        if self.rotating:
+            if mode == 'append' and self.file_number >= 0:
+                name = self.file_name(self.file_number)
+            else:
+                self.file_number += 1
+                name = self.file_name(self.file_number)
+                mode = 'new'
+            if self.max_files > 0:
+                self.remove(self.file_number - self.max_files)
+        else:
+            name = self.target_file
+
+        self.handle = open(name, 'wb' if mode == 'new' else 'ab')
+        self.file_bytes = 0
+        self.opened = ticks_ms()
+
+    def rotate(self):
+        """Close the current file and continue in the next numbered one. Buffered data goes to the new file"""
+        self.handle.close()
+        self.open('new')
+
+    def close(self):
+        """Write out everything buffered and close the file"""
+        if self.handle is None:
+            return
+        self.write_out(self.fill)
+        self.handle.close()
+        self.handle = None
+
+    ########################################
+    # Buffering
+    ########################################
+    def write(self, data):
+        """Buffer a str or bytes-like chunk of log data"""
+        if isinstance(data, str):
+            data = data.encode()
+        length = len(data)
+        position = 0
+        while position < length:
+            count = min(self.block_size - self.fill, length - position)
+            self.view[self.fill:self.fill + count] = data[position:position + count]
+            self.fill += count
+            position += count
+            if self.fill == self.block_size:
+                self.buffer_full()
+
+        if self.flush_policy == SENTENCE and length and data[length - 1] == 10:
+            self.write_out(self.fill)
+
+    def write_char(self, ascii_char):
+        """Buffer a single character given as an int, without allocating"""
+        self.buffer[self.fill] = ascii_char
+        self.fill += 1
+        if self.fill == self.block_size:
+            self.buffer_full()
+        elif ascii_char == 10 and self.flush_policy == SENTENCE:
+            self.write_out(self.fill)
+
+    def buffer_full(self):
+        """Write out a full buffer, keeping an incomplete sentence for the next write when flushing sentences"""
+        if self.flush_policy == SENTENCE:
+            end = self.fill
+            while end > 0 and self.buffer[end - 1] != 10:
+                end -= 1
+            # A single sentence longer than the buffer is written as is
+            self.write_out(end if end > 0 else self.fill)
+        else:
+            self.write_out(self.fill)
+
+    def write_out(self, count):
+        """Write the first count buffered bytes to the file and move the rest to the front of the buffer"""
+        if count <= 0 or self.handle is None:
+            return
+        self.handle.write(self.view[:count])
+        self.writes += 1
+        self.file_bytes += count
+        self.total_bytes += count
+        remaining = self.fill - count
+        if remaining:
+            self.view[:remaining] = self.view[count:self.fill]
+        self.fill = remaining
+
+        if self.max_bytes > 0 and self.file_bytes >= self.max_bytes:
+            self.rotate()
+
+    def flush(self, force=False):
+        """Hand written data to the file system and rotate a file that is too old. Buffered data is written when
+        force is set, or up to the last complete sentence with flush=SENTENCE"""
+        if self.handle is None:
+            return
+        if force:
+            self.write_out(self.fill)
+        elif self.flush_policy == SENTENCE:
+            end = self.fill
+            while end > 0 and self.buffer[end - 1] != 10:
+                end -= 1
+            self.write_out(end)
+        self.handle.flush()
+
+        if self.max_age_ms > 0 and ticks_diff(ticks_ms(), self.opened) >= self.max_age_ms:
+            self.rotate()
+
+    async def flush_task(self, interval_ms=1000, force=False):
+        """Coroutine calling flush() every interval_ms until the log is closed, e.g.
+        asyncio.create_task(parser.log.flush_task())"""
+        import asyncio
+        while self.handle is not None:
+            await asyncio.sleep(interval_ms / 1000)
+            self.flush(force)
@@ -6,29 +6,150 @@
 
 # TODO:
 # Time Since First Fix
-# Distance/Time to Target
 # More Helper Functions
-# Dynamically limit sentences types to parse
 
+from array import array
 from math import floor, modf
 
-# Import utime or time for fix time handling
-try:
-    # Assume running on MicroPython
-    import utime
-except ImportError:
-    # Otherwise default to time module for non-embedded implementations
-    # Should still support millisecond resolution.
-    import time
+from .sentence_buffer import SentenceBuffer, VALID, CRC_FAIL, OVERFLOW, RESTART, MALFORMED, SKIPPED, SLICE_COPY, \
+    type_key, talker_key
+from .satellites import SatelliteTable, NO_ELEVATION, NO_AZIMUTH, NO_SNR
+from .satellites import constellation as satellite_constellation
+from .nmea_log import NmeaLog
+from .framing import crc_xor, find_start, unprintable, printable
+from .ticks import utime, time, ticks_us, ticks_ms, ticks_diff
+
+# Sentence types counted in NmeaParser.statistics, anything else goes to 'other'
+STAT_TYPES = ('RMC', 'GGA', 'VTG', 'GSA', 'GSV', 'GLL', 'ZDA', 'GNS', 'other')
+
+# Counters kept for each sentence type, at statistics[slot + counter]
+RECEIVED = 0  # Sentences complete up to their CRC digits
+CRC_FAILED = 1  # Wrong or deformed CRC
+REJECTED = 2  # CRC valid, but the sentence function returned False
+OVERFLOWED = 3  # Grew past SENTENCE_LIMIT before the CRC digits
+RECEIVED_BYTES = 4  # '$' up to the CRC digits, of received sentences
+PARSE_US = 5  # Time spent in the sentence function
+STAT_FIELDS = ('received', 'crc_fails', 'rejected', 'overflows', 'bytes', 'parse_us')
+
+# Counters wrap around at 2 ** 32, as the unsigned array does on MicroPython
+COUNTER_MASK = 0xFFFFFFFF
+
+_STAT_OTHER = (len(STAT_TYPES) - 1) * len(STAT_FIELDS)
+
+
+def address_key(data):
+    """Small int key of the 5 character address field at the start of data (bytes-like), e.g. b'GPGSV,...'.
+    6 bits per character, so it never needs a long int"""
+    key = 0
+    for index in range(5):
+        key = (key << 6) | ((data[index] - 48) & 63)
+    return key
+
+
+def fixed(text, places):
+    """Decode a decimal string as an int scaled by 10 ** places, straight from the digit characters without float().
+    Extra decimals are truncated. Raises ValueError like float() would"""
+    value = 0
+    sign = 1
+    decimals = -1
+    digits = 0
+    for char in text:
+        code = ord(char)
+        if code == 45 and digits == 0 and sign == 1 and decimals < 0:  # '-'
+            sign = -1
+        elif code == 46 and decimals < 0:  # '.'
+            decimals = 0
+        elif 48 <= code <= 57:
+            digits += 1
+            if decimals < places:
+                value = value * 10 + code - 48
+                if decimals >= 0:
+                    decimals += 1
+        else:
+            raise ValueError
+    if not digits:
+        raise ValueError
+    if decimals < 0:
+        decimals = 0
+    return sign * value * 10 ** (places - decimals)
+
+
+def minutes_to_e7(degrees, minutes_e6):
+    """Whole degrees plus minutes in millionths as unsigned 1e-7 degrees"""
+    return degrees * 10000000 + (minutes_e6 + 3) // 6
+
+
+def knots_to_mms(knots_e3):
+    """Speed in thousandths of a knot as mm/s"""
+    return (knots_e3 * 463 + 450) // 900
+
+
+def e7_to_ddm(coordinate_e7, positive, negative):
+    """Signed 1e-7 degrees as [degrees, decimal minutes, hemisphere]"""
+    magnitude = abs(coordinate_e7)
+    degrees = magnitude // 10000000
+    minutes = round((magnitude - degrees * 10000000) * 60 / 10000000, 5)  # 1e-7 degrees is 6e-6 minutes
+    return [degrees, minutes, negative if coordinate_e7 < 0 else positive]
+
+
+def ddm_to_e7(ddm):
+    """[degrees, decimal minutes, hemisphere] as signed 1e-7 degrees, the inverse of e7_to_ddm()"""
+    coordinate_e7 = int(round((ddm[0] + ddm[1] / 60) * 10000000))
+    return -coordinate_e7 if ddm[2] in ('S', 'W') else coordinate_e7
+
+
+def days_from_civil(year, month, day):
+    """Days from 2000-01-01 to a Gregorian date, in integer arithmetic"""
+    if month <= 2:
+        year -= 1
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 730425
+
+
+def civil_from_days(days):
+    """Gregorian (year, month, day) of a day count from 2000-01-01, the inverse of days_from_civil()"""
+    days += 730425
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    month_index = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * month_index + 2) // 5 + 1
+    month = month_index + 3 if month_index < 10 else month_index - 9
+    year = year_of_era + era * 400 + (1 if month <= 2 else 0)
+    return year, month, day
+
+
+def days_in_month(year, month):
+    """Number of days in a month of a Gregorian year"""
+    if month == 2:
+        return 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28
+    return 30 if month in (4, 6, 9, 11) else 31
+
+
+def rtc_tuple(epoch_seconds, epoch_ms=0, offset_hours=0):
+    """(year, month, day, weekday, hours, minutes, seconds, subseconds) for machine.RTC.datetime() from seconds since
+    2000-01-01 UTC, shifted by offset_hours. Weekday is 0 for Monday. Returns None for an unknown time (-1)"""
+    if epoch_seconds < 0:
+        return None
+    seconds = epoch_seconds + int(offset_hours * 3600)
+    days = seconds // 86400
+    seconds -= days * 86400
+    year, month, day = civil_from_days(days)
+    return (year, month, day, (days + 5) % 7, seconds // 3600, (seconds // 60) % 60, seconds % 60, epoch_ms)
 
 
 class NmeaParser(object):
     """GPS NMEA Sentence Parser. Creates object that stores all relevant GPS data and statistics.
-    Parses sentences one character at a time using update(). """
+    Parses sentences one character at a time using update(), or a whole chunk of bytes at a time using feed(). """
 
     # Max Number of Characters a valid sentence can be (based on GGA sentence)
     SENTENCE_LIMIT = 90
     __HEMISPHERES = ('N', 'S', 'E', 'W')
+    __HEMISPHERE_CHARS = {78: 'N', 83: 'S', 69: 'E', 87: 'W'}
     __NO_FIX = 1
     __FIX_2D = 2
     __FIX_3D = 3
@@ -38,7 +159,8 @@ class NmeaParser(object):
                 'June', 'July', 'August', 'September', 'October',
                 'November', 'December')
 
-    def __init__(self, local_offset=0, location_formatting='ddm'):
+    def __init__(self, local_offset=0, location_formatting='ddm', fixed_buffer=False, subscribe=None,
+                 fixed_point=False, statistics=True, decimate=None):
         """
         Setup GPS Object Status Flags, Internal Data Registers, etc
             local_offset (int): Timzone Difference to UTC
@@ -46,6 +168,20 @@ class NmeaParser(object):
                                        Decimal Degree Minute (ddm) - 40° 26.767′ N
                                        Degrees Minutes Seconds (dms) - 40° 26′ 46″ N
                                        Decimal Degrees (dd) - 40.446° N
+            fixed_buffer (bool): feed() copies sentences into a preallocated SentenceBuffer and RMC/GGA/GSA/GSV are
+                                 decoded straight from it, updating timestamp, date, position and satellites in
+                                 place, so once running they don't allocate apart from a float for timestamps
+                                 with a fraction of a second. Implies fixed_point. Other sentence types are still
+                                 split into gps_segments
+            subscribe (set): Sentence types to parse, e.g. {'RMC', 'ZDA'}. Other types are skipped as soon as their
+                             address field is complete, without buffering or CRC checking. None parses everything
+            fixed_point (bool): Store position, motion and DOP as ints instead of floats: latitude_e7/longitude_e7
+                                (signed 1e-7 degrees), speed_mms (mm/s), course_e2 (1/100 degree), altitude_cm,
+                                geoid_height_cm and hdop_e2/pdop_e2/vdop_e2 (1/100). latitude, longitude and the
+                                string helpers are derived from these
+            statistics (bool): Keep per sentence type counters and parse times, see stats()
+            decimate (dict): Decode only every Nth sentence of some types, e.g. {'GSV': 10, 'GSA': 5}, see
+                             set_decimation()
         """
 
         #####################
@@ -56,17 +192,46 @@ class NmeaParser(object):
         self.gps_segments = []
         self.crc_xor = 0
         self.char_count = 0
+        self.sentence_length = 0  # '$' to the CRC digits of the last CRC valid sentence, in any mode
         self.fix_time = 0
+        self.feed_pending = b''
+        self.feed_skipping = False
+        self.skipping = False
+        self.listeners = []
+        self.sentence = SentenceBuffer(self.SENTENCE_LIMIT) if fixed_buffer else None
 
         #####################
         # Sentence Statistics
         self.crc_fails = 0
         self.clean_sentences = 0
         self.parsed_sentences = 0
+        self.skipped_bytes = 0
+        # Sentences lost to chunking by feed(), counted as reassembly.Reassembler.lost
+        self.lost_sentences = 0
+
+        self.decimated_sentences = 0
+
+        # Per sentence type counters, len(STAT_FIELDS) for each of STAT_TYPES
+        self.statistics = array('I', [0] * (len(STAT_TYPES) * len(STAT_FIELDS))) if statistics else None
+
+        #####################
+        # Sentence Subscriptions
+        self.subscribed = None
+        self.subscribed_bytes = None
+        if subscribe is not None:
+            self.subscribe(*subscribe)
+
+        #####################
+        # Decimation Policies
+        self.decimation = dict()  # sentence type: (every, interval_ms)
+        self.decimation_state = None  # address key: state list, or None without policies
+        if decimate is not None:
+            for sentence_type, every in decimate.items():
+                self.set_decimation(sentence_type, every)
 
         #####################
         # Logging Related
-        self.log_handle = None
+        self.log = None
         self.log_en = False
 
         #####################
@@ -74,73 +239,162 @@ class NmeaParser(object):
         # Time
         self.timestamp = [0, 0, 0.0]
         self.date = [0, 0, 0]
+        self.year = 0  # 4 digit year, exact from ZDA, century + date[2] from RMC
+        self.century = 2000  # Updated from every ZDA
+        self.epoch_seconds = -1  # Validated UTC seconds since 2000-01-01 from the last RMC or ZDA, -1 if unknown
+        self.epoch_ms = 0
         self.local_offset = local_offset
 
         # Position/Motion
         self._latitude = [0, 0.0, 'N']
         self._longitude = [0, 0.0, 'W']
         self.coord_format = location_formatting
+
+        # Formatted position, rebuilt only when position_version or coord_format has changed since
+        self.position_version = 0  # Bumped by the sentence functions whenever the position changes
+        self.view_version = -1
+        self.view_format = None
+        self.latitude_view = None
+        self.longitude_view = None
+        self.string_version = -1
+        self.string_format = None
+        self.latitude_text = ''
+        self.longitude_text = ''
         self.speed = [0.0, 0.0, 0.0]
         self.course = 0.0
         self.altitude = 0.0
         self.geoid_height = 0.0
 
+        # Position/Motion in fixed point mode
+        self.fixed_point = fixed_point or fixed_buffer
+        self.latitude_e7 = 0
+        self.longitude_e7 = 0
+        self.speed_mms = 0
+        self.course_e2 = 0
+        self.altitude_cm = 0
+        self.geoid_height_cm = 0
+
         # GPS Info
         self.satellites_in_view = 0
         self.satellites_in_use = 0
         self.satellites_used = []
         self.last_sv_sentence = 0
         self.total_sv_sentences = 0
-        self.satellite_data = dict()
+        self.satellite_table = SatelliteTable()
         self.hdop = 0.0
         self.pdop = 0.0
         self.vdop = 0.0
+        self.hdop_e2 = 0
+        self.pdop_e2 = 0
+        self.vdop_e2 = 0
         self.valid = False
         self.fix_stat = 0
         self.fix_type = 1
+        self.talker = ''  # Talker of the last parsed sentence, e.g. 'GP' or 'GN'
 
     ########################################
     # Coordinates Translation Functions
     ########################################
     @property
     def latitude(self):
-        """Format Latitude Data Correctly"""
-        if self.coord_format == 'dd':
-            decimal_degrees = self._latitude[0] + (self._latitude[1] / 60)
-            return [decimal_degrees, self._latitude[2]]
-        elif self.coord_format == 'dms':
-            minute_parts = modf(self._latitude[1])
-            seconds = round(minute_parts[0] * 60)
-            return [self._latitude[0], int(minute_parts[1]), seconds, self._latitude[2]]
-        else:
-            return self._latitude
+        """Format Latitude Data Correctly. The result is reused until the position or coord_format changes, treat
+        it as read only"""
+        if self.view_version != self.position_version or self.view_format != self.coord_format:
+            self.update_views()
+        return self.latitude_view
 
     @property
     def longitude(self):
-        """Format Longitude Data Correctly"""
+        """Format Longitude Data Correctly. The result is reused until the position or coord_format changes, treat
+        it as read only"""
+        if self.view_version != self.position_version or self.view_format != self.coord_format:
+            self.update_views()
+        return self.longitude_view
+
+    def update_views(self):
+        """Rebuild the formatted latitude and longitude for the current position and coord_format"""
+        self.latitude_view = self.format_coordinate(self.ddm_latitude())
+        self.longitude_view = self.format_coordinate(self.ddm_longitude())
+        self.view_version = self.position_version
+        self.view_format = self.coord_format
+
+    def format_coordinate(self, coordinate):
+        """Format a [degrees, decimal minutes, hemisphere] coordinate as coord_format asks"""
         if self.coord_format == 'dd':
-            decimal_degrees = self._longitude[0] + (self._longitude[1] / 60)
-            return [decimal_degrees, self._longitude[2]]
+            decimal_degrees = coordinate[0] + (coordinate[1] / 60)
+            return [decimal_degrees, coordinate[2]]
         elif self.coord_format == 'dms':
-            minute_parts = modf(self._longitude[1])
+            minute_parts = modf(coordinate[1])
             seconds = round(minute_parts[0] * 60)
-            return [self._longitude[0], int(minute_parts[1]), seconds, self._longitude[2]]
+            return [coordinate[0], int(minute_parts[1]), seconds, coordinate[2]]
         else:
-            return self._longitude
+            # Copy so in place updates of the position don't change a view handed out before
+            return [coordinate[0], coordinate[1], coordinate[2]]
+
+    def ddm_latitude(self):
+        """Latitude as [degrees, decimal minutes, hemisphere], derived from latitude_e7 in fixed point mode"""
+        if self.fixed_point:
+            return e7_to_ddm(self.latitude_e7, 'N', 'S')
+        return self._latitude
+
+    def ddm_longitude(self):
+        """Longitude as [degrees, decimal minutes, hemisphere], derived from longitude_e7 in fixed point mode"""
+        if self.fixed_point:
+            return e7_to_ddm(self.longitude_e7, 'E', 'W')
+        return self._longitude
 
     ########################################
-    # Logging Related Functions
+    # Sentence Subscription Functions
     ########################################
-    def start_logging(self, target_file, mode="append"):
+    def subscribe(self, *sentence_types):
         """
-        Create GPS data log object
+        Limit parsing to the given sentence types, e.g. subscribe('RMC', 'GGA'). When everything was being parsed,
+        only the given types are parsed from now on
         """
-        # Set Write Mode Overwrite or Append
-        mode_code = 'w' if mode == 'new' else 'a'
+        subscribed = set() if self.subscribed is None else self.subscribed
+        subscribed.update(sentence_types)
+        self.set_subscriptions(subscribed)
 
+    def unsubscribe(self, *sentence_types):
+        """
+        Stop parsing the given sentence types, e.g. unsubscribe('GSV')
+        """
+        if self.subscribed is None:
+            subscribed = set(self.supported_sentences)
+        else:
+            subscribed = self.subscribed
+        subscribed.difference_update(sentence_types)
+        self.set_subscriptions(subscribed)
+
+    def subscribe_all(self):
+        """
+        Parse every supported sentence type again
+        """
+        self.set_subscriptions(None)
+
+    def set_subscriptions(self, subscribed):
+        """Store the subscribed sentence types along with the lookups used by each parsing path"""
+        self.subscribed = subscribed
+        if subscribed is None:
+            self.subscribed_bytes = None
+            if self.sentence is not None:
+                self.sentence.accept = None
+        else:
+            self.subscribed_bytes = set(sentence_type.encode() for sentence_type in subscribed)
+            if self.sentence is not None:
+                self.sentence.accept = set(type_key(sentence_type.encode()) for sentence_type in subscribed)
+
+    ########################################
+    # Logging Related Functions
+    ########################################
+    def start_logging(self, target_file, mode="append", **options):
+        """
+        Create GPS data log object. options are passed on to NmeaLog: block_size, flush, max_bytes, max_age_ms and
+        max_files
+        """
         try:
-            self.log_handle = open(target_file, mode_code)
-        except AttributeError:
+            self.log = NmeaLog(target_file, mode, **options)
+        except (AttributeError, TypeError, OSError):
             print("Invalid FileName")
             return False
 
@@ -149,23 +403,24 @@ class NmeaParser(object):
 
     def stop_logging(self):
         """
-        Closes the log file handler and disables further logging
+        Writes out the buffered log data, closes the log file and disables further logging
         """
         try:
-            self.log_handle.close()
+            self.log.close()
         except AttributeError:
             print("Invalid Handle")
             return False
 
+        self.log = None
         self.log_en = False
         return True
 
     def write_log(self, log_string):
-        """Attempts to write the last valid NMEA sentence character to the active file handler
+        """Attempts to buffer log data in the active log
         """
         try:
-            self.log_handle.write(log_string)
-        except TypeError:
+            self.log.write(log_string)
+        except (AttributeError, TypeError):
             return False
         return True
 
@@ -182,7 +437,8 @@ class NmeaParser(object):
             utc_string = self.gps_segments[1]
 
             if utc_string:  # Possible timestamp found
-                hours = (int(utc_string[0:2]) + self.local_offset) % 24
+                utc_hours = int(utc_string[0:2])
+                hours = (utc_hours + self.local_offset) % 24
                 minutes = int(utc_string[2:4])
                 seconds = float(utc_string[4:])
                 self.timestamp = [hours, minutes, seconds]
@@ -203,8 +459,15 @@ class NmeaParser(object):
                 month = int(date_string[2:4])
                 year = int(date_string[4:6])
                 self.date = (day, month, year)
+                self.year = self.century + year
+                if utc_string:
+                    self.set_epoch(self.year, month, day, utc_hours, minutes, fixed(utc_string[4:], 3))
+                else:
+                    self.epoch_seconds = -1
             else:  # No Date stamp yet
                 self.date = (0, 0, 0)
+                self.year = 0
+                self.epoch_seconds = -1
 
         except ValueError:  # Bad Date stamp value present
             return False
@@ -217,13 +480,13 @@ class NmeaParser(object):
                 # Latitude
                 l_string = self.gps_segments[3]
                 lat_degs = int(l_string[0:2])
-                lat_mins = float(l_string[2:])
+                lat_mins = fixed(l_string[2:], 6) if self.fixed_point else float(l_string[2:])
                 lat_hemi = self.gps_segments[4]
 
                 # Longitude
                 l_string = self.gps_segments[5]
                 lon_degs = int(l_string[0:3])
-                lon_mins = float(l_string[3:])
+                lon_mins = fixed(l_string[3:], 6) if self.fixed_point else float(l_string[3:])
                 lon_hemi = self.gps_segments[6]
             except ValueError:
                 return False
@@ -236,13 +499,18 @@ class NmeaParser(object):
 
             # Speed
             try:
-                spd_knt = float(self.gps_segments[7])
+                if self.fixed_point:
+                    spd_knt = fixed(self.gps_segments[7], 3)
+                else:
+                    spd_knt = float(self.gps_segments[7])
             except ValueError:
                 return False
 
             # Course
             try:
-                if self.gps_segments[8]:
+                if self.fixed_point:
+                    course = fixed(self.gps_segments[8], 2) if self.gps_segments[8] else 0
+                elif self.gps_segments[8]:
                     course = float(self.gps_segments[8])
                 else:
                     course = 0.0
@@ -252,21 +520,31 @@ class NmeaParser(object):
             # TODO - Add Magnetic Variation
 
             # Update Object Data
-            self._latitude = [lat_degs, lat_mins, lat_hemi]
-            self._longitude = [lon_degs, lon_mins, lon_hemi]
-            # Include mph and hm/h
-            self.speed = [spd_knt, spd_knt * 1.151, spd_knt * 1.852]
-            self.course = course
+            if self.fixed_point:
+                self.set_position_e7(lat_degs, lat_mins, lat_hemi, lon_degs, lon_mins, lon_hemi)
+                self.speed_mms = knots_to_mms(spd_knt)
+                self.course_e2 = course
+            else:
+                self._latitude = [lat_degs, lat_mins, lat_hemi]
+                self._longitude = [lon_degs, lon_mins, lon_hemi]
+                self.position_version += 1
+                # Include mph and hm/h
+                self.speed = [spd_knt, spd_knt * 1.151, spd_knt * 1.852]
+                self.course = course
             self.valid = True
 
             # Update Last Fix Time
             self.new_fix_time()
 
         else:  # Clear Position Data if Sentence is 'Invalid'
-            self._latitude = [0, 0.0, 'N']
-            self._longitude = [0, 0.0, 'W']
-            self.speed = [0.0, 0.0, 0.0]
-            self.course = 0.0
+            if self.fixed_point:
+                self.clear_position_e7()
+            else:
+                self._latitude = [0, 0.0, 'N']
+                self._longitude = [0, 0.0, 'W']
+                self.position_version += 1
+                self.speed = [0.0, 0.0, 0.0]
+                self.course = 0.0
             self.valid = False
 
         return True
@@ -298,13 +576,13 @@ class NmeaParser(object):
                 # Latitude
                 l_string = self.gps_segments[1]
                 lat_degs = int(l_string[0:2])
-                lat_mins = float(l_string[2:])
+                lat_mins = fixed(l_string[2:], 6) if self.fixed_point else float(l_string[2:])
                 lat_hemi = self.gps_segments[2]
 
                 # Longitude
                 l_string = self.gps_segments[3]
                 lon_degs = int(l_string[0:3])
-                lon_mins = float(l_string[3:])
+                lon_mins = fixed(l_string[3:], 6) if self.fixed_point else float(l_string[3:])
                 lon_hemi = self.gps_segments[4]
             except ValueError:
                 return False
@@ -316,22 +594,38 @@ class NmeaParser(object):
                 return False
 
             # Update Object Data
-            self._latitude = [lat_degs, lat_mins, lat_hemi]
-            self._longitude = [lon_degs, lon_mins, lon_hemi]
+            if self.fixed_point:
+                self.set_position_e7(lat_degs, lat_mins, lat_hemi, lon_degs, lon_mins, lon_hemi)
+            else:
+                self._latitude = [lat_degs, lat_mins, lat_hemi]
+                self._longitude = [lon_degs, lon_mins, lon_hemi]
+                self.position_version += 1
             self.valid = True
 
             # Update Last Fix Time
             self.new_fix_time()
 
         else:  # Clear Position Data if Sentence is 'Invalid'
-            self._latitude = [0, 0.0, 'N']
-            self._longitude = [0, 0.0, 'W']
+            if self.fixed_point:
+                self.clear_position_e7()
+            else:
+                self._latitude = [0, 0.0, 'N']
+                self._longitude = [0, 0.0, 'W']
+                self.position_version += 1
             self.valid = False
 
         return True
 
     def gpvtg(self):
         """Parse Track Made Good and Ground Speed (VTG) Sentence. Updates speed and course"""
+        if self.fixed_point:
+            try:
+                self.course_e2 = fixed(self.gps_segments[1], 2) if self.gps_segments[1] else 0
+                self.speed_mms = knots_to_mms(fixed(self.gps_segments[5], 3)) if self.gps_segments[5] else 0
+            except ValueError:
+                return False
+            return True
+
         try:
             course = float(self.gps_segments[1]) if self.gps_segments[1] else 0.0
             spd_knt = float(self.gps_segments[5]) if self.gps_segments[5] else 0.0
@@ -372,9 +666,9 @@ class NmeaParser(object):
 
         try:
             # Horizontal Dilution of Precision
-            hdop = float(self.gps_segments[8])
+            hdop = fixed(self.gps_segments[8], 2) if self.fixed_point else float(self.gps_segments[8])
         except (ValueError, IndexError):
-            hdop = 0.0
+            hdop = 0 if self.fixed_point else 0.0
 
         # Process Location and Speed Data if Fix is GOOD
         if fix_stat:
@@ -384,13 +678,13 @@ class NmeaParser(object):
                 # Latitude
                 l_string = self.gps_segments[2]
                 lat_degs = int(l_string[0:2])
-                lat_mins = float(l_string[2:])
+                lat_mins = fixed(l_string[2:], 6) if self.fixed_point else float(l_string[2:])
                 lat_hemi = self.gps_segments[3]
 
                 # Longitude
                 l_string = self.gps_segments[4]
                 lon_degs = int(l_string[0:3])
-                lon_mins = float(l_string[3:])
+                lon_mins = fixed(l_string[3:], 6) if self.fixed_point else float(l_string[3:])
                 lon_hemi = self.gps_segments[5]
             except ValueError:
                 return False
@@ -403,22 +697,35 @@ class NmeaParser(object):
 
             # Altitude / Height Above Geoid
             try:
-                altitude = float(self.gps_segments[9])
-                geoid_height = float(self.gps_segments[11])
+                if self.fixed_point:
+                    altitude = fixed(self.gps_segments[9], 2)
+                    geoid_height = fixed(self.gps_segments[11], 2)
+                else:
+                    altitude = float(self.gps_segments[9])
+                    geoid_height = float(self.gps_segments[11])
             except ValueError:
                 altitude = 0
                 geoid_height = 0
 
             # Update Object Data
-            self._latitude = [lat_degs, lat_mins, lat_hemi]
-            self._longitude = [lon_degs, lon_mins, lon_hemi]
-            self.altitude = altitude
-            self.geoid_height = geoid_height
+            if self.fixed_point:
+                self.set_position_e7(lat_degs, lat_mins, lat_hemi, lon_degs, lon_mins, lon_hemi)
+                self.altitude_cm = altitude
+                self.geoid_height_cm = geoid_height
+            else:
+                self._latitude = [lat_degs, lat_mins, lat_hemi]
+                self._longitude = [lon_degs, lon_mins, lon_hemi]
+                self.position_version += 1
+                self.altitude = altitude
+                self.geoid_height = geoid_height
 
         # Update Object Data
         self.timestamp = [hours, minutes, seconds]
         self.satellites_in_use = satellites_in_use
-        self.hdop = hdop
+        if self.fixed_point:
+            self.hdop_e2 = hdop
+        else:
+            self.hdop = hdop
         self.fix_stat = fix_stat
 
         # If Fix is GOOD, update fix timestamp
@@ -453,9 +760,14 @@ class NmeaParser(object):
 
         # PDOP,HDOP,VDOP
         try:
-            pdop = float(self.gps_segments[15])
-            hdop = float(self.gps_segments[16])
-            vdop = float(self.gps_segments[17])
+            if self.fixed_point:
+                pdop = fixed(self.gps_segments[15], 2)
+                hdop = fixed(self.gps_segments[16], 2)
+                vdop = fixed(self.gps_segments[17], 2)
+            else:
+                pdop = float(self.gps_segments[15])
+                hdop = float(self.gps_segments[16])
+                vdop = float(self.gps_segments[17])
         except ValueError:
             return False
 
@@ -467,9 +779,14 @@ class NmeaParser(object):
             self.new_fix_time()
 
         self.satellites_used = sats_used
-        self.hdop = hdop
-        self.vdop = vdop
-        self.pdop = pdop
+        if self.fixed_point:
+            self.hdop_e2 = hdop
+            self.vdop_e2 = vdop
+            self.pdop_e2 = pdop
+        else:
+            self.hdop = hdop
+            self.vdop = vdop
+            self.pdop = pdop
 
         return True
 
@@ -483,9 +800,13 @@ class NmeaParser(object):
         except ValueError:
             return False
 
-        # Create a blank dict to store all the satellite data from this sentence in:
-        # satellite PRN is key, tuple containing telemetry is value
-        satellite_dict = dict()
+        # Satellites are stored per constellation, so GLONASS sentences don't overwrite GPS data
+        table = self.satellite_table
+        constellation = satellite_constellation(self.gps_segments[0][:2])
+
+        # A new set of sentences makes the satellites of the previous set stale
+        if constellation >= 0 and current_sv_sentence == 1:
+            table.new_group(constellation, sats_in_view)
 
         # Calculate  Number of Satelites to pull data for and thus how many segment positions to read
         if num_sv_sentences == current_sv_sentence:
@@ -506,39 +827,519 @@ class NmeaParser(object):
 
                 try:  # elevation can be null (no value) when not tracking
                     elevation = int(self.gps_segments[sats+1])
+                    if not 0 <= elevation <= 90:
+                        elevation = NO_ELEVATION
                 except (ValueError,IndexError):
-                    elevation = None
+                    elevation = NO_ELEVATION
 
                 try:  # azimuth can be null (no value) when not tracking
                     azimuth = int(self.gps_segments[sats+2])
+                    if not 0 <= azimuth <= 359:
+                        azimuth = NO_AZIMUTH
                 except (ValueError,IndexError):
-                    azimuth = None
+                    azimuth = NO_AZIMUTH
 
                 try:  # SNR can be null (no value) when not tracking
                     snr = int(self.gps_segments[sats+3])
+                    if not 0 <= snr <= 99:
+                        snr = NO_SNR
                 except (ValueError,IndexError):
-                    snr = None
+                    snr = NO_SNR
             # If no PRN is found, then the sentence has no more satellites to read
             else:
                 break
 
-            # Add Satellite Data to Sentence Dict
-            satellite_dict[sat_id] = (elevation, azimuth, snr)
+            # Add Satellite Data to the table
+            if constellation >= 0:
+                table.update(constellation, sat_id, elevation, azimuth, snr)
 
         # Update Object Data
         self.total_sv_sentences = num_sv_sentences
         self.last_sv_sentence = current_sv_sentence
         self.satellites_in_view = sats_in_view
 
-        # For a new set of sentences, we either clear out the existing sat data or
-        # update it as additional SV sentences are parsed
-        if current_sv_sentence == 1:
-            self.satellite_data = satellite_dict
+        return True
+
+    def zda(self):
+        """Parse Time and Date (ZDA) sentence. Updates UTC timestamp, date stamp and the 4 digit year. The local
+        zone fields are ignored, local_offset applies as for the other sentences"""
+
+        # UTC Timestamp
+        try:
+            utc_string = self.gps_segments[1]
+
+            if utc_string:  # Possible timestamp found
+                utc_hours = int(utc_string[0:2])
+                hours = (utc_hours + self.local_offset) % 24
+                minutes = int(utc_string[2:4])
+                seconds = float(utc_string[4:])
+                seconds_e3 = fixed(utc_string[4:], 3)
+            else:  # No Time stamp yet
+                return False
+
+            # Date stamp
+            day = int(self.gps_segments[2])
+            month = int(self.gps_segments[3])
+            year = int(self.gps_segments[4])
+        except (ValueError, IndexError):
+            return False
+
+        if not (1 <= day <= 31 and 1 <= month <= 12 and year >= 1980):
+            return False
+
+        # Update Object Data
+        self.timestamp = [hours, minutes, seconds]
+        self.date = (day, month, year % 100)
+        self.year = year
+        self.century = year - year % 100
+        self.set_epoch(year, month, day, utc_hours, minutes, seconds_e3)
+
+        return True
+
+    def gns(self):
+        """Parse GNSS Fix Data (GNS) sentence. Updates UTC timestamp, latitude, longitude, fix status, satellites
+        in use, Horizontal Dilution of Precision (HDOP), altitude and geoid height"""
+
+        try:
+            # UTC Timestamp
+            utc_string = self.gps_segments[1]
+
+            # Skip timestamp if receiver doesn't have on yet
+            if utc_string:
+                hours = (int(utc_string[0:2]) + self.local_offset) % 24
+                minutes = int(utc_string[2:4])
+                seconds = float(utc_string[4:])
+            else:
+                hours = 0
+                minutes = 0
+                seconds = 0.0
+
+            # Number of Satellites in Use
+            satellites_in_use = int(self.gps_segments[7])
+
+            # Get Fix Status from the mode of each constellation: N no fix, D differential, others autonomous
+            mode = self.gps_segments[6]
+        except (ValueError, IndexError):
+            return False
+
+        if 'D' in mode:
+            fix_stat = 2
+        elif mode.strip('N'):
+            fix_stat = 1
+        else:
+            fix_stat = 0
+
+        try:
+            # Horizontal Dilution of Precision
+            hdop = fixed(self.gps_segments[8], 2) if self.fixed_point else float(self.gps_segments[8])
+        except (ValueError, IndexError):
+            hdop = 0 if self.fixed_point else 0.0
+
+        # Process Location Data if Fix is GOOD
+        if fix_stat:
+
+            # Longitude / Latitude
+            try:
+                # Latitude
+                l_string = self.gps_segments[2]
+                lat_degs = int(l_string[0:2])
+                lat_mins = fixed(l_string[2:], 6) if self.fixed_point else float(l_string[2:])
+                lat_hemi = self.gps_segments[3]
+
+                # Longitude
+                l_string = self.gps_segments[4]
+                lon_degs = int(l_string[0:3])
+                lon_mins = fixed(l_string[3:], 6) if self.fixed_point else float(l_string[3:])
+                lon_hemi = self.gps_segments[5]
+            except ValueError:
+                return False
+
+            if lat_hemi not in self.__HEMISPHERES:
+                return False
+
+            if lon_hemi not in self.__HEMISPHERES:
+                return False
+
+            # Altitude / Height Above Geoid
+            try:
+                if self.fixed_point:
+                    altitude = fixed(self.gps_segments[9], 2)
+                    geoid_height = fixed(self.gps_segments[10], 2)
+                else:
+                    altitude = float(self.gps_segments[9])
+                    geoid_height = float(self.gps_segments[10])
+            except (ValueError, IndexError):
+                altitude = 0
+                geoid_height = 0
+
+            # Update Object Data
+            if self.fixed_point:
+                self.set_position_e7(lat_degs, lat_mins, lat_hemi, lon_degs, lon_mins, lon_hemi)
+                self.altitude_cm = altitude
+                self.geoid_height_cm = geoid_height
+            else:
+                self._latitude = [lat_degs, lat_mins, lat_hemi]
+                self._longitude = [lon_degs, lon_mins, lon_hemi]
+                self.position_version += 1
+                self.altitude = altitude
+                self.geoid_height = geoid_height
+
+        # Update Object Data
+        self.timestamp = [hours, minutes, seconds]
+        self.satellites_in_use = satellites_in_use
+        if self.fixed_point:
+            self.hdop_e2 = hdop
         else:
-            self.satellite_data.update(satellite_dict)
+            self.hdop = hdop
+        self.fix_stat = fix_stat
+
+        # If Fix is GOOD, update fix timestamp
+        if fix_stat:
+            self.new_fix_time()
 
         return True
 
+    ########################################
+    # Sentence Buffer Parsers
+    # Decode fields straight from the SentenceBuffer in fixed buffer mode, always as fixed point ints. Results are
+    # written into the existing lists instead of building new ones each sentence.
+    ########################################
+    def gprmc_buffer(self):
+        """Parse Recommended Minimum Specific GPS/Transit data (RMC) Sentence from the SentenceBuffer.
+        Same updates as gprmc() in fixed point mode"""
+        sentence = self.sentence
+
+        # UTC Timestamp
+        try:
+            if sentence.field_length(1):  # Possible timestamp found
+                utc_hours = sentence.field_int(1, 0, 2)
+                hours = (utc_hours + self.local_offset) % 24
+                minutes = sentence.field_int(1, 2, 4)
+                seconds_e3 = sentence.field_fixed(1, 3, 4)
+            else:  # No Time stamp yet
+                utc_hours = -1
+                hours = 0
+                minutes = 0
+                seconds_e3 = 0
+        except ValueError:  # Bad Timestamp value present
+            return False
+
+        # Date stamp
+        try:
+            if sentence.field_length(9):  # Possible date stamp found
+                day = sentence.field_int(9, 0, 2)
+                month = sentence.field_int(9, 2, 4)
+                year = sentence.field_int(9, 4, 6)
+            else:  # No Date stamp yet
+                day = 0
+                month = 0
+                year = 0
+        except ValueError:  # Bad Date stamp value present
+            return False
+
+        self.set_timestamp(hours, minutes, self.buffer_seconds(seconds_e3))
+        self.set_date(day, month, year)
+        self.year = self.century + year if day else 0
+        if day and utc_hours >= 0:
+            self.set_epoch(self.year, month, day, utc_hours, minutes, seconds_e3)
+        else:
+            self.epoch_seconds = -1
+
+        # Check Receiver Data Valid Flag
+        if sentence.field_char(2) == 65:  # 'A' Data from Receiver is Valid/Has Fix
+
+            # Longitude / Latitude
+            try:
+                lat_degs = sentence.field_int(3, 0, 2)
+                lon_degs = sentence.field_int(5, 0, 3)
+                lat_mins = sentence.field_fixed(3, 6, 2)
+                lon_mins = sentence.field_fixed(5, 6, 3)
+            except ValueError:
+                return False
+
+            lat_hemi = self.__HEMISPHERE_CHARS.get(sentence.field_char(4))
+            lon_hemi = self.__HEMISPHERE_CHARS.get(sentence.field_char(6))
+            if lat_hemi is None or lon_hemi is None:
+                return False
+
+            # Speed / Course
+            try:
+                spd_knt = sentence.field_fixed(7, 3)
+                course = sentence.field_fixed(8, 2) if sentence.field_length(8) else 0
+            except ValueError:
+                return False
+
+            # Update Object Data
+            self.set_position_e7(lat_degs, lat_mins, lat_hemi, lon_degs, lon_mins, lon_hemi)
+            self.speed_mms = knots_to_mms(spd_knt)
+            self.course_e2 = course
+            self.valid = True
+
+            # Update Last Fix Time
+            self.new_fix_time()
+
+        else:  # Clear Position Data if Sentence is 'Invalid'
+            self.clear_position_e7()
+            self.valid = False
+
+        return True
+
+    def gpgga_buffer(self):
+        """Parse Global Positioning System Fix Data (GGA) Sentence from the SentenceBuffer.
+        Same updates as gpgga() in fixed point mode"""
+        sentence = self.sentence
+
+        try:
+            # UTC Timestamp, skipped if receiver doesn't have one yet
+            if sentence.field_length(1):
+                hours = (sentence.field_int(1, 0, 2) + self.local_offset) % 24
+                minutes = sentence.field_int(1, 2, 4)
+                seconds_e3 = sentence.field_fixed(1, 3, 4)
+            else:
+                hours = 0
+                minutes = 0
+                seconds_e3 = 0
+
+            # Number of Satellites in Use
+            satellites_in_use = sentence.field_int(7)
+
+            # Get Fix Status
+            fix_stat = sentence.field_int(6)
+
+        except ValueError:
+            return False
+
+        try:
+            # Horizontal Dilution of Precision
+            hdop = sentence.field_fixed(8, 2)
+        except ValueError:
+            hdop = 0
+
+        # Process Location and Speed Data if Fix is GOOD
+        if fix_stat:
+
+            # Longitude / Latitude
+            try:
+                lat_degs = sentence.field_int(2, 0, 2)
+                lon_degs = sentence.field_int(4, 0, 3)
+                lat_mins = sentence.field_fixed(2, 6, 2)
+                lon_mins = sentence.field_fixed(4, 6, 3)
+            except ValueError:
+                return False
+
+            lat_hemi = self.__HEMISPHERE_CHARS.get(sentence.field_char(3))
+            lon_hemi = self.__HEMISPHERE_CHARS.get(sentence.field_char(5))
+            if lat_hemi is None or lon_hemi is None:
+                return False
+
+            # Altitude / Height Above Geoid
+            try:
+                altitude = sentence.field_fixed(9, 2)
+                geoid_height = sentence.field_fixed(11, 2)
+            except ValueError:
+                altitude = 0
+                geoid_height = 0
+
+            # Update Object Data
+            self.set_position_e7(lat_degs, lat_mins, lat_hemi, lon_degs, lon_mins, lon_hemi)
+            self.altitude_cm = altitude
+            self.geoid_height_cm = geoid_height
+
+        # Update Object Data
+        self.set_timestamp(hours, minutes, self.buffer_seconds(seconds_e3))
+        self.satellites_in_use = satellites_in_use
+        self.hdop_e2 = hdop
+        self.fix_stat = fix_stat
+
+        # If Fix is GOOD, update fix timestamp
+        if fix_stat:
+            self.new_fix_time()
+
+        return True
+
+    def gpgsa_buffer(self):
+        """Parse GNSS DOP and Active Satellites (GSA) sentence from the SentenceBuffer. Same updates as gpgsa() in
+        fixed point mode, with satellites_used rewritten in place"""
+        sentence = self.sentence
+
+        # Fix Type (None,2D or 3D)
+        try:
+            fix_type = sentence.field_int(2)
+        except ValueError:
+            return False
+
+        # Count the (up to 12) PRN Satellite Numbers and check them before anything is updated
+        sats_count = 0
+        try:
+            while sats_count < 12 and sentence.field_length(3 + sats_count):
+                sentence.field_int(3 + sats_count)
+                sats_count += 1
+
+            # PDOP,HDOP,VDOP
+            pdop = sentence.field_fixed(15, 2)
+            hdop = sentence.field_fixed(16, 2)
+            vdop = sentence.field_fixed(17, 2)
+        except ValueError:
+            return False
+
+        # Update Object Data
+        self.fix_type = fix_type
+
+        # If Fix is GOOD, update fix timestamp
+        if fix_type > self.__NO_FIX:
+            self.new_fix_time()
+
+        sats_used = self.satellites_used
+        for sats in range(sats_count):
+            if sats < len(sats_used):
+                sats_used[sats] = sentence.field_int(3 + sats)
+            else:
+                sats_used.append(sentence.field_int(3 + sats))
+        while len(sats_used) > sats_count:
+            sats_used.pop()
+        self.hdop_e2 = hdop
+        self.vdop_e2 = vdop
+        self.pdop_e2 = pdop
+
+        return True
+
+    def gpgsv_buffer(self):
+        """Parse Satellites in View (GSV) sentence from the SentenceBuffer. Same updates as gpgsv()"""
+        sentence = self.sentence
+        try:
+            num_sv_sentences = sentence.field_int(1)
+            current_sv_sentence = sentence.field_int(2)
+            sats_in_view = sentence.field_int(3)
+        except ValueError:
+            return False
+
+        # Satellites are stored per constellation, so GLONASS sentences don't overwrite GPS data
+        table = self.satellite_table
+        constellation = satellite_constellation(self.talker)
+
+        # A new set of sentences makes the satellites of the previous set stale
+        if constellation >= 0 and current_sv_sentence == 1:
+            table.new_group(constellation, sats_in_view)
+
+        # Calculate  Number of Satelites to pull data for and thus how many segment positions to read
+        if num_sv_sentences == current_sv_sentence:
+            # Last sentence may have 1-4 satellites; 5 - 20 positions
+            sat_segment_limit = (sats_in_view - ((num_sv_sentences - 1) * 4)) * 5
+        else:
+            sat_segment_limit = 20  # Non-last sentences have 4 satellites and thus read up to position 20
+
+        # Try to recover data for up to 4 satellites in sentence, missing fields read as empty
+        for sats in range(4, sat_segment_limit, 4):
+
+            # If no PRN is found, then the sentence has no more satellites to read
+            if not sentence.field_length(sats):
+                break
+
+            # If a PRN is present, grab satellite data
+            try:
+                sat_id = sentence.field_int(sats)
+            except ValueError:
+                return False
+
+            try:  # elevation can be null (no value) when not tracking
+                elevation = sentence.field_int(sats + 1)
+                if not 0 <= elevation <= 90:
+                    elevation = NO_ELEVATION
+            except ValueError:
+                elevation = NO_ELEVATION
+
+            try:  # azimuth can be null (no value) when not tracking
+                azimuth = sentence.field_int(sats + 2)
+                if not 0 <= azimuth <= 359:
+                    azimuth = NO_AZIMUTH
+            except ValueError:
+                azimuth = NO_AZIMUTH
+
+            try:  # SNR can be null (no value) when not tracking
+                snr = sentence.field_int(sats + 3)
+                if not 0 <= snr <= 99:
+                    snr = NO_SNR
+            except ValueError:
+                snr = NO_SNR
+
+            # Add Satellite Data to the table
+            if constellation >= 0:
+                table.update(constellation, sat_id, elevation, azimuth, snr)
+
+        # Update Object Data
+        self.total_sv_sentences = num_sv_sentences
+        self.last_sv_sentence = current_sv_sentence
+        self.satellites_in_view = sats_in_view
+
+        return True
+
+    def buffer_seconds(self, seconds_e3):
+        """Timestamp seconds as a float from thousandths of a second. Whole seconds come from whole_seconds, so they
+        don't allocate"""
+        if seconds_e3 % 1000 == 0 and 0 <= seconds_e3 < 61000:
+            return self.whole_seconds[seconds_e3 // 1000]
+        return seconds_e3 / 1000
+
+    def set_epoch(self, year, month, day, utc_hours, minutes, seconds_e3):
+        """Validate a UTC date and time and store it as epoch_seconds and epoch_ms. An invalid date or time leaves
+        epoch_seconds at -1. Returns True if the time was valid"""
+        if not (2000 <= year and 1 <= month <= 12 and 1 <= day <= days_in_month(year, month) and
+                0 <= utc_hours <= 23 and 0 <= minutes <= 59 and 0 <= seconds_e3 < 61000):
+            self.epoch_seconds = -1
+            return False
+        seconds = seconds_e3 // 1000
+        self.epoch_seconds = ((days_from_civil(year, month, day) * 24 + utc_hours) * 60 + minutes) * 60 + seconds
+        self.epoch_ms = seconds_e3 - seconds * 1000
+        return True
+
+    def rtc_tuple(self, local=True):
+        """
+        Date and time of the last RMC or ZDA as (year, month, day, weekday, hours, minutes, seconds, subseconds), ready
+        for machine.RTC.datetime(). local_offset is applied unless local is False, moving the date across midnight
+        when needed
+        :return: tuple, or None if no valid date and time has been received
+        """
+        return rtc_tuple(self.epoch_seconds, self.epoch_ms, self.local_offset if local else 0)
+
+    def set_timestamp(self, hours, minutes, seconds):
+        """Store a timestamp in place"""
+        timestamp = self.timestamp
+        timestamp[0] = hours
+        timestamp[1] = minutes
+        timestamp[2] = seconds
+
+    def set_date(self, day, month, year):
+        """Store a date stamp, in place when the date is already a list"""
+        date = self.date
+        if isinstance(date, list):
+            date[0] = day
+            date[1] = month
+            date[2] = year
+        else:
+            self.date = [day, month, year]
+
+    def set_position_e7(self, lat_degs, lat_mins_e6, lat_hemi, lon_degs, lon_mins_e6, lon_hemi):
+        """Store latitude and longitude given as degrees and minutes in millionths as signed 1e-7 degrees"""
+        latitude_e7 = minutes_to_e7(lat_degs, lat_mins_e6)
+        longitude_e7 = minutes_to_e7(lon_degs, lon_mins_e6)
+        self.latitude_e7 = -latitude_e7 if lat_hemi in ('S', 'W') else latitude_e7
+        self.longitude_e7 = -longitude_e7 if lon_hemi in ('S', 'W') else longitude_e7
+        self.position_version += 1
+
+    def clear_position_e7(self):
+        """Clear fixed point position and motion data"""
+        self.latitude_e7 = 0
+        self.longitude_e7 = 0
+        self.speed_mms = 0
+        self.course_e2 = 0
+        self.position_version += 1
+
+    def position_e7(self):
+        """Current position as signed 1e-7 degrees (latitude_e7, longitude_e7), in fixed point and float mode"""
+        if self.fixed_point:
+            return self.latitude_e7, self.longitude_e7
+        return ddm_to_e7(self._latitude), ddm_to_e7(self._longitude)
+
     ##########################################
     # Data Stream Handler Functions
     ##########################################
@@ -563,17 +1364,27 @@ class NmeaParser(object):
         ascii_char = ord(new_char)
 
         if 10 <= ascii_char <= 126:
+            # LF is never part of a sentence, inside one it is idle padding from a receiver that ran dry
+            if ascii_char == 10 and self.sentence_active:
+                if self.log_en:
+                    self.log.write_char(ascii_char)
+                return None
+
             self.char_count += 1
 
-            # Write Character to log file if enabled
+            # Write Character to log buffer if enabled
             if self.log_en:
-                self.write_log(new_char)
+                self.log.write_char(ascii_char)
 
             # Check if a new string is starting ($)
             if new_char == '$':
+                self.skipping = False
                 self.new_sentence()
                 return None
 
+            elif self.skipping:
+                self.skipped_bytes += 1
+
             elif self.sentence_active:
 
                 # Check if sentence is ending (*)
@@ -586,6 +1397,14 @@ class NmeaParser(object):
                 # Check if a section is ended (,), Create a new substring to feed
                 # characters to
                 elif new_char == ',':
+                    # Skip unsubscribed sentences once the address field is complete
+                    if self.active_segment == 0 and self.subscribed is not None and \
+                            self.gps_segments[0][2:] not in self.subscribed:
+                        self.sentence_active = False
+                        self.skipping = True
+                        self.skipped_bytes += self.char_count + 1
+                        return None
+
                     self.active_segment += 1
                     self.gps_segments.append('')
 
@@ -606,6 +1425,15 @@ class NmeaParser(object):
                             except ValueError:
                                 pass  # CRC Value was deformed and could not have been correct
 
+                            statistics = self.statistics
+                            if statistics is not None:
+                                slot = self.stat_slot(self.gps_segments[0])
+                                statistics[slot + RECEIVED] = (statistics[slot + RECEIVED] + 1) & COUNTER_MASK
+                                statistics[slot + RECEIVED_BYTES] = \
+                                    (statistics[slot + RECEIVED_BYTES] + self.char_count + 1) & COUNTER_MASK
+                                if not valid_sentence:
+                                    statistics[slot + CRC_FAILED] = (statistics[slot + CRC_FAILED] + 1) & COUNTER_MASK
+
                 # Update CRC
                 if self.process_crc:
                     self.crc_xor ^= ascii_char
@@ -613,30 +1441,418 @@ class NmeaParser(object):
                 # If a Valid Sentence Was received and it's a supported sentence, then parse it!!
                 if valid_sentence:
                     self.clean_sentences += 1  # Increment clean sentences received
+                    self.sentence_length = self.char_count + 1
                     self.sentence_active = False  # Clear Active Processing Flag
+                    if self.decimation_state is not None and self.decimated_segments():
+                        return None
 
-                    if self.gps_segments[0] in self.supported_sentences:
-
-                        # parse the Sentence Based on the message type, return True if parse is clean
-                        if self.supported_sentences[self.gps_segments[0]](self):
-
-                            # Let host know that the GPS object was updated by returning parsed sentence type
-                            self.parsed_sentences += 1
-                            return self.gps_segments[0]
+                    # Let host know that the GPS object was updated by returning parsed sentence type
+                    return self.parse_segments()
 
                 # Check that the sentence buffer isn't filling up with Garage waiting for the sentence to complete
                 if self.char_count > self.SENTENCE_LIMIT:
                     self.sentence_active = False
+                    if self.statistics is not None:
+                        slot = self.stat_slot(self.gps_segments[0]) + OVERFLOWED
+                        self.statistics[slot] = (self.statistics[slot] + 1) & COUNTER_MASK
 
         # Tell Host no new sentence was parsed
         return None
 
+    def parse_segments(self):
+        """Parse the CRC validated sentence held in gps_segments with the sentence function for its 3 letter type,
+        whatever the talker. Returns the address field (e.g. 'GNRMC') on successful parse, None otherwise"""
+        address = self.gps_segments[0]
+        if len(address) == 5:
+            handler = self.supported_sentences.get(address[2:])
+
+            # parse the Sentence Based on the message type, return True if parse is clean
+            if handler is not None:
+                self.talker = address[:2]
+                if self.statistics is None:
+                    parsed = handler(self)
+                else:
+                    parsed = self.timed_parse(handler, self.stat_slot(address))
+                if parsed:
+                    self.parsed_sentences += 1
+                    if self.listeners:
+                        self.notify(address[2:])
+                    return address
+
+        return None
+
+    def feed(self, buf):
+        """Process a whole chunk of received bytes (bytes, bytearray or memoryview), e.g. as returned by
+        GPS.get_raw_bytes(). Sentences are framed on '$' and '*hh' with split() and find(), CRC checked in one pass
+        and parsed with the same sentence functions as update(). A sentence split across chunks is carried over to
+        the next call. Returns the number of sentences successfully parsed"""
+
+        # Write printable characters of the chunk to log buffer if enabled
+        if self.log_en:
+            self.write_log(printable(bytes(buf)))
+
+        if self.sentence is not None:
+            return self.feed_buffer(buf)
+
+        data = self.feed_pending + bytes(buf) if self.feed_pending else bytes(buf)
+        self.feed_pending = b''
+
+        parsed = 0
+        limit = self.SENTENCE_LIMIT
+        supported_sentences = self.supported_sentences
+        stat_slots = self.stat_slots_bytes
+
+        # Non printable chars are rare, only look for them in each sentence when the chunk contains any
+        dirty = unprintable(data)
+
+        # Everything before the first '$' can't be part of a new sentence
+        parts = data.split(b'$')
+        last = len(parts) - 1
+        subscribed = self.subscribed_bytes
+        statistics = self.statistics
+        decimation_state = self.decimation_state
+
+        # Rest of an unsubscribed sentence from the previous chunk, or the tail of a sentence whose start was lost
+        if self.feed_skipping:
+            self.skipped_bytes += len(parts[0])
+            self.feed_skipping = last == 0
+        elif parts[0].strip(b'\r\n'):
+            self.lost_sentences += 1
+
+        for index in range(1, last + 1):
+            part = parts[index]
+            star = part.find(b'*')
+
+            # Rejoin a sentence the receiver padded in the middle, e.g. the start carried over from the last chunk.
+            # framing.unpad() written out, a LF before the end of the CRC digits is padding
+            if part.find(b'\n', 0, star + 3 if star >= 0 else len(part)) >= 0:
+                part = part.replace(b'\n', b'')
+                star = part.find(b'*')
+
+            # Sentence type once the address field is complete, e.g. b'RMC'
+            sentence_type = part[2:5] if len(part) > 5 and part[5] == 44 else None
+
+            # Skip unsubscribed sentences once the address field is complete
+            if subscribed is not None and len(part) > 5 and (sentence_type is None or sentence_type not in subscribed):
+                self.skipped_bytes += len(part) + 1
+                if index == last:
+                    self.feed_skipping = True
+                continue
+
+            slot = stat_slots.get(sentence_type, _STAT_OTHER)
+
+            if star < 0 or len(part) < star + 3:
+                # Sentence incomplete, a following '$' restarts it as it would in update(), otherwise keep it for the
+                # next chunk if it can still become valid
+                if index == last and len(part) <= limit:
+                    self.feed_pending = b'$' + part
+                    continue
+                self.lost_sentences += 1
+                if len(part) > limit and statistics is not None:
+                    statistics[slot + OVERFLOWED] = (statistics[slot + OVERFLOWED] + 1) & COUNTER_MASK
+                continue
+
+            # Sentence buffer filled up with garbage before the sentence was complete
+            if star + 2 > limit:
+                if statistics is not None:
+                    statistics[slot + OVERFLOWED] = (statistics[slot + OVERFLOWED] + 1) & COUNTER_MASK
+                continue
+
+            if statistics is not None:
+                statistics[slot + RECEIVED] = (statistics[slot + RECEIVED] + 1) & COUNTER_MASK
+                statistics[slot + RECEIVED_BYTES] = (statistics[slot + RECEIVED_BYTES] + star + 4) & COUNTER_MASK
+
+            try:
+                final_crc = int(part[star + 1:star + 3], 16)
+            except ValueError:
+                # CRC Value was deformed and could not have been correct
+                if statistics is not None:
+                    statistics[slot + CRC_FAILED] = (statistics[slot + CRC_FAILED] + 1) & COUNTER_MASK
+                continue
+
+            sentence = part[:star]
+            crc = crc_xor(sentence, 0, star)
+
+            if dirty and unprintable(sentence):
+                # update() drops non printable chars, so leave them out of the CRC and the segments too
+                sentence = printable(sentence)
+                crc = crc_xor(sentence, 0, len(sentence))
+
+            if crc != final_crc:
+                self.crc_fails += 1
+                if statistics is not None:
+                    statistics[slot + CRC_FAILED] = (statistics[slot + CRC_FAILED] + 1) & COUNTER_MASK
+                continue
+
+            self.clean_sentences += 1
+            self.sentence_length = star + 4
+
+            # Skip decimated sentences before they are decoded
+            if decimation_state is not None and len(sentence) > 5 and sentence[5] == 44:
+                key = address_key(sentence)
+                state = decimation_state.get(key)
+                if state is None:
+                    state = self.decimation_entry(key, bytes(sentence[2:5]).decode())
+                if state:
+                    group_start = False
+                    if state[5]:
+                        comma = sentence.find(b',', 6)
+                        group_start = 0 < comma < len(sentence) - 2 and sentence[comma + 1] == 49 and \
+                            sentence[comma + 2] == 44
+                    if self.skip_decimated(state, group_start):
+                        continue
+
+            self.gps_segments = segments = sentence.decode().split(',')
+            segments.append(part[star + 1:star + 3].decode())
+            address = segments[0]
+            handler = supported_sentences.get(address[2:]) if len(address) == 5 else None
+            if handler is None:
+                continue
+            self.talker = address[:2]
+
+            # timed_parse() written out
+            if statistics is None:
+                if not handler(self):
+                    continue
+            else:
+                start = ticks_us()
+                success = handler(self)
+                statistics[slot + PARSE_US] = \
+                    (statistics[slot + PARSE_US] + ticks_diff(ticks_us(), start)) & COUNTER_MASK
+                if not success:
+                    statistics[slot + REJECTED] = (statistics[slot + REJECTED] + 1) & COUNTER_MASK
+                    continue
+
+            self.parsed_sentences += 1
+            parsed += 1
+            if self.listeners:
+                self.notify(address[2:])
+
+        return parsed
+
+    def feed_buffer(self, buf):
+        """feed() in fixed buffer mode. Sentences are copied into the SentenceBuffer, which keeps a sentence split
+        across chunks until the rest arrives. Returns the number of sentences successfully parsed"""
+        sentence = self.sentence
+        statistics = self.statistics
+        # Sentence bodies of a chunk without non printable chars are copied with one slice assignment
+        clean = SLICE_COPY and not isinstance(buf, memoryview) and not unprintable(buf)
+        parsed = 0
+        position = 0
+        end = len(buf)
+
+        # The tail of a sentence whose start was lost, anything but CR LF or padding before the first '$'
+        if end and not sentence.active and not self.skipping and buf[0] != 36 and buf[0] != 13 and buf[0] != 10:
+            self.lost_sentences += 1
+
+        while position < end:
+            if not sentence.active:
+                # Skip to the next '$', counting the rest of an unsubscribed sentence
+                start = position
+                position = find_start(buf, position, end)
+                if self.skipping:
+                    self.skipped_bytes += position - start
+                if position == end:
+                    break
+                self.skipping = False
+                sentence.start()
+                position += 1
+
+            position = sentence.load(buf, position, end, clean)
+
+            status = sentence.status
+            if statistics is not None and (status == VALID or status == CRC_FAIL or status == MALFORMED):
+                slot = self.buffer_stat_slot()
+                statistics[slot + RECEIVED] = (statistics[slot + RECEIVED] + 1) & COUNTER_MASK
+                statistics[slot + RECEIVED_BYTES] = \
+                    (statistics[slot + RECEIVED_BYTES] + sentence.char_count + 1) & COUNTER_MASK
+                if status != VALID:
+                    statistics[slot + CRC_FAILED] = (statistics[slot + CRC_FAILED] + 1) & COUNTER_MASK
+
+            if status == VALID:
+                self.clean_sentences += 1
+                self.sentence_length = sentence.char_count + 1
+                if self.decimation_state is not None and self.decimated_buffer():
+                    continue
+                if self.parse_buffer():
+                    parsed += 1
+            elif status == CRC_FAIL:
+                self.crc_fails += 1
+            elif status == OVERFLOW:
+                self.lost_sentences += 1
+                if statistics is not None:
+                    slot = self.buffer_stat_slot()
+                    statistics[slot + OVERFLOWED] = (statistics[slot + OVERFLOWED] + 1) & COUNTER_MASK
+            elif status == RESTART:
+                # A new '$' arrived before the rest of the sentence
+                self.lost_sentences += 1
+            elif status == SKIPPED:
+                self.skipped_bytes += sentence.char_count + 1
+                self.skipping = True
+
+        return parsed
+
+    def parse_buffer(self):
+        """Parse the CRC validated sentence held in the SentenceBuffer, straight from the buffer for sentence types
+        in buffer_sentences and from gps_segments for the rest. Returns True on successful parse"""
+        sentence = self.sentence
+        key = sentence.type_key()
+        handler = self.buffer_sentences.get(key)
+        if handler is not None:
+            talker = sentence.talker_key()
+            self.talker = self.buffer_talkers.get(talker) or chr(talker >> 8) + chr(talker & 0xFF)
+            if handler(self) if self.statistics is None else self.timed_parse(handler, self.buffer_stat_slot()):
+                self.parsed_sentences += 1
+                if self.listeners:
+                    self.notify(self.buffer_types[key])
+                return True
+            return False
+
+        # Sentence types without a buffer parser are split into strings
+        self.gps_segments = sentence.segments()
+        return self.parse_segments() is not None
+
+    def add_listener(self, callback):
+        """Call callback(parser, sentence_type) after every successfully parsed sentence, sentence_type being the
+        3 letter type such as 'RMC'. Used by EpochAssembler and other consumers of parsed data"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Stop calling a callback registered with add_listener(), which must be passed the same object"""
+        try:
+            self.listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def notify(self, sentence_type):
+        """Pass a successfully parsed sentence type to the listeners"""
+        for callback in self.listeners:
+            callback(self, sentence_type)
+
+    ########################################
+    # Decimation
+    ########################################
+    def set_decimation(self, sentence_type, every=1, interval_ms=0):
+        """Fully decode only every Nth CRC valid sentence of a type such as 'GSV', and no more than once per
+        interval_ms if set. The first one is always decoded. Skipped sentences are still framed, CRC checked and
+        counted (clean_sentences, decimated_sentences and stats()), but never split into segments or parsed.
+        GSV is decimated by group: the decision is made at message 1 and holds for the rest of the group. Each
+        talker (GPGSV, GLGSV, ...) is counted on its own. every=1 without interval_ms removes the policy"""
+        if every <= 1 and interval_ms <= 0:
+            self.decimation.pop(sentence_type, None)
+        else:
+            self.decimation[sentence_type] = (max(every, 1), interval_ms)
+        self.decimation_state = dict() if self.decimation else None
+
+    def decimation_entry(self, key, sentence_type):
+        """Create the state of an address the first time it is seen: [every, interval_ms, count, ticks of the last
+        decode, group kept, grouped], or False if its type has no policy"""
+        policy = self.decimation.get(sentence_type)
+        state = [policy[0], policy[1], policy[0] - 1, None, True, sentence_type == 'GSV'] if policy else False
+        self.decimation_state[key] = state
+        return state
+
+    def skip_decimated(self, state, group_start):
+        """Count an occurrence against a decimation state. Returns True if the sentence is to be skipped"""
+        if state[5] and not group_start:
+            keep = state[4]
+        else:
+            state[2] += 1
+            keep = state[2] >= state[0]
+            if keep and state[1] > 0 and state[3] is not None:
+                keep = ticks_diff(ticks_ms(), state[3]) >= state[1]
+            if keep:
+                state[2] = 0
+                if state[1] > 0:
+                    state[3] = ticks_ms()
+            state[4] = keep
+        if not keep:
+            self.decimated_sentences += 1
+        return not keep
+
+    def decimated_segments(self):
+        """Check if the CRC valid sentence in gps_segments is skipped by its decimation policy"""
+        segments = self.gps_segments
+        address = segments[0]
+        if len(address) != 5:
+            return False
+        state = self.decimation_state.get(address)
+        if state is None:
+            state = self.decimation_entry(address, address[2:])
+        return bool(state) and self.skip_decimated(state, state[5] and len(segments) > 2 and segments[2] == '1')
+
+    def decimated_buffer(self):
+        """Check if the CRC valid sentence in the SentenceBuffer is skipped by its decimation policy"""
+        sentence = self.sentence
+        if sentence.field_length(0) != 5:
+            return False
+        key = address_key(sentence.data)
+        state = self.decimation_state.get(key)
+        if state is None:
+            state = self.decimation_entry(key, bytes(sentence.data[2:5]).decode())
+        return bool(state) and self.skip_decimated(
+            state, state[5] and sentence.field_length(2) == 1 and sentence.field_char(2) == 49)
+
+    ########################################
+    # Sentence Type Statistics
+    ########################################
+    def stat_slot(self, address):
+        """Offset of the counters of a sentence in statistics, from its address field (e.g. 'GPRMC')"""
+        if len(address) != 5:
+            return _STAT_OTHER
+        return self.stat_slots.get(address[2:], _STAT_OTHER)
+
+    def bytes_stat_slot(self, sentence):
+        """stat_slot() of a sentence as bytes from its address field on, e.g. b'GPRMC,081836,...'"""
+        if len(sentence) < 6 or sentence[5] != 44:
+            return _STAT_OTHER
+        return self.stat_slots_bytes.get(sentence[2:5], _STAT_OTHER)
+
+    def buffer_stat_slot(self):
+        """stat_slot() of the sentence in the SentenceBuffer"""
+        sentence = self.sentence
+        if sentence.fields < 2 or sentence.field_length(0) != 5:
+            return _STAT_OTHER
+        return self.stat_slots_keys.get(sentence.type_key(), _STAT_OTHER)
+
+    def timed_parse(self, handler, slot):
+        """Run a sentence function, adding its run time to the counters at slot and counting it as rejected if it
+        returns False. Returns what the sentence function returned"""
+        statistics = self.statistics
+        start = ticks_us()
+        parsed = handler(self)
+        statistics[slot + PARSE_US] = (statistics[slot + PARSE_US] + ticks_diff(ticks_us(), start)) & COUNTER_MASK
+        if not parsed:
+            statistics[slot + REJECTED] = (statistics[slot + REJECTED] + 1) & COUNTER_MASK
+        return parsed
+
+    def stats(self):
+        """Snapshot of the statistics as {sentence_type: {'received': ..., 'crc_fails': ..., 'rejected': ...,
+        'overflows': ..., 'bytes': ..., 'parse_us': ...}} for the sentence types seen so far. Sentences of other
+        types, or whose address field couldn't be read, are under 'other'. None if statistics are off"""
+        statistics = self.statistics
+        if statistics is None:
+            return None
+        snapshot = dict()
+        width = len(STAT_FIELDS)
+        for index, sentence_type in enumerate(STAT_TYPES):
+            slot = index * width
+            if statistics[slot + RECEIVED] or statistics[slot + OVERFLOWED]:
+                snapshot[sentence_type] = {field: statistics[slot + offset] for offset, field in enumerate(STAT_FIELDS)}
+        return snapshot
+
+    def clear_stats(self):
+        """Reset the per sentence type statistics"""
+        if self.statistics is not None:
+            for index in range(len(self.statistics)):
+                self.statistics[index] = 0
+
     def new_fix_time(self):
         """Updates a high resolution counter with current time when fix is updated. Currently only triggered from
         GGA, GSA and RMC sentences"""
-        try:
+        if utime is not None:
             self.fix_time = utime.ticks_ms()
-        except NameError:
+        else:
             self.fix_time = time.time()
 
     #########################################
@@ -667,6 +1883,15 @@ class NmeaParser(object):
         """
         return list(self.satellite_data.keys())
 
+    @property
+    def satellite_data(self):
+        """
+        Satellites from the current GSV groups of every constellation as {PRN: (elevation, azimuth, snr)}, built
+        from satellite_table on each access
+        :return: dict
+        """
+        return self.satellite_table.as_dict()
+
     def time_since_fix(self):
         """Returns number of millisecond since the last sentence with a valid fix was parsed. Returns 0 if
         no fix has been found"""
@@ -677,9 +1902,9 @@ class NmeaParser(object):
 
         # Try calculating fix time using utime; if not running MicroPython
         # time.time() returns a floating point value in secs
-        try:
+        if utime is not None:
             current = utime.ticks_diff(utime.ticks_ms(), self.fix_time)
-        except NameError:
+        else:
             current = (time.time() - self.fix_time) * 1000  # ms
 
         return current
@@ -689,11 +1914,13 @@ class NmeaParser(object):
         Determine a cardinal or inter-cardinal direction based on current course.
         :return: string
         """
+        course = self.course_e2 / 100 if self.fixed_point else self.course
+
         # Calculate the offset for a rotated compass
-        if self.course >= 348.75:
-            offset_course = 360 - self.course
+        if course >= 348.75:
+            offset_course = 360 - course
         else:
-            offset_course = self.course + 11.25
+            offset_course = course + 11.25
 
         # Each compass point is separated by 22.5 degrees, divide to find lookup value
         dir_index = floor(offset_course / 22.5)
@@ -704,33 +1931,37 @@ class NmeaParser(object):
 
     def latitude_string(self):
         """
-        Create a readable string of the current latitude data
+        Create a readable string of the current latitude data, reused until the position or coord_format changes
         :return: string
         """
-        if self.coord_format == 'dd':
-            formatted_latitude = self.latitude
-            lat_string = str(formatted_latitude[0]) + '° ' + str(self._latitude[2])
-        elif self.coord_format == 'dms':
-            formatted_latitude = self.latitude
-            lat_string = str(formatted_latitude[0]) + '° ' + str(formatted_latitude[1]) + "' " + str(formatted_latitude[2]) + '" ' + str(formatted_latitude[3])
-        else:
-            lat_string = str(self._latitude[0]) + '° ' + str(self._latitude[1]) + "' " + str(self._latitude[2])
-        return lat_string
+        if self.string_version != self.position_version or self.string_format != self.coord_format:
+            self.update_strings()
+        return self.latitude_text
 
     def longitude_string(self):
         """
-        Create a readable string of the current longitude data
+        Create a readable string of the current longitude data, reused until the position or coord_format changes
         :return: string
         """
+        if self.string_version != self.position_version or self.string_format != self.coord_format:
+            self.update_strings()
+        return self.longitude_text
+
+    def update_strings(self):
+        """Rebuild the latitude and longitude strings for the current position and coord_format"""
+        self.latitude_text = self.coordinate_string(self.latitude)
+        self.longitude_text = self.coordinate_string(self.longitude)
+        self.string_version = self.position_version
+        self.string_format = self.coord_format
+
+    def coordinate_string(self, formatted):
+        """Readable string of a coordinate formatted as coord_format asks"""
         if self.coord_format == 'dd':
-            formatted_longitude = self.longitude
-            lon_string = str(formatted_longitude[0]) + '° ' + str(self._longitude[2])
+            return str(formatted[0]) + '° ' + str(formatted[1])
         elif self.coord_format == 'dms':
-            formatted_longitude = self.longitude
-            lon_string = str(formatted_longitude[0]) + '° ' + str(formatted_longitude[1]) + "' " + str(formatted_longitude[2]) + '" ' + str(formatted_longitude[3])
+            return str(formatted[0]) + '° ' + str(formatted[1]) + "' " + str(formatted[2]) + '" ' + str(formatted[3])
         else:
-            lon_string = str(self._longitude[0]) + '° ' + str(self._longitude[1]) + "' " + str(self._longitude[2])
-        return lon_string
+            return str(formatted[0]) + '° ' + str(formatted[1]) + "' " + str(formatted[2])
 
     def speed_string(self, unit='kph'):
         """
@@ -738,18 +1969,23 @@ class NmeaParser(object):
         :param unit: string of 'kph','mph, or 'knot'
         :return:
         """
+        speed = self.speed
+        if self.fixed_point:
+            spd_knt = self.speed_mms * 900 / 463000
+            speed = (spd_knt, spd_knt * 1.151, spd_knt * 1.852)
+
         if unit == 'mph':
-            speed_string = str(self.speed[1]) + ' mph'
+            speed_string = str(speed[1]) + ' mph'
 
         elif unit == 'knot':
-            if self.speed[0] == 1:
+            if speed[0] == 1:
                 unit_str = ' knot'
             else:
                 unit_str = ' knots'
-            speed_string = str(self.speed[0]) + unit_str
+            speed_string = str(speed[0]) + unit_str
 
         else:
-            speed_string = str(self.speed[2]) + ' km/h'
+            speed_string = str(speed[2]) + ' km/h'
 
         return speed_string
 
@@ -815,16 +2051,31 @@ class NmeaParser(object):
         return date_string
 
     # All the currently supported NMEA sentences
-    supported_sentences = {'GPRMC': gprmc, 'GLRMC': gprmc,
-                           'GPGGA': gpgga, 'GLGGA': gpgga,
-                           'GPVTG': gpvtg, 'GLVTG': gpvtg,
-                           'GPGSA': gpgsa, 'GLGSA': gpgsa,
-                           'GPGSV': gpgsv, 'GLGSV': gpgsv,
-                           'GPGLL': gpgll, 'GLGLL': gpgll,
-                           'GNGGA': gpgga, 'GNRMC': gprmc,
-                           'GNVTG': gpvtg, 'GNGLL': gpgll,
-                           'GNGSA': gpgsa,
-                          }
+    # Sentence functions by 3 letter type, for any talker (GP, GL, GA, GB, BD, GN, ...)
+    supported_sentences = {'RMC': gprmc, 'GGA': gpgga, 'VTG': gpvtg, 'GSA': gpgsa, 'GSV': gpgsv, 'GLL': gpgll,
+                           'ZDA': zda, 'GNS': gns}
+
+    buffer_sentences = {type_key(b'RMC'): gprmc_buffer,
+                        type_key(b'GGA'): gpgga_buffer,
+                        type_key(b'GSA'): gpgsa_buffer,
+                        type_key(b'GSV'): gpgsv_buffer,
+                        }
+    buffer_types = {type_key(b'RMC'): 'RMC',
+                    type_key(b'GGA'): 'GGA',
+                    type_key(b'GSA'): 'GSA',
+                    type_key(b'GSV'): 'GSV',
+                    }
+    # Offsets of the statistics counters of each sentence type, by type as str, bytes and type_key()
+    stat_slots = {sentence_type: index * len(STAT_FIELDS) for index, sentence_type in enumerate(STAT_TYPES[:-1])}
+    stat_slots_bytes = {sentence_type.encode(): slot for sentence_type, slot in stat_slots.items()}
+    stat_slots_keys = {type_key(sentence_type.encode()): slot for sentence_type, slot in stat_slots.items()}
+
+    # Common talkers as strings, so setting talker doesn't allocate
+    buffer_talkers = {talker_key(b'GP'): 'GP', talker_key(b'GL'): 'GL', talker_key(b'GA'): 'GA',
+                      talker_key(b'GB'): 'GB', talker_key(b'BD'): 'BD', talker_key(b'GN'): 'GN'}
+
+    # Whole seconds as floats, so timestamps without a fraction don't allocate one in fixed buffer mode
+    whole_seconds = tuple(float(second) for second in range(61))
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
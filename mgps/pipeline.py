@@ -0,0 +1,390 @@
+"""
+# Pipeline - asyncio streaming of receiver data: chunk source -> framer -> validator -> decoder -> subscribers
+# The MIT License (MIT) - see LICENSE file
+"""
+
+import asyncio
+
+from .nmea_parser import NmeaParser, RECEIVED, CRC_FAILED, RECEIVED_BYTES, COUNTER_MASK
+from .capture import PADDING
+from .framing import crc_xor, unpad
+from .ticks import ticks_ms
+
+
+class Stage(object):
+    """Pipeline stage. push() takes one item from the previous stage and hands zero or more results to emit(), which
+    pushes them into the next stage. Stages do no I/O and never block. A stage may also hold results back and hand
+    them on in drain(), yielding to the scheduler in between. The source awaits drain() after every chunk and yields
+    before the next read, the framer yields between sentences"""
+
+    def __init__(self):
+        self.downstream = None
+        self.received = 0
+        self.emitted = 0
+        self.dropped = 0
+
+    def connect(self, stage):
+        """Send this stage's output to stage. Returns stage, so calls can be chained"""
+        self.downstream = stage
+        return stage
+
+    def push(self, item):
+        """Process one item, the default passes it through"""
+        self.received += 1
+        self.emit(item)
+
+    def emit(self, item):
+        """Hand a result to the next stage"""
+        self.emitted += 1
+        if self.downstream is not None:
+            self.downstream.push(item)
+
+    async def drain(self):
+        """Hand on the results held back, the default has none and drains the next stage"""
+        if self.downstream is not None:
+            await self.downstream.drain()
+
+
+class ChunkSource(Stage):
+    """Async byte source. run() calls read() (e.g. GPS.get_raw_bytes or CaptureReader.read), pushes each chunk into
+    the pipeline and yields to the scheduler before the next read. When a read ended in idle padding, the next read
+    is delayed by idle_ms. ticks holds the ticks_ms() at the start of the read of the chunk being processed and
+    previous_ticks that of the read before"""
+
+    def __init__(self, read, idle_ms=100):
+        super().__init__()
+        self.read = read
+        self.idle_ms = idle_ms
+        self.running = False
+        self.ticks = 0
+        self.previous_ticks = None
+
+    async def run(self):
+        """Read and push chunks until stop() is called or read() returns an empty chunk. The time of the previous read
+        is forgotten, as the run may follow a long stop"""
+        self.running = True
+        self.previous_ticks = None
+        first = True
+        while self.running:
+            if not first:
+                self.previous_ticks = self.ticks
+            first = False
+            self.ticks = ticks_ms()
+            chunk = self.read()
+            if not chunk:
+                break
+            self.received += 1
+            self.emit(chunk)
+            await self.drain()
+            if chunk[len(chunk) - 1] == PADDING:
+                # The receiver buffer is drained, give it time to fill up
+                await asyncio.sleep(self.idle_ms / 1000)
+            else:
+                await asyncio.sleep(0)
+        self.running = False
+
+    def stop(self):
+        """End run() after the current chunk"""
+        self.running = False
+
+
+class Framer(Stage):
+    """Cuts chunks into sentences. Emits the bytes between '$' and the end of the two CRC digits, e.g.
+    b'GPRMC,...*6A'. A sentence split across chunks is kept until the rest arrives, idle padding inside a sentence is
+    removed with framing.unpad() and non printable characters are dropped as NmeaParser.update() does.
+    Given the parser, sentences of types it isn't subscribed to are dropped as soon as their address field is
+    complete, before they are copied or CRC checked, and counted in the parser's skipped_bytes.
+    While a sentence is passed on, sentence_end is the offset in the current chunk just past its CRC digits, chunk_end
+    the length of the chunk without trailing idle padding and drained whether there was such padding. TimeSync uses
+    these to work out when the receiver sent the sentence.
+    The sentences of a chunk are emitted by drain(), one at a time with a yield to the scheduler in between, so a
+    chunk full of sentences doesn't hold up other tasks while they are decoded.
+    lost counts the sentences lost to chunking as reassembly.Reassembler.lost does, and is added to the parser's
+    lost_sentences"""
+
+    def __init__(self, parser=None):
+        super().__init__()
+        self.parser = parser
+        self.pending = b''
+        self.skipping = False
+        self.sentence_end = 0
+        self.chunk_end = 0
+        self.drained = False
+        self.lost = 0
+        # Sentences framed from the current chunk and their sentence_end, waiting for drain()
+        self.sentences = []
+        self.ends = []
+
+    def clear(self):
+        """Forget a carried over sentence start, e.g. before reading again after a long stop"""
+        self.pending = b''
+        self.skipping = False
+
+    def push(self, chunk):
+        self.received += 1
+        offset = -len(self.pending)  # Chunk offset of data[0]
+        data = self.pending + bytes(chunk) if self.pending else bytes(chunk)
+        self.pending = b''
+
+        self.chunk_end = max(len(data.rstrip(b'\n')) + offset, 0)
+        self.drained = self.chunk_end < len(chunk)
+
+        parser = self.parser
+        subscribed = parser.subscribed_bytes if parser is not None else None
+
+        parts = data.split(b'$')
+        last = len(parts) - 1
+
+        # Rest of an unsubscribed sentence from the previous chunk, or the tail of a sentence whose start was lost
+        if self.skipping:
+            parser.skipped_bytes += len(parts[0])
+            self.skipping = last == 0
+        elif parts[0].strip(b'\r\n'):
+            self.lose()
+
+        for index in range(1, last + 1):
+            offset += len(parts[index - 1]) + 1
+            part = unpad(parts[index])
+            # Skip unsubscribed sentences once the address field is complete
+            if subscribed is not None and len(part) > 5 and (part[5] != 44 or part[2:5] not in subscribed):
+                parser.skipped_bytes += len(part) + 1
+                self.dropped += 1
+                if index == last:
+                    self.skipping = True
+                continue
+            # Measured before padding is taken out, so it stays a position in the chunk
+            sentence_end = offset + parts[index].find(b'*') + 3
+            star = part.find(b'*')
+            if star < 0 or star + 3 > len(part):
+                if index == last and len(part) <= NmeaParser.SENTENCE_LIMIT:
+                    self.pending = b'$' + part
+                else:
+                    self.dropped += 1
+                    self.lose()
+                continue
+            sentence = part[:star + 3]
+            for char in sentence:
+                if not 10 <= char <= 126:
+                    sentence = bytes(char for char in sentence if 10 <= char <= 126)
+                    break
+            self.sentences.append(sentence)
+            self.ends.append(sentence_end)
+
+    async def drain(self):
+        """Emit the sentences framed from the chunk, yielding to the scheduler after each one"""
+        sentences = self.sentences
+        ends = self.ends
+        index = 0
+        while index < len(sentences):
+            self.sentence_end = ends[index]
+            self.emit(sentences[index])
+            index += 1
+            await asyncio.sleep(0)
+        sentences.clear()
+        ends.clear()
+        await Stage.drain(self)
+
+    def lose(self):
+        """Count a sentence lost to chunking"""
+        self.lost += 1
+        if self.parser is not None:
+            self.parser.lost_sentences += 1
+
+
+class Validator(Stage):
+    """Checks the CRC of framed sentences, emits the sentences that pass. Given the parser, every sentence is counted
+    as received and every failure in crc_fails and the statistics of the parser, as NmeaParser.feed() does"""
+
+    def __init__(self, parser=None):
+        super().__init__()
+        self.parser = parser
+        self.crc_fails = 0
+
+    def push(self, sentence):
+        self.received += 1
+        parser = self.parser
+        statistics = parser.statistics if parser is not None else None
+        star = len(sentence) - 3
+        if statistics is not None:
+            slot = parser.bytes_stat_slot(sentence)
+            statistics[slot + RECEIVED] = (statistics[slot + RECEIVED] + 1) & COUNTER_MASK
+            statistics[slot + RECEIVED_BYTES] = (statistics[slot + RECEIVED_BYTES] + star + 4) & COUNTER_MASK
+
+        try:
+            final_crc = int(sentence[star + 1:], 16)
+        except ValueError:
+            # Deformed CRC, counted in the statistics only as NmeaParser.feed() does
+            self.crc_fails += 1
+            if statistics is not None:
+                statistics[slot + CRC_FAILED] = (statistics[slot + CRC_FAILED] + 1) & COUNTER_MASK
+            return
+
+        if crc_xor(sentence, 0, star) == final_crc:
+            self.emit(sentence)
+        else:
+            self.crc_fails += 1
+            if parser is not None:
+                parser.crc_fails += 1
+            if statistics is not None:
+                statistics[slot + CRC_FAILED] = (statistics[slot + CRC_FAILED] + 1) & COUNTER_MASK
+
+
+class Decoder(Stage):
+    """Decodes validated sentences with the NmeaParser sentence functions (gprmc, gpgga, ...), so the parser's data,
+    statistics and listeners are updated exactly as with update() or feed(). Subscriptions are applied by the
+    Framer, received sentences and CRC failures are counted by the Validator. Emits (sentence_type, segments), e.g.
+    ('RMC', ['GPRMC', '081836', ...]), for every sentence that parsed"""
+
+    def __init__(self, parser):
+        super().__init__()
+        self.parser = parser
+
+    def push(self, sentence):
+        self.received += 1
+        parser = self.parser
+        parser.clean_sentences += 1
+        parser.sentence_length = len(sentence) + 1
+
+        star = len(sentence) - 3
+        segments = sentence[:star].decode().split(',')
+        address = segments[0]
+        segments.append(sentence[star + 1:].decode())
+        parser.gps_segments = segments
+
+        # Decimates, counts, times and notifies the listeners as update() does
+        if parser.decimation_state is not None and parser.decimated_segments():
+            self.dropped += 1
+            return
+        if parser.parse_segments() is None:
+            self.dropped += 1
+            return
+        self.emit((address[2:], segments))
+
+
+class Subscriber(object):
+    """Bounded queue of decoded sentences for one consumer. When the consumer falls behind, the oldest entry is
+    dropped and counted in dropped. types limits the queue to some sentence types, e.g. {'RMC'}"""
+
+    def __init__(self, types=None, capacity=4):
+        self.types = types
+        self.capacity = capacity
+        self.items = [None] * capacity
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+        self.event = asyncio.Event()
+
+    def put(self, item):
+        """Queue an item without blocking"""
+        if self.count == self.capacity:
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+            self.dropped += 1
+        self.items[(self.head + self.count) % self.capacity] = item
+        self.count += 1
+        self.event.set()
+
+    def get_nowait(self):
+        """Oldest queued item, or None if the queue is empty"""
+        if not self.count:
+            return None
+        item = self.items[self.head]
+        self.items[self.head] = None
+        self.head = (self.head + 1) % self.capacity
+        self.count -= 1
+        return item
+
+    async def get(self):
+        """Wait for and return the oldest queued item"""
+        while not self.count:
+            self.event.clear()
+            await self.event.wait()
+        return self.get_nowait()
+
+    def clear(self):
+        """Drop every queued item, without counting them as dropped"""
+        while self.count:
+            self.get_nowait()
+
+
+class FanOut(Stage):
+    """Last stage, puts each decoded sentence into the queues of the subscribers interested in its type"""
+
+    def __init__(self):
+        super().__init__()
+        self.subscribers = []
+
+    def subscribe(self, types=None, capacity=4):
+        """Create and return a new Subscriber"""
+        subscriber = Subscriber(types, capacity)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Stop delivering to subscriber"""
+        try:
+            self.subscribers.remove(subscriber)
+        except ValueError:
+            pass
+
+    def push(self, item):
+        self.received += 1
+        sentence_type = item[0]
+        for subscriber in self.subscribers:
+            if subscriber.types is None or sentence_type in subscriber.types:
+                subscriber.put(item)
+
+
+class Pipeline(object):
+    """Connects ChunkSource -> Framer -> Validator -> Decoder -> FanOut for one parser, e.g.
+        pipeline = Pipeline(gps.get_raw_bytes, parser)
+        rmc = pipeline.subscribe({'RMC'}, capacity=1)
+        asyncio.create_task(pipeline.run())
+        sentence_type, segments = await rmc.get()
+    or, to poll the receiver only while a sentence is wanted,
+        sentence_type, segments = await pipeline.next(rmc)"""
+
+    def __init__(self, read, parser, idle_ms=100):
+        self.source = ChunkSource(read, idle_ms)
+        self.framer = Framer(parser)
+        self.validator = Validator(parser)
+        self.decoder = Decoder(parser)
+        self.fanout = FanOut()
+        self.source.connect(self.framer).connect(self.validator).connect(self.decoder).connect(self.fanout)
+        self.task = None
+        self.waiting = 0
+
+    def subscribe(self, types=None, capacity=4):
+        """Create and return a new Subscriber"""
+        return self.fanout.subscribe(types, capacity)
+
+    def unsubscribe(self, subscriber):
+        """Stop delivering to subscriber"""
+        self.fanout.unsubscribe(subscriber)
+
+    async def run(self):
+        """Run the source until it ends or stop() is called"""
+        await self.source.run()
+
+    def stop(self):
+        """End run() after the current chunk"""
+        self.source.stop()
+
+    async def next(self, subscriber):
+        """Run the pipeline until subscriber receives a sentence and return it, dropping anything it queued before.
+        The pipeline is stopped again once no call is waiting, so between calls the receiver isn't polled at all"""
+        subscriber.clear()
+        self.waiting += 1
+        if self.task is None or self.task.done():
+            # Data carried over from before the stop is stale
+            self.framer.clear()
+            self.task = asyncio.create_task(self.run())
+        else:
+            # Stopped but still in its last sleep, carry on
+            self.source.running = True
+        try:
+            return await subscriber.get()
+        finally:
+            self.waiting -= 1
+            if not self.waiting:
+                self.stop()
@@ -0,0 +1,72 @@
+"""
+# Reassembly - complete NMEA sentences from receiver reads that cut sentences in two or pad them with 0x0A
+# The MIT License (MIT) - see LICENSE file
+"""
+
+from .nmea_parser import NmeaParser
+from .framing import unpad, unprintable
+
+
+class Reassembler(object):
+    """Cuts receiver reads, e.g. GPS.get_raw_bytes(), into complete sentences from '$' to the CRC digits.
+    The unfinished sentence at the end of a read is carried over to the next one, at most limit bytes of it, with
+    padding removed by unpad(). Reads are split on '$' with bytes.split(), so after corruption the next sentence is
+    found without looking at every byte. Non printable characters are dropped as NmeaParser.update() does. CRCs are
+    left to the parser.
+    Counters:
+        sentences: Complete sentences returned
+        rejoined: Sentences completed from a carried over start
+        lost: Sentences lost to chunking, i.e. a start that was never completed or a tail whose start was never seen
+        overflows: Carried over starts dropped for growing past limit"""
+
+    def __init__(self, limit=NmeaParser.SENTENCE_LIMIT):
+        self.limit = limit
+        self.pending = b''
+        self.sentences = 0
+        self.rejoined = 0
+        self.lost = 0
+        self.overflows = 0
+
+    def clear(self):
+        """Forget a carried over sentence start, e.g. after the receiver was reset"""
+        self.pending = b''
+
+    def push(self, chunk):
+        """Returns the sentences completed by a read (bytes, bytearray or memoryview) as a list of bytes, e.g.
+        [b'$GPRMC,...*6A', ...]"""
+        carried = len(self.pending)
+        data = self.pending + bytes(chunk) if carried else bytes(chunk)
+        self.pending = b''
+        sentences = []
+
+        parts = data.split(b'$')
+        # Text before the first '$' is the tail of a sentence whose start was in an earlier read that was lost
+        if not carried and parts[0].strip(b'\r\n'):
+            self.lost += 1
+
+        dirty = unprintable(data)
+        last = len(parts) - 1
+        for index in range(1, last + 1):
+            part = unpad(parts[index])
+            star = part.find(b'*')
+            if star < 0 or star + 3 > len(part):
+                if len(part) > self.limit:
+                    self.overflows += 1
+                    self.lost += 1
+                elif index == last:
+                    self.pending = b'$' + part
+                else:
+                    # A new '$' arrived before the rest of the sentence
+                    self.lost += 1
+                continue
+            sentence = part[:star + 3]
+            if dirty:
+                for char in sentence:
+                    if not 10 <= char <= 126:
+                        sentence = bytes(char for char in sentence if 10 <= char <= 126)
+                        break
+            sentences.append(b'$' + sentence)
+            if index == 1 and carried:
+                self.rejoined += 1
+        self.sentences += len(sentences)
+        return sentences
@@ -0,0 +1,195 @@
+"""
+# SatelliteTable - preallocated table of satellites in view, keyed by constellation and PRN
+# The MIT License (MIT) - see LICENSE file
+"""
+
+from array import array
+
+# Constellation indexes, from the talker of the GSV sentence
+GPS = 0
+GLONASS = 1
+GALILEO = 2
+BEIDOU = 3
+QZSS = 4
+GNSS = 5
+
+CONSTELLATIONS = ('GP', 'GL', 'GA', 'GB', 'GQ', 'GN')
+_TALKERS = {'GP': GPS, 'GL': GLONASS, 'GA': GALILEO, 'GB': BEIDOU, 'BD': BEIDOU, 'GQ': QZSS, 'GN': GNSS}
+
+# Stored in place of fields the receiver left empty
+NO_ELEVATION = 255
+NO_AZIMUTH = 0xFFFF
+NO_SNR = 255
+
+# Generation 0 marks a free slot
+_GENERATION_LIMIT = 0xFFFF
+
+
+def constellation(talker):
+    """Constellation index of a 2 letter talker such as 'GP', or -1 if it isn't known"""
+    return _TALKERS.get(talker, -1)
+
+
+class SatelliteTable(object):
+    """Satellites in view from GSV sentences, stored in preallocated columns so a GSV cycle doesn't create any dicts
+    or tuples. Each constellation has its own generation counter, bumped when a new group of GSV sentences starts
+    (message 1), and an entry only counts while its generation matches. Satellites that drop out of view simply go
+    stale and their slot is reused once the table is full.
+    Per constellation counts and SNR sums are kept as entries are written, so count() and mean_snr() are O(1)"""
+
+    def __init__(self, capacity=48):
+        self.capacity = capacity
+        self.constellation = bytearray(capacity)
+        self.prn = array('H', [0] * capacity)  # Galileo and BeiDou PRNs go past 255
+        self.generation = array('H', [0] * capacity)
+        self.elevation = bytearray(capacity)
+        self.azimuth = array('H', [0] * capacity)
+        self.snr = bytearray(capacity)
+        self.index = dict()  # constellation << 16 | PRN: slot
+
+        constellations = len(CONSTELLATIONS)
+        self.generations = array('H', [1] * constellations)
+        self.in_view = bytearray(constellations)
+        self.counts = bytearray(constellations)
+        self.tracked = bytearray(constellations)  # Entries with an SNR
+        self.snr_sums = array('H', [0] * constellations)
+        self.next_free = 0
+
+    def new_group(self, constellation, in_view=0):
+        """Start a new GSV group for a constellation, all of its current entries become stale"""
+        generation = self.generations[constellation] + 1
+        if generation > _GENERATION_LIMIT:
+            # Free every entry of the constellation so an old generation can't come back to life
+            generation = 1
+            for slot in range(self.capacity):
+                if self.generation[slot] and self.constellation[slot] == constellation:
+                    self.free(slot)
+        self.generations[constellation] = generation
+        self.in_view[constellation] = in_view if 0 <= in_view <= 0xFF else 0
+        self.counts[constellation] = 0
+        self.tracked[constellation] = 0
+        self.snr_sums[constellation] = 0
+
+    def update(self, constellation, prn, elevation=NO_ELEVATION, azimuth=NO_AZIMUTH, snr=NO_SNR):
+        """Write a satellite into the current generation of its constellation. Returns False if the table is full"""
+        if not 0 <= prn <= 0xFFFF:
+            return False
+        key = (constellation << 16) | prn
+        generation = self.generations[constellation]
+        slot = self.index.get(key)
+
+        if slot is None:
+            slot = self.allocate()
+            if slot < 0:
+                return False
+            self.constellation[slot] = constellation
+            self.prn[slot] = prn
+            self.index[key] = slot
+        elif self.generation[slot] == generation:
+            # Already seen in this group, take the old values out of the running totals
+            self.counts[constellation] -= 1
+            if self.snr[slot] != NO_SNR:
+                self.tracked[constellation] -= 1
+                self.snr_sums[constellation] -= self.snr[slot]
+
+        self.generation[slot] = generation
+        self.elevation[slot] = elevation
+        self.azimuth[slot] = azimuth
+        self.snr[slot] = snr
+
+        self.counts[constellation] += 1
+        if snr != NO_SNR:
+            self.tracked[constellation] += 1
+            self.snr_sums[constellation] += snr
+        return True
+
+    def allocate(self):
+        """Find a free slot, reclaiming a stale entry if needed. Returns -1 if every entry is current"""
+        if self.next_free < self.capacity:
+            slot = self.next_free
+            self.next_free += 1
+            return slot
+        for slot in range(self.capacity):
+            if not self.current(slot):
+                if self.generation[slot]:
+                    self.free(slot)
+                return slot
+        return -1
+
+    def free(self, slot):
+        """Remove an entry from the index"""
+        self.index.pop((self.constellation[slot] << 16) | self.prn[slot], None)
+        self.generation[slot] = 0
+
+    def current(self, slot):
+        """Check if a slot holds an entry of its constellation's current generation"""
+        generation = self.generation[slot]
+        return generation != 0 and generation == self.generations[self.constellation[slot]]
+
+    def clear(self):
+        """Forget all satellites"""
+        for slot in range(self.capacity):
+            self.generation[slot] = 0
+        self.index.clear()
+        self.next_free = 0
+        for constellation in range(len(CONSTELLATIONS)):
+            self.in_view[constellation] = 0
+            self.counts[constellation] = 0
+            self.tracked[constellation] = 0
+            self.snr_sums[constellation] = 0
+
+    ########################################
+    # Queries
+    ########################################
+    def count(self, constellation=None):
+        """Number of satellites of a constellation, or of all constellations, reported in the current GSV groups"""
+        if constellation is None:
+            return sum(self.counts)
+        return self.counts[constellation]
+
+    def mean_snr(self, constellation=None):
+        """Mean SNR (dB) of the tracked satellites of a constellation, or of all constellations. None if no
+        satellite has an SNR"""
+        if constellation is None:
+            tracked = sum(self.tracked)
+            snr_sum = sum(self.snr_sums)
+        else:
+            tracked = self.tracked[constellation]
+            snr_sum = self.snr_sums[constellation]
+        if not tracked:
+            return None
+        return snr_sum / tracked
+
+    def get(self, constellation, prn):
+        """(elevation, azimuth, snr) of a satellite with None for empty fields, or None if it isn't current"""
+        slot = self.index.get((constellation << 16) | prn)
+        if slot is None or not self.current(slot):
+            return None
+        return self.values(slot)
+
+    def values(self, slot):
+        """(elevation, azimuth, snr) of a slot with None for empty fields"""
+        elevation = self.elevation[slot]
+        azimuth = self.azimuth[slot]
+        snr = self.snr[slot]
+        return (None if elevation == NO_ELEVATION else elevation,
+                None if azimuth == NO_AZIMUTH else azimuth,
+                None if snr == NO_SNR else snr)
+
+    def satellites(self, constellation=None):
+        """Yield (constellation, prn, elevation, azimuth, snr) for the current entries, of one constellation or all"""
+        for slot in range(self.next_free):
+            if not self.current(slot):
+                continue
+            if constellation is not None and self.constellation[slot] != constellation:
+                continue
+            elevation, azimuth, snr = self.values(slot)
+            yield self.constellation[slot], self.prn[slot], elevation, azimuth, snr
+
+    def as_dict(self):
+        """Current entries as {PRN: (elevation, azimuth, snr)}, the layout of the old NmeaParser.satellite_data"""
+        satellite_dict = dict()
+        for slot in range(self.next_free):
+            if self.current(slot):
+                satellite_dict[self.prn[slot]] = self.values(slot)
+        return satellite_dict
@@ -0,0 +1,296 @@
+"""
+# SentenceBuffer - preallocated storage for one NMEA sentence, used by NmeaParser in fixed buffer mode
+# The MIT License (MIT) - see LICENSE file
+"""
+
+import sys
+from array import array
+
+from .framing import crc_xor
+
+# Sentence status after load()
+INCOMPLETE = 0
+VALID = 1
+CRC_FAIL = 2
+OVERFLOW = 3
+RESTART = 4
+MALFORMED = 5
+SKIPPED = 6
+
+# Field count of the longest supported sentence (GSV with 4 satellites) plus some slack
+MAX_FIELDS = 24
+
+_POWERS_OF_TEN = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000, 100000000)
+
+# Whether load() may copy a sentence body out of a chunk with one slice assignment. The slice of the chunk is freed
+# straight away on CPython, but on MicroPython it stays on the heap until the next collection, so there load() copies
+# one character at a time
+SLICE_COPY = sys.implementation.name != 'micropython'
+
+
+def type_key(sentence_type):
+    """Small int key for a 3 letter sentence type such as b'RMC', matching SentenceBuffer.type_key()"""
+    return (sentence_type[0] << 16) | (sentence_type[1] << 8) | sentence_type[2]
+
+
+def talker_key(talker):
+    """Small int key for a 2 letter talker such as b'GP', matching SentenceBuffer.talker_key()"""
+    return (talker[0] << 8) | talker[1]
+
+
+class SentenceBuffer(object):
+    """Copies the characters of a sentence into a preallocated bytearray and records where each comma separated
+    field starts in a fixed array('H'), so a sentence can be framed, CRC checked and its numbers decoded without
+    growing the heap. The body is stored as received, commas included, so field i is data[bounds[i]:bounds[i + 1] - 1]
+    and the CRC digits follow the body. When accept is a set of type_key() values, other sentence types are rejected
+    with status SKIPPED once their address is read"""
+
+    def __init__(self, size):
+        # Room for size characters counted by load(), one more before it overflows and the CRC digits
+        self.data = bytearray(size + 3)
+        self.bounds = array('H', [0] * (MAX_FIELDS + 1))
+        self.size = size
+        self.accept = None
+        self.active = False
+        self.status = INCOMPLETE
+        self.length = 0
+        self.fields = 0
+        self.char_count = 0
+        self.crc_xor = 0
+        self.crc_digits = -1
+        self.final_crc = 0
+
+    def start(self):
+        """Prepare for the characters following a '$'"""
+        self.active = True
+        self.status = INCOMPLETE
+        self.length = 0
+        self.fields = 1
+        self.char_count = 0
+        self.crc_xor = 0
+        self.crc_digits = -1
+        self.final_crc = 0
+        self.bounds[0] = 0
+
+    def load(self, source, position, end, clean=False):
+        """Consume sentence characters from source[position:end] until the sentence is complete, a new '$' is found,
+        or the chunk runs out. Sets status and returns the position of the first unconsumed character.
+        clean tells that source (bytes or bytearray) has no characters outside 10..126, so that with SLICE_COPY a
+        sentence body held whole in the chunk is copied by copy_body() instead of character by character"""
+        if clean and SLICE_COPY and self.char_count == 0:
+            body_end = self.copy_body(source, position, end)
+            if body_end >= 0:
+                position = body_end
+
+        data = self.data
+        bounds = self.bounds
+        length = self.length
+        fields = self.fields
+        char_count = self.char_count
+        crc_xor = self.crc_xor
+        crc_digits = self.crc_digits
+        status = INCOMPLETE
+
+        while position < end:
+            char = source[position]
+
+            # A new sentence is starting, leave the '$' for the caller
+            if char == 36:
+                status = RESTART
+                break
+
+            position += 1
+
+            # Non printable chars and the receiver's LF padding are dropped, as update() does
+            if not 10 < char <= 126:
+                continue
+
+            char_count += 1
+
+            if crc_digits < 0:
+                if char == 42:  # '*' ends the sentence body
+                    bounds[fields] = length + 1
+                    crc_digits = 0
+                elif char == 44:  # ',' ends a field
+                    # Reject sentence types that aren't accepted as soon as the address field is complete
+                    if fields == 1 and self.accept is not None and \
+                            (length != 5 or ((data[2] << 16) | (data[3] << 8) | data[4]) not in self.accept):
+                        status = SKIPPED
+                        break
+                    crc_xor ^= char
+                    data[length] = char
+                    length += 1
+                    bounds[fields] = length
+                    fields += 1
+                    if fields > MAX_FIELDS:
+                        status = OVERFLOW
+                        break
+                else:
+                    crc_xor ^= char
+                    data[length] = char
+                    length += 1
+            else:
+                if 48 <= char <= 57:
+                    digit = char - 48
+                elif 65 <= char <= 70:
+                    digit = char - 55
+                elif 97 <= char <= 102:
+                    digit = char - 87
+                else:
+                    status = MALFORMED  # CRC Value was deformed and could not have been correct
+                    break
+
+                # Keep the CRC chars past the body for segments()
+                data[length + crc_digits] = char
+                self.final_crc = (self.final_crc << 4) | digit
+                crc_digits += 1
+
+                if crc_digits == 2:
+                    status = VALID if crc_xor == self.final_crc else CRC_FAIL
+                    break
+
+            # Check that the sentence buffer isn't filling up with Garbage waiting for the sentence to complete
+            if char_count > self.size:
+                status = OVERFLOW
+                break
+
+        self.length = length
+        self.fields = fields
+        self.char_count = char_count
+        self.crc_xor = crc_xor
+        self.crc_digits = crc_digits
+        self.status = status
+        if status != INCOMPLETE:
+            self.active = False
+        return position
+
+    def copy_body(self, source, position, end):
+        """Copy a sentence body from source[position:] up to its '*' into data with one slice assignment, find its
+        fields and XOR it with crc_xor(), leaving the CRC digits to load(). Only for a body found whole before end
+        without '$' or LF padding in it, that load() would neither overflow nor skip. Returns the position past the
+        '*', or -1 when load() has to go through the body character by character"""
+        star = source.find(b'*', position, end)
+        length = star - position
+        if star < 0 or length + 3 > self.size or source.find(b'$', position, star) >= 0 or \
+                source.find(b'\n', position, star) >= 0:
+            return -1
+
+        data = self.data
+        bounds = self.bounds
+        data[0:length] = source[position:star]
+        fields = 1
+        comma = data.find(b',', 0, length)
+        # Leave sentence types that aren't accepted to load(), which skips them
+        if self.accept is not None and comma >= 0 and \
+                (comma != 5 or ((data[2] << 16) | (data[3] << 8) | data[4]) not in self.accept):
+            return -1
+        while comma >= 0:
+            bounds[fields] = comma + 1
+            fields += 1
+            if fields > MAX_FIELDS:
+                return -1
+            comma = data.find(b',', comma + 1, length)
+        bounds[fields] = length + 1
+
+        self.length = length
+        self.fields = fields
+        self.char_count = length + 1
+        self.crc_xor = crc_xor(source, position, star)
+        self.crc_digits = 0
+        return star + 1
+
+    ########################################
+    # Field Access
+    ########################################
+    def type_key(self):
+        """Key of the 3 letter sentence type in the address field, or 0 if the address field is too short"""
+        if self.bounds[1] < 6:
+            return 0
+        data = self.data
+        return (data[2] << 16) | (data[3] << 8) | data[4]
+
+    def talker_key(self):
+        """Key of the 2 letter talker in the address field, or 0 if the address field is too short"""
+        if self.bounds[1] < 6:
+            return 0
+        return (self.data[0] << 8) | self.data[1]
+
+    def field_length(self, index):
+        """Number of characters in a field, 0 for empty or missing fields"""
+        if index >= self.fields:
+            return 0
+        return self.bounds[index + 1] - self.bounds[index] - 1
+
+    def field_char(self, index):
+        """First character of a field as an int, 0 for empty or missing fields"""
+        if self.field_length(index) == 0:
+            return 0
+        return self.data[self.bounds[index]]
+
+    def field_int(self, index, start=0, stop=-1):
+        """Decode the digits of a field, or of field[start:stop], as an int. Raises ValueError like int() would"""
+        if index >= self.fields:
+            raise ValueError
+        data = self.data
+        position = self.bounds[index] + start
+        end = self.bounds[index + 1] - 1
+        if 0 <= stop < end - self.bounds[index]:
+            end = self.bounds[index] + stop
+
+        sign = 1
+        if position < end and data[position] == 45:  # '-'
+            sign = -1
+            position += 1
+        if position >= end:
+            raise ValueError
+
+        value = 0
+        while position < end:
+            digit = data[position] - 48
+            if not 0 <= digit <= 9:
+                raise ValueError
+            value = value * 10 + digit
+            position += 1
+        return sign * value
+
+    def field_fixed(self, index, places, start=0):
+        """Decode a decimal field, or field[start:], as an int scaled by 10 ** places. Extra decimals are truncated.
+        Raises ValueError like float() would"""
+        if index >= self.fields:
+            raise ValueError
+        data = self.data
+        position = self.bounds[index] + start
+        end = self.bounds[index + 1] - 1
+
+        sign = 1
+        if position < end and data[position] == 45:  # '-'
+            sign = -1
+            position += 1
+        if position >= end:
+            raise ValueError
+
+        value = 0
+        decimals = -1
+        while position < end:
+            char = data[position]
+            position += 1
+            if char == 46 and decimals < 0:  # '.'
+                decimals = 0
+                continue
+            digit = char - 48
+            if not 0 <= digit <= 9:
+                raise ValueError
+            if decimals < places:
+                value = value * 10 + digit
+                if decimals >= 0:
+                    decimals += 1
+
+        if decimals < 0:
+            decimals = 0
+        return sign * value * _POWERS_OF_TEN[places - decimals]
+
+    def segments(self):
+        """Copy the sentence out as a list of strings, laid out like NmeaParser.gps_segments"""
+        segments = bytes(self.data[:self.length]).decode().split(',')
+        segments.append(bytes(self.data[self.length:self.length + 2]).decode())
+        return segments
@@ -0,0 +1,51 @@
+"""
+# Ticks - millisecond and microsecond tick counts on MicroPython, with a time module fallback elsewhere
+# The MIT License (MIT) - see LICENSE file
+"""
+
+# Import utime or time for tick counts
+try:
+    # Assume running on MicroPython
+    import utime
+    time = None
+except ImportError:
+    # Otherwise default to time module for non-embedded implementations
+    # Should still support millisecond resolution.
+    import time
+    utime = None
+
+
+def ticks_us():
+    """Microsecond tick count"""
+    if utime is not None:
+        return utime.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+
+def ticks_ms():
+    """Millisecond tick count"""
+    if utime is not None:
+        return utime.ticks_ms()
+    return int(time.time() * 1000)
+
+
+def ticks_diff(new, old):
+    """Difference between two tick count values"""
+    if utime is not None:
+        return utime.ticks_diff(new, old)
+    return new - old
+
+
+def ticks_add(ticks, delta):
+    """ticks_ms() value delta milliseconds after ticks"""
+    if utime is not None:
+        return utime.ticks_add(ticks, delta)
+    return ticks + delta
+
+
+def sleep_ms(milliseconds):
+    """Block for milliseconds"""
+    if utime is not None:
+        utime.sleep_ms(milliseconds)
+    else:
+        time.sleep(milliseconds / 1000)
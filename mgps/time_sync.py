@@ -0,0 +1,180 @@
+"""
+# TimeSync - latency compensated UTC from receiver time sentences, for setting the RTC
+# The MIT License (MIT) - see LICENSE file
+"""
+
+from .nmea_parser import rtc_tuple
+from .ticks import ticks_ms, ticks_diff, ticks_add, sleep_ms
+
+
+class TimeSync(object):
+    """Works out when the receiver started sending each RMC/ZDA sentence, so UTC can be carried forward to the moment
+    the RTC is set instead of being set late by the polling, buffering and parsing latency.
+    The receiver sends bytes at baud_rate into its fifo_size byte buffer. A sentence ending at byte sentence_end of a
+    chunk was started (chunk_end - sentence_end + sentence length) byte times before the last byte of the chunk was
+    sent. When the read ended in idle padding the buffer was drained, so that last byte was sent between the
+    previous read and this one, and the middle of that window is used. Otherwise the bytes still buffered are unknown
+    and taken as half the buffer. Polling quickly, as Pipeline does while data is flowing, keeps the window small.
+    emit_delay_ms is the receiver's delay between the top of the second and the first byte of the sentence, if known.
+    error_ms is the estimated bound of the residual error of now() and the time handed to the RTC.
+
+    Chunk positions come from feed(buf, ticks) when the parser is fed directly, or from a Pipeline through
+    use_pipeline()"""
+
+    def __init__(self, parser, baud_rate=9600, emit_delay_ms=0, fifo_size=255, sentences=('RMC', 'ZDA')):
+        self.parser = parser
+        self.byte_us = 10000000 // baud_rate  # 8N1, 10 bits per byte
+        self.emit_delay_ms = emit_delay_ms
+        self.fifo_size = fifo_size
+        self.sentences = sentences
+
+        # Position of the sentence being parsed, set by feed() or taken from a pipeline
+        self.framer = None
+        self.source = None
+        self.chunks = 0
+        self.chunk_ticks = 0
+        self.previous_ticks = None
+        self.chunk_end = 0
+        self.sentence_end = 0
+        self.drained = False
+
+        # UTC reference: reference_seconds.reference_ms was the time at reference_ticks
+        self.reference_seconds = -1
+        self.reference_ms = 0
+        self.reference_ticks = 0
+        self.latency_ms = 0  # From the start of the sentence to the end of its parse
+        self.error_ms = 0
+        self.residual_ms = 0  # Error of the last time handed to the RTC, see set_rtc()
+        self.updates = 0
+
+        self.listener = self.sentence
+        parser.add_listener(self.listener)
+
+    def close(self):
+        """Stop receiving sentences from the parser"""
+        self.parser.remove_listener(self.listener)
+
+    def use_pipeline(self, pipeline):
+        """Take chunk arrival times and sentence positions from a Pipeline feeding the parser"""
+        self.framer = pipeline.framer
+        self.source = pipeline.source
+
+    def feed(self, buf, ticks=None):
+        """parser.feed() a chunk (bytes or bytearray) read at ticks (ticks_ms() at the start of the read, now by
+        default), one line at a time so each parsed sentence can be placed in the chunk. Returns the number of
+        sentences parsed"""
+        if ticks is None:
+            ticks = ticks_ms()
+        length = len(buf)
+        end = len(buf.rstrip(b'\n'))
+        self.previous_ticks = self.chunk_ticks if self.chunks else None
+        self.chunks += 1
+        self.chunk_ticks = ticks
+        self.chunk_end = end
+        self.drained = end < length
+
+        view = memoryview(buf)
+        parser = self.parser
+        parsed = 0
+        start = 0
+        while start < length:
+            newline = buf.find(b'\n', start) if start < end else -1
+            stop = length if newline < 0 else newline + 1
+            self.sentence_end = stop if stop < end else end
+            parsed += parser.feed(view[start:stop])
+            start = stop
+        return parsed
+
+    def sentence(self, parser, sentence_type):
+        """NmeaParser listener, takes a new UTC reference from each valid time sentence"""
+        if sentence_type not in self.sentences or parser.epoch_seconds < 0:
+            return
+
+        if self.framer is not None:
+            source = self.source
+            chunk_ticks = source.ticks
+            previous_ticks = source.previous_ticks
+            framer = self.framer
+            chunk_end = framer.chunk_end
+            bytes_after = chunk_end - framer.sentence_end
+            drained = framer.drained
+        else:
+            chunk_ticks = self.chunk_ticks
+            previous_ticks = self.previous_ticks
+            chunk_end = self.chunk_end
+            bytes_after = self.chunk_end - self.sentence_end
+            drained = self.drained
+
+        # How long before the read the last byte of the chunk was sent, and how far off that may be
+        if drained and previous_ticks is not None:
+            window = ticks_diff(chunk_ticks, previous_ticks) - chunk_end * self.byte_us // 1000
+            if window < 0:
+                window = 0
+            last_byte_ms = window // 2
+            uncertain_ms = window - last_byte_ms
+        elif drained:
+            # First read, the data may have waited for up to an epoch
+            last_byte_ms = 0
+            uncertain_ms = 1000
+        else:
+            last_byte_ms = self.fifo_size * self.byte_us // 2000
+            uncertain_ms = last_byte_ms
+
+        # The sentence from '$' to the CRC digits. CR LF follow sentence_end and are already in bytes_after
+        length = parser.sentence_length
+
+        sent_ms = last_byte_ms + ((bytes_after if bytes_after > 0 else 0) + length) * self.byte_us // 1000
+        self.reference_ticks = ticks_add(chunk_ticks, -sent_ms)
+        self.reference_seconds = parser.epoch_seconds
+        self.reference_ms = parser.epoch_ms + self.emit_delay_ms
+        self.latency_ms = ticks_diff(ticks_ms(), self.reference_ticks)
+        # Send window, byte timing and tick resolution
+        self.error_ms = uncertain_ms + self.byte_us // 1000 + 1
+        self.updates += 1
+
+    ########################################
+    # Compensated Time
+    ########################################
+    def now(self):
+        """Current UTC as (seconds since 2000-01-01, milliseconds), or None before the first valid time sentence"""
+        if self.reference_seconds < 0:
+            return None
+        total_ms = self.reference_ms + ticks_diff(ticks_ms(), self.reference_ticks)
+        seconds = total_ms // 1000
+        return self.reference_seconds + seconds, total_ms - seconds * 1000
+
+    def rtc_tuple(self, offset_hours=0):
+        """Current time as a machine.RTC.datetime() tuple, shifted by offset_hours. None before the first valid time
+        sentence"""
+        current = self.now()
+        if current is None:
+            return None
+        return rtc_tuple(current[0], current[1], offset_hours)
+
+    def set_rtc(self, rtc, offset_hours=0):
+        """Wait for the next UTC second to start, then set rtc. Many ports ignore the subseconds field, so setting the
+        RTC on the second boundary avoids losing the milliseconds. Blocks for up to a second. Returns residual_ms,
+        or None before the first valid time sentence"""
+        current = self.now()
+        if current is None:
+            return None
+        wait = 1000 - current[1]
+        sleep_ms(wait)
+        return self.write_rtc(rtc, offset_hours)
+
+    async def set_rtc_async(self, rtc, offset_hours=0):
+        """set_rtc() as a coroutine, letting other tasks run while waiting for the second boundary"""
+        import asyncio
+        current = self.now()
+        if current is None:
+            return None
+        await asyncio.sleep((1000 - current[1]) / 1000)
+        return self.write_rtc(rtc, offset_hours)
+
+    def write_rtc(self, rtc, offset_hours):
+        """Set rtc to the current time and record the residual error"""
+        seconds, milliseconds = self.now()
+        rtc.datetime(rtc_tuple(seconds, milliseconds, offset_hours))
+        # An RTC without subseconds runs milliseconds behind
+        self.residual_ms = milliseconds + self.error_ms
+        return self.residual_ms
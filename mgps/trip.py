@@ -0,0 +1,184 @@
+"""
+# TripOdometer - running trip distance, moving time, speed and elevation statistics with periodic persistence
+# The MIT License (MIT) - see LICENSE file
+"""
+
+try:
+    import os
+except ImportError:
+    import uos as os
+
+try:
+    import json
+except ImportError:
+    import ujson as json
+
+from .epoch import GGA, elapsed_ms
+from .geodesy import equirectangular_distance
+
+# Totals saved to the persistence file
+_SAVED = ('distance_m', 'moving_ms', 'stopped_ms', 'max_speed_mms', 'gain_cm', 'loss_cm', 'fixes')
+
+
+class TripSnapshot(object):
+    """Trip statistics for display. Filled in place by TripOdometer.snapshot(), consumers must treat it as read only:
+        distance_m: Distance travelled while moving
+        moving_s, stopped_s: Time spent moving and standing still
+        max_speed_mms, average_speed_mms: Highest speed and distance over moving time, mm/s
+        gain_m, loss_m: Elevation climbed and descended
+        fixes: Fixes counted"""
+
+    __slots__ = ('distance_m', 'moving_s', 'stopped_s', 'max_speed_mms', 'average_speed_mms', 'gain_m', 'loss_m',
+                 'fixes')
+
+    def __init__(self):
+        self.distance_m = 0.0
+        self.moving_s = 0
+        self.stopped_s = 0
+        self.max_speed_mms = 0
+        self.average_speed_mms = 0
+        self.gain_m = 0.0
+        self.loss_m = 0.0
+        self.fixes = 0
+
+
+class TripOdometer(object):
+    """Accumulates trip statistics fix by fix in O(1) state, nothing is recomputed from history.
+    A fix counts as moving when its speed is at least min_speed_mms and its HDOP (if known) at most max_hdop_e2,
+    only then is the distance from the previous fix added, so position jitter while standing still or with a poor
+    fix doesn't build up distance. Elevation gain and loss only move once the altitude has changed by more than
+    elevation_step_cm from the last counted level, which keeps GGA altitude noise out of the totals. A gap of more
+    than max_gap_ms between fixes isn't counted as time or distance.
+    With persist_file set, the totals are loaded from it at start up and saved every persist_interval_ms of trip
+    time, written to a temporary file first so a reset during the write can't lose them"""
+
+    def __init__(self, persist_file=None, persist_interval_ms=60000, min_speed_mms=1000, max_hdop_e2=500,
+                 elevation_step_cm=500, max_gap_ms=10000):
+        self.persist_file = persist_file
+        self.persist_interval_ms = persist_interval_ms
+        self.min_speed_mms = min_speed_mms
+        self.max_hdop_e2 = max_hdop_e2
+        self.elevation_step_cm = elevation_step_cm
+        self.max_gap_ms = max_gap_ms
+        self.trip_snapshot = TripSnapshot()
+        self.saves = 0
+        self.clear()
+        if persist_file is not None:
+            self.load()
+
+    def clear(self):
+        """Start a new trip"""
+        # Totals
+        self.distance_m = 0.0
+        self.moving_ms = 0
+        self.stopped_ms = 0
+        self.max_speed_mms = 0
+        self.gain_cm = 0
+        self.loss_cm = 0
+        self.fixes = 0
+
+        # Previous fix
+        self.time_ms = -1
+        self.latitude_e7 = 0
+        self.longitude_e7 = 0
+        self.moving = False
+        self.elevation_cm = None  # Last counted elevation level
+        self.unsaved_ms = 0
+
+    def attach(self, epochs):
+        """Count every Fix emitted by an EpochAssembler"""
+        epochs.add_callback(self.add_fix)
+
+    def add_fix(self, fix):
+        """update() from an epoch.Fix, ignoring fixes without a valid position"""
+        if not fix.has_position():
+            return
+        self.update(fix.time_ms(), fix.latitude_e7, fix.longitude_e7, fix.speed_mms, fix.hdop_e2,
+                    fix.altitude_cm if fix.sentences & GGA and fix.fix_stat > 0 else None)
+
+    def update(self, time_ms, latitude_e7, longitude_e7, speed_mms, hdop_e2=0, altitude_cm=None):
+        """Add a valid fix at time_ms, milliseconds since midnight. altitude_cm is None when unknown"""
+        self.fixes += 1
+        moving = speed_mms >= self.min_speed_mms and (hdop_e2 <= 0 or hdop_e2 <= self.max_hdop_e2)
+
+        elapsed = elapsed_ms(time_ms, self.time_ms) if self.time_ms >= 0 else -1
+
+        if 0 < elapsed <= self.max_gap_ms:
+            # Time since the previous fix goes to the state both ends agree on, else half to each
+            if moving == self.moving:
+                if moving:
+                    self.moving_ms += elapsed
+                else:
+                    self.stopped_ms += elapsed
+            else:
+                self.moving_ms += elapsed // 2
+                self.stopped_ms += elapsed - elapsed // 2
+            if moving:
+                self.distance_m += equirectangular_distance(self.latitude_e7, self.longitude_e7,
+                                                            latitude_e7, longitude_e7)
+            self.unsaved_ms += elapsed
+
+        if moving and speed_mms > self.max_speed_mms:
+            self.max_speed_mms = speed_mms
+
+        if altitude_cm is not None:
+            if self.elevation_cm is None:
+                self.elevation_cm = altitude_cm
+            elif altitude_cm - self.elevation_cm > self.elevation_step_cm:
+                self.gain_cm += altitude_cm - self.elevation_cm
+                self.elevation_cm = altitude_cm
+            elif self.elevation_cm - altitude_cm > self.elevation_step_cm:
+                self.loss_cm += self.elevation_cm - altitude_cm
+                self.elevation_cm = altitude_cm
+
+        self.time_ms = time_ms
+        self.latitude_e7 = latitude_e7
+        self.longitude_e7 = longitude_e7
+        self.moving = moving
+
+        if self.persist_file is not None and self.unsaved_ms >= self.persist_interval_ms:
+            self.save()
+
+    def snapshot(self):
+        """Current statistics in the TripSnapshot owned by the odometer, updated in place"""
+        snapshot = self.trip_snapshot
+        snapshot.distance_m = self.distance_m
+        snapshot.moving_s = self.moving_ms // 1000
+        snapshot.stopped_s = self.stopped_ms // 1000
+        snapshot.max_speed_mms = self.max_speed_mms
+        snapshot.average_speed_mms = int(self.distance_m * 1000000 / self.moving_ms) if self.moving_ms else 0
+        snapshot.gain_m = self.gain_cm / 100
+        snapshot.loss_m = self.loss_cm / 100
+        snapshot.fixes = self.fixes
+        return snapshot
+
+    ########################################
+    # Persistence
+    ########################################
+    def save(self):
+        """Write the totals to persist_file"""
+        temporary = self.persist_file + '.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump({name: getattr(self, name) for name in _SAVED}, handle)
+        try:
+            os.remove(self.persist_file)
+        except OSError:
+            pass
+        os.rename(temporary, self.persist_file)
+        self.unsaved_ms = 0
+        self.saves += 1
+
+    def load(self):
+        """Restore the totals from persist_file, or from its temporary file if a save was interrupted. Returns True
+        if totals were restored"""
+        for name in (self.persist_file, self.persist_file + '.tmp'):
+            try:
+                with open(name) as handle:
+                    totals = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            for total in _SAVED:
+                if total in totals:
+                    setattr(self, total, totals[total])
+            return True
+        return False
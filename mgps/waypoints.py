@@ -0,0 +1,265 @@
+"""
+# Waypoints - nearest named waypoint from a grid indexed file, read by seeking instead of loading it into RAM
+# The MIT License (MIT) - see LICENSE file
+#
+# File layout, little endian:
+#   header: b'MGPW', version (B), name length (B), record count (I), largest cell count (I),
+#           cell size (i), grid south (i), grid west (i), rows (H), columns (H)
+#   cell table: rows * columns + 1 record indexes (I), cell n holds records table[n] to table[n + 1] - 1
+#   records, sorted by cell: latitude_e7 (i), longitude_e7 (i), name (name length bytes, UTF-8, 0 padded)
+#
+# Build a file on the host from a CSV of name,latitude,longitude lines in decimal degrees:
+#   python3 -m mgps.waypoints waypoints.csv waypoints.bin
+"""
+
+from math import cos, sqrt
+
+try:
+    import struct
+except ImportError:
+    import ustruct as struct
+
+from .geodesy import METRES_PER_E7, longitude_difference, equirectangular_distance
+
+MAGIC = b'MGPW'
+VERSION = 1
+
+_HEADER = '<4sBBIIiiiHH'
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_RADIANS_PER_E7 = 3.141592653589793 / 180 / 10000000
+
+
+def build(waypoints, target_file, cell_e7=None, name_length=20, per_cell=4):
+    """Write (name, latitude_e7, longitude_e7) waypoints to an index file. Without cell_e7 the cell size is chosen
+    for about per_cell waypoints per cell of the bounding box. Names are cut to name_length bytes. Returns the
+    number of cells"""
+    waypoints = list(waypoints)
+    if not waypoints:
+        raise ValueError("No waypoints")
+    south = min(waypoint[1] for waypoint in waypoints)
+    west = min(waypoint[2] for waypoint in waypoints)
+    height = max(waypoint[1] for waypoint in waypoints) - south
+    width = max(waypoint[2] for waypoint in waypoints) - west
+    if cell_e7 is None:
+        cell_e7 = max(int(sqrt(max(height, 1) * max(width, 1) * per_cell / len(waypoints))), 1000)
+    rows = height // cell_e7 + 1
+    columns = width // cell_e7 + 1
+    if rows > 0xFFFF or columns > 0xFFFF:
+        raise ValueError("Cells too small for the area")
+
+    cells = [[] for _ in range(rows * columns)]
+    for waypoint in waypoints:
+        cells[((waypoint[1] - south) // cell_e7) * columns + (waypoint[2] - west) // cell_e7].append(waypoint)
+
+    with open(target_file, 'wb') as handle:
+        handle.write(struct.pack(_HEADER, MAGIC, VERSION, name_length, len(waypoints),
+                                 max(len(cell) for cell in cells), cell_e7, south, west, rows, columns))
+        first = 0
+        for cell in cells:
+            handle.write(struct.pack('<I', first))
+            first += len(cell)
+        handle.write(struct.pack('<I', first))
+
+        record = '<ii%ds' % name_length
+        for cell in cells:
+            for name, latitude_e7, longitude_e7 in cell:
+                encoded = name.encode()[:name_length]
+                # Don't cut a multi byte character in half
+                while True:
+                    try:
+                        encoded.decode()
+                        break
+                    except UnicodeError:
+                        encoded = encoded[:-1]
+                handle.write(struct.pack(record, latitude_e7, longitude_e7, encoded))
+    return rows * columns
+
+
+def build_from_csv(source_file, target_file, **options):
+    """build() from a CSV file of name,latitude,longitude lines in decimal degrees. Lines that don't parse, such as
+    a header, are skipped. Returns the number of waypoints"""
+    waypoints = []
+    with open(source_file) as handle:
+        for line in handle:
+            fields = line.strip().rsplit(',', 2)
+            if len(fields) != 3:
+                continue
+            try:
+                waypoints.append((fields[0].strip().strip('"'), int(round(float(fields[1]) * 10000000)),
+                                  int(round(float(fields[2]) * 10000000))))
+            except ValueError:
+                continue
+    build(waypoints, target_file, **options)
+    return len(waypoints)
+
+
+class WaypointIndex(object):
+    """Reads nearest waypoint queries from an index file written by build(). Only the header is kept in RAM, a
+    query reads the cell table entries and records of the cells around the position, ring by ring, until no
+    unread cell can be closer than the best waypoint found. Records are read into one preallocated buffer sized for
+    the fullest cell"""
+
+    def __init__(self, source_file):
+        self.handle = open(source_file, 'rb')
+        header = self.handle.read(_HEADER_SIZE)
+        if len(header) != _HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+            self.handle.close()
+            raise ValueError("Not a waypoint file")
+        (_, version, self.name_length, self.count, largest, self.cell_e7, self.grid_south, self.grid_west,
+         self.rows, self.columns) = struct.unpack(_HEADER, header)
+        if version != VERSION:
+            self.handle.close()
+            raise ValueError("Unsupported waypoint file version")
+
+        self.record_size = 8 + self.name_length
+        self.records_offset = _HEADER_SIZE + (self.rows * self.columns + 1) * 4
+        self.buffer = bytearray(max(largest, 1) * self.record_size)
+        self.view = memoryview(self.buffer)
+        self.table_entry = bytearray(8)
+        self.reads = 0  # Cells read, for measuring queries
+
+    def close(self):
+        """Close the waypoint file"""
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def read_cell(self, row, column):
+        """Load the records of a cell into the buffer. Returns the number of records"""
+        handle = self.handle
+        handle.seek(_HEADER_SIZE + (row * self.columns + column) * 4)
+        handle.readinto(self.table_entry)
+        first, end = struct.unpack('<II', self.table_entry)
+        if end <= first:
+            return 0
+        handle.seek(self.records_offset + first * self.record_size)
+        handle.readinto(self.view[:(end - first) * self.record_size])
+        self.reads += 1
+        return end - first
+
+    def name(self, offset):
+        """Name of the record at a buffer offset"""
+        end = offset + 8
+        stop = end + self.name_length
+        while stop > end and self.buffer[stop - 1] == 0:
+            stop -= 1
+        return bytes(self.buffer[end:stop]).decode()
+
+    def nearest(self, latitude_e7, longitude_e7, max_distance_m=None):
+        """(name, latitude_e7, longitude_e7, metres) of the waypoint closest to a position, or None if there is none
+        within max_distance_m"""
+        cell = self.cell_e7
+        row = (latitude_e7 - self.grid_south) // cell
+        column = (longitude_e7 - self.grid_west) // cell
+        # Cells are narrowest east to west at the latitude furthest from the equator
+        east_scale = cos(min(abs(latitude_e7) + cell, 900000000) * _RADIANS_PER_E7)
+        ring_m = cell * METRES_PER_E7 * min(east_scale, 1.0)
+        query_scale = cos(latitude_e7 * _RADIANS_PER_E7)
+        limit = max_distance_m * max_distance_m / (METRES_PER_E7 * METRES_PER_E7) if max_distance_m else None
+
+        best = None
+        best_squared = 0.0
+        ring = 0
+        last_ring = max(self.rows, self.columns) + max(abs(row), abs(column))
+        while ring <= last_ring:
+            # Nothing in this ring or beyond can be closer than the best so far
+            if best is not None or limit is not None:
+                reach = (ring - 1) * ring_m / METRES_PER_E7
+                if ring > 0 and reach * reach > (best_squared if best is not None else limit):
+                    break
+            first_column = max(column - ring, 0)
+            last_column = min(column + ring, self.columns - 1)
+            for cell_row in range(max(row - ring, 0), min(row + ring, self.rows - 1) + 1):
+                if cell_row == row - ring or cell_row == row + ring:
+                    cell_columns = range(first_column, last_column + 1)
+                else:
+                    # Only the two ends of the rows in between belong to the ring
+                    cell_columns = (column - ring, column + ring)
+                for cell_column in cell_columns:
+                    if not first_column <= cell_column <= last_column:
+                        continue
+                    records = self.read_cell(cell_row, cell_column)
+                    for offset in range(0, records * self.record_size, self.record_size):
+                        waypoint_latitude, waypoint_longitude = struct.unpack_from('<ii', self.buffer, offset)
+                        north = waypoint_latitude - latitude_e7
+                        east = longitude_difference(waypoint_longitude, longitude_e7) * query_scale
+                        squared = north * north + east * east
+                        if (best is None or squared < best_squared) and (limit is None or squared <= limit):
+                            best = (self.name(offset), waypoint_latitude, waypoint_longitude)
+                            best_squared = squared
+            ring += 1
+
+        if best is None:
+            return None
+        return best + (equirectangular_distance(latitude_e7, longitude_e7, best[1], best[2]),)
+
+
+class NearestWaypoint(object):
+    """Keeps the nearest waypoint of a WaypointIndex up to date for a moving position. The file is only queried
+    again once the position has moved more than requery_m since the last query, in between only the distance to
+    the current waypoint is updated. name is None while no waypoint is known"""
+
+    def __init__(self, index, requery_m=200, max_distance_m=None):
+        self.index = index
+        self.requery_m = requery_m
+        self.max_distance_m = max_distance_m
+        self.query_latitude_e7 = 0
+        self.query_longitude_e7 = 0
+        self.queries = 0
+
+        self.name = None
+        self.latitude_e7 = 0
+        self.longitude_e7 = 0
+        self.distance_m = None
+        self.parser = None
+
+    def listen(self, parser, sentences=('RMC', 'GGA', 'GLL', 'GNS')):
+        """Follow the position of a NmeaParser after every sentence of sentences"""
+        self.parser = parser
+        self.sentences = sentences
+        parser.add_listener(self.sentence)
+
+    def close(self):
+        """Stop following the parser"""
+        if self.parser is not None:
+            self.parser.remove_listener(self.sentence)
+            self.parser = None
+
+    def sentence(self, parser, sentence_type):
+        """NmeaParser listener"""
+        if sentence_type in self.sentences and (parser.valid or parser.fix_stat > 0):
+            latitude_e7, longitude_e7 = parser.position_e7()
+            self.update(latitude_e7, longitude_e7)
+
+    def attach(self, epochs):
+        """Follow the position of every Fix emitted by an EpochAssembler"""
+        epochs.add_callback(self.add_fix)
+
+    def add_fix(self, fix):
+        """update() from an epoch.Fix, ignoring fixes without a valid position"""
+        if fix.has_position():
+            self.update(fix.latitude_e7, fix.longitude_e7)
+
+    def update(self, latitude_e7, longitude_e7):
+        """Move to a position, querying the index if it is far enough from the last query. Returns the name of the
+        nearest waypoint"""
+        if not self.queries or equirectangular_distance(self.query_latitude_e7, self.query_longitude_e7,
+                                                        latitude_e7, longitude_e7) > self.requery_m:
+            self.queries += 1
+            self.query_latitude_e7 = latitude_e7
+            self.query_longitude_e7 = longitude_e7
+            found = self.index.nearest(latitude_e7, longitude_e7, self.max_distance_m)
+            if found is None:
+                self.name = None
+                self.distance_m = None
+                return None
+            self.name, self.latitude_e7, self.longitude_e7, self.distance_m = found
+        elif self.name is not None:
+            self.distance_m = equirectangular_distance(latitude_e7, longitude_e7, self.latitude_e7,
+                                                       self.longitude_e7)
+        return self.name
+
+
+if __name__ == '__main__':
+    import sys
+    print('%d waypoints written' % build_from_csv(sys.argv[1], sys.argv[2]))
@@ -0,0 +1,50 @@
+"""
+Tests of the Aggregator: each source's parser is subscribed to the sentences the aggregator uses and keeps no
+statistics, and the best source and the merged time come out of replayed receiver output.
+Run from the repository root: python3 -m pytest tests
+or on the MicroPython unix port: micropython tests/test_aggregator.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+from mgps.aggregator import Aggregator, SENTENCES
+from workload import Workload
+
+
+class Replay(object):
+    """Read source returning workload chunks, then nothing"""
+
+    def __init__(self, workload, seconds):
+        self.chunks = workload.chunks(seconds)
+
+    def read(self):
+        return self.chunks.pop(0) if self.chunks else b''
+
+
+def test_source_parsers():
+    aggregator = Aggregator()
+    aggregator.add_source(Replay(Workload(), 5).read, 'first')
+    aggregator.add_source(Replay(Workload(talkers=('GP', 'GL')), 5).read, 'second', statistics=True)
+    first, second = aggregator.parsers
+    assert first.statistics is None and first.subscribed == set(SENTENCES)
+    assert second.statistics is not None and second.subscribed == set(SENTENCES)
+
+    while aggregator.poll():
+        pass
+    for parser in aggregator.parsers:
+        # GSV and VTG were dropped unparsed
+        assert parser.skipped_bytes > 0 and parser.satellites_in_view == 0
+        assert parser.parsed_sentences > 0
+    assert min(aggregator.fixes) > 0
+    assert 'GSV' not in second.stats() and second.stats()['RMC']['received'] == 5
+    assert aggregator.best in (0, 1) and aggregator.now()[0] == first.epoch_seconds
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(name, 'passed')
@@ -0,0 +1,134 @@
+"""
+Tests of NmeaParser fixed buffer mode: once running, feed() keeps no new memory for RMC/GGA/GSA/GSV, and it decodes
+the same data as feed() in fixed point mode. On MicroPython gc.mem_alloc() with the collector held off catches every
+allocation. CPython boxes ints above 256 and floats, so there tracemalloc checks that nothing is still allocated
+afterwards, and that the most allocated at once while feeding a chunk stays under PEAK_LIMIT.
+Run from the repository root: python3 -m pytest tests
+or on the MicroPython unix port: micropython tests/test_fixed_buffer.py
+"""
+
+import gc
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from mgps.nmea_parser import NmeaParser
+from workload import Workload
+
+WORKLOADS = (
+    dict(rate_hz=1, talkers=('GP',)),
+    dict(rate_hz=10, talkers=('GP', 'GL', 'GA')),
+    dict(rate_hz=5, talkers=('GP', 'GL'), corruption=0.02, truncation=0.02),
+)
+
+# Measured for allocations: whole second timestamps, as a fraction of a second needs a float, and no corruption, so
+# no CRC failure counter passes 256 while measuring
+ALLOCATION_WORKLOADS = (
+    dict(rate_hz=1, talkers=('GP',)),
+    dict(rate_hz=1, talkers=('GP', 'GL', 'GA')),
+)
+
+# Seconds of receiver output fed before measuring. On CPython every counter has to be past 256 by then, as ints up
+# to 256 are cached and the first one past it is allocated
+WARM_UP_SECONDS = 150
+
+# Bytes, less than splitting a single sentence into gps_segments takes on CPython
+PEAK_LIMIT = 1024
+
+
+def feed_all(parser, chunks):
+    for chunk in chunks:
+        parser.feed(chunk)
+
+
+def traced(parser, chunks):
+    """Bytes traced by tracemalloc after feeding chunks, less those traced before"""
+    before = tracemalloc.get_traced_memory()[0]
+    feed_all(parser, chunks)
+    return tracemalloc.get_traced_memory()[0] - before
+
+
+def allocated(parser, warm_up, chunks):
+    """Bytes still allocated after feeding chunks on CPython, bytes allocated while feeding them on MicroPython.
+    warm_up is fed first without measuring. tracemalloc runs through it, so objects freed while feeding chunks were
+    traced when they were allocated. A collection empties the CPython free lists, so it comes before the warm up"""
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            feed_all(parser, warm_up)
+            # Less what the measurement itself keeps
+            return traced(parser, chunks) - traced(parser, ())
+        finally:
+            tracemalloc.stop()
+    feed_all(parser, warm_up)
+    gc.collect()
+    gc.disable()
+    try:
+        before = gc.mem_alloc()
+        feed_all(parser, chunks)
+        return gc.mem_alloc() - before
+    finally:
+        gc.enable()
+
+
+def peak(parser, warm_up, chunks):
+    """Most bytes allocated at once while feeding any one of chunks, CPython only"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        feed_all(parser, warm_up)
+        highest = 0
+        for chunk in chunks:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            parser.feed(chunk)
+            highest = max(highest, tracemalloc.get_traced_memory()[1] - before)
+        return highest
+    finally:
+        tracemalloc.stop()
+
+
+def snapshot(parser):
+    return (parser.clean_sentences, parser.parsed_sentences, parser.crc_fails, parser.timestamp, tuple(parser.date),
+            parser.epoch_seconds, parser.epoch_ms, parser.latitude_e7, parser.longitude_e7, parser.speed_mms,
+            parser.course_e2, parser.altitude_cm, parser.geoid_height_cm, parser.hdop_e2, parser.pdop_e2,
+            parser.vdop_e2, parser.fix_stat, parser.fix_type, parser.valid, parser.satellites_in_use,
+            parser.satellites_used, parser.satellites_in_view, parser.satellite_data)
+
+
+def test_steady_state_feed_does_not_allocate():
+    for options in ALLOCATION_WORKLOADS:
+        workload = Workload(**options)
+        parser = NmeaParser(fixed_buffer=True)
+        # Whole seconds of output, so the parser is in the same state at the start and the end of the measurement
+        warm_up = workload.chunks(WARM_UP_SECONDS)
+        chunks = workload.chunks(5)
+        assert allocated(parser, warm_up, chunks) == 0, options
+        if tracemalloc is not None:
+            assert peak(NmeaParser(fixed_buffer=True), warm_up, chunks) < PEAK_LIMIT, options
+
+
+def test_same_results_as_fixed_point_feed():
+    for options in WORKLOADS:
+        chunks = Workload(**options).chunks(10)
+        fixed_buffer = NmeaParser(fixed_buffer=True)
+        fixed_point = NmeaParser(fixed_point=True)
+        feed_all(fixed_buffer, chunks)
+        feed_all(fixed_point, chunks)
+        assert fixed_buffer.fixed_point
+        assert snapshot(fixed_buffer) == snapshot(fixed_point), options
+        assert sorted(fixed_buffer.stats()) == sorted(fixed_point.stats())
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(name, 'passed')
@@ -0,0 +1,60 @@
+"""
+Tests of framing: crc_xor_folded() and the crc_xor() and find_start() in use (viper on MicroPython) agree with the
+pure Python reference versions at every length and offset, for bytes, bytearray and memoryview.
+Run from the repository root: python3 -m pytest tests
+or on the MicroPython unix port: micropython tests/test_framing.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+from mgps.framing import crc_xor, crc_xor_python, find_start, find_start_python
+from workload import Random
+
+CHECKSUMS = [crc_xor]
+if sys.implementation.name != 'micropython':
+    from mgps.framing import crc_xor_folded
+    CHECKSUMS.append(crc_xor_folded)
+
+
+def random_bytes(random, length, alphabet=None):
+    if alphabet is None:
+        return bytes(random.below(256) for _ in range(length))
+    return bytes(alphabet[random.below(len(alphabet))] for _ in range(length))
+
+
+def test_checksum_parity():
+    random = Random(7)
+    # Across the fixed fold at 128 bytes and the power of two steps of longer buffers
+    for length in list(range(0, 140)) + [255, 256, 257, 511, 1024]:
+        data = random_bytes(random, length)
+        for start, end in ((0, length), (length // 3, length), (0, length - length // 4), (length // 2, length // 2)):
+            expected = crc_xor_python(data, start, end)
+            for function in CHECKSUMS:
+                assert function(data, start, end) == expected, (function, length, start, end)
+                assert function(bytearray(data), start, end) == expected, (function, length, start, end)
+
+
+def test_find_start_parity():
+    random = Random(11)
+    for length in range(0, 100):
+        data = random_bytes(random, length, b'$GP,*\r\n0123')
+        for start in range(0, length + 1, 7):
+            for end in (length, length - length // 3):
+                if start > end:
+                    continue
+                expected = find_start_python(memoryview(data), start, end)
+                assert find_start(data, start, end) == expected, (data, start, end)
+                assert find_start(bytearray(data), start, end) == expected, (data, start, end)
+                assert find_start(memoryview(data), start, end) == expected, (data, start, end)
+                assert start <= expected <= end
+                assert expected == end or data[expected] == 36
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(name, 'passed')
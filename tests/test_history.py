@@ -0,0 +1,65 @@
+"""
+Tests of FixHistory: rolling mean/min/max kept by append() match those computed from the fixes in the buffer, for
+random, monotonic and partly invalid series.
+Run from the repository root: python3 -m pytest tests
+or on the MicroPython unix port: micropython tests/test_history.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+from mgps.history import FixHistory, ALTITUDE, SPEED, HDOP
+from workload import Random
+
+CAPACITY = 16
+
+
+def check(history, fixes):
+    window = [fix for fix in fixes[-CAPACITY:] if fix[3]]
+    for column, position in ((ALTITUDE, 0), (SPEED, 1), (HDOP, 2)):
+        values = [fix[position] for fix in window]
+        if not values:
+            assert history.minimum(column) is None and history.maximum(column) is None
+            assert history.mean(column) is None
+            continue
+        assert history.minimum(column) == min(values), column
+        assert history.maximum(column) == max(values), column
+        assert history.mean(column) == sum(values) / len(values), column
+
+
+def run(series):
+    history = FixHistory(CAPACITY)
+    fixes = []
+    for fix in series:
+        altitude, speed, hdop, valid = fix
+        history.append(len(fixes) * 1000, 0, 0, altitude, speed, hdop, valid)
+        fixes.append(fix)
+        check(history, fixes)
+    return history
+
+
+def test_random_series():
+    random = Random(7)
+    run([(random.below(50) - 25, random.below(8), random.below(4), random.below(5) != 0) for _ in range(500)])
+
+
+def test_monotonic_series():
+    run([(step * 10, 1000 - step, 90, True) for step in range(200)])
+    run([(-step * 10, step, step % 3, True) for step in range(200)])
+
+
+def test_clear():
+    history = run([(step, step, step, True) for step in range(40)])
+    history.clear()
+    check(history, [])
+    history.append(0, 0, 0, 5, 6, 7)
+    check(history, [(5, 6, 7, True)])
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(name, 'passed')
@@ -0,0 +1,79 @@
+"""
+Tests of the asyncio Pipeline: the framer yields to the scheduler between sentences, and next() polls the receiver
+only while a sentence is wanted.
+Run from the repository root: python3 -m pytest tests
+or on the MicroPython unix port: micropython tests/test_pipeline.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+import asyncio
+
+from mgps.nmea_parser import NmeaParser
+from mgps.pipeline import Pipeline
+from workload import Workload
+
+
+class Receiver(object):
+    """Read source replaying workload chunks, counting the reads"""
+
+    def __init__(self, seconds):
+        self.chunks = Workload().chunks(seconds)
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        return self.chunks.pop(0) if self.chunks else b''
+
+
+def test_framer_yields_between_sentences():
+    receiver = Receiver(1)
+    parser = NmeaParser()
+    pipeline = Pipeline(receiver.read, parser, idle_ms=0)
+    ticks = []
+
+    async def ticker():
+        while pipeline.source.running or not ticks:
+            ticks.append(parser.parsed_sentences)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        await pipeline.run()
+        await task
+
+    asyncio.run(main())
+    # The other task ran after each sentence, not just after each chunk
+    assert parser.parsed_sentences > receiver.reads
+    assert sorted(set(ticks)) == list(range(1, parser.parsed_sentences + 1))
+
+
+def test_next_stops_polling():
+    receiver = Receiver(10)
+    parser = NmeaParser()
+    pipeline = Pipeline(receiver.read, parser, idle_ms=1)
+    rmc = pipeline.subscribe({'RMC'}, capacity=1)
+
+    async def main():
+        for _ in range(3):
+            sentence_type, segments = await pipeline.next(rmc)
+            assert sentence_type == 'RMC' and segments[0] == 'GPRMC'
+        await asyncio.sleep(0.05)
+        assert pipeline.task.done() and not pipeline.source.running
+        reads = receiver.reads
+        await asyncio.sleep(0.05)
+        assert receiver.reads == reads
+        await pipeline.next(rmc)
+        assert reads < receiver.reads <= reads + 2
+
+    asyncio.run(main())
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(name, 'passed')
@@ -0,0 +1,68 @@
+"""
+Tests of the count of sentences lost to chunking: a tail whose start was never read, a start whose tail never came
+and a start that overflowed are counted alike by reassembly.Reassembler, NmeaParser.feed() in both modes and the
+pipeline Framer.
+Run from the repository root: python3 -m pytest tests
+or on the MicroPython unix port: micropython tests/test_reassembly.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+from mgps.nmea_parser import NmeaParser
+from mgps.pipeline import Framer
+from mgps.reassembly import Reassembler
+from workload import Workload, framed
+
+RMC = framed('GPRMC,081836.000,A,3751.6500,S,14507.3600,E,000.0,360.0,130998,011.3,E').encode()
+
+
+def lost_counts(chunks):
+    """Lost sentences counted by a Reassembler, feed(), fixed buffer feed() and a Framer fed the same chunks"""
+    reassembler = Reassembler()
+    parser = NmeaParser()
+    buffer_parser = NmeaParser(fixed_buffer=True)
+    framer_parser = NmeaParser()
+    framer = Framer(framer_parser)
+    for chunk in chunks:
+        reassembler.push(chunk)
+        parser.feed(chunk)
+        buffer_parser.feed(chunk)
+        framer.push(chunk)
+    assert framer.lost == framer_parser.lost_sentences
+    return reassembler.lost, parser.lost_sentences, buffer_parser.lost_sentences, framer.lost
+
+
+def test_split_sentence_not_lost():
+    assert lost_counts([RMC[:20], RMC[20:] + RMC[:40], b'\n' * 10, RMC[40:]]) == (0, 0, 0, 0)
+
+
+def test_tail_without_start():
+    # The read with the start of the first sentence was missed
+    assert lost_counts([RMC[30:], RMC]) == (1, 1, 1, 1)
+    assert lost_counts([b'\r\n' + b'\n' * 20, RMC]) == (0, 0, 0, 0)
+
+
+def test_start_without_tail():
+    # A new sentence starts before the rest of the carried over one arrived
+    assert lost_counts([RMC[:30], RMC]) == (1, 1, 1, 1)
+    assert lost_counts([RMC + RMC[:30], RMC[:40] + b'\n' * 20, RMC]) == (2, 2, 2, 2)
+
+
+def test_overflow():
+    assert lost_counts([b'$GPRMC,' + b'1' * 60, b'1' * 60, RMC]) == (1, 1, 1, 1)
+
+
+def test_workload_with_truncated_sentences():
+    workload = Workload(truncation=0.1)
+    counts = lost_counts(workload.chunks(20, size=64))
+    assert 0 < counts[0] <= workload.truncated and counts == (counts[0],) * 4, (counts, workload.truncated)
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(name, 'passed')
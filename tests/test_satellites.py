@@ -0,0 +1,54 @@
+"""
+Tests of the SatelliteTable filled from GSV sentences: PRNs past 255, as Galileo (301-336) and BeiDou (401-437) use
+them, are stored and read back for feed() and fixed buffer mode alike.
+Run from the repository root: python3 -m pytest tests
+or on the MicroPython unix port: micropython tests/test_satellites.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+from mgps.nmea_parser import NmeaParser
+from mgps.satellites import GPS, GALILEO, BEIDOU
+from workload import Workload, framed
+
+SENTENCES = (
+    'GAGSV,1,1,02,301,45,120,38,336,12,300,',
+    'GBGSV,1,1,02,401,60,045,41,437,,,',
+)
+
+
+def test_galileo_and_beidou_prns():
+    data = ''.join(framed(body) for body in SENTENCES).encode()
+    for parser in (NmeaParser(), NmeaParser(fixed_buffer=True)):
+        parser.feed(data)
+        table = parser.satellite_table
+        assert table.get(GALILEO, 301) == (45, 120, 38)
+        assert table.get(GALILEO, 336) == (12, 300, None)
+        assert table.get(BEIDOU, 401) == (60, 45, 41)
+        assert table.get(BEIDOU, 437) == (None, None, None)
+        assert table.count(GALILEO) == 2 and table.count(BEIDOU) == 2
+        assert sorted(prn for _, prn, _, _, _ in table.satellites(BEIDOU)) == [401, 437]
+        assert table.get(GPS, 301 & 0xFF) is None
+
+
+def test_workload_constellations():
+    workload = Workload(talkers=('GP', 'GA', 'GB'))
+    parser = NmeaParser()
+    for chunk in workload.chunks(2):
+        parser.feed(chunk)
+    table = parser.satellite_table
+    for constellation, talker in ((GPS, 'GP'), (GALILEO, 'GA'), (BEIDOU, 'GB')):
+        sky = workload.sky[talker]
+        assert table.count(constellation) == len(sky), talker
+        for prn, elevation, azimuth in sky:
+            assert table.get(constellation, prn)[:2] == (elevation, azimuth), (talker, prn)
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(name, 'passed')
@@ -0,0 +1,51 @@
+"""
+Tests of TimeSync: the time a sentence was sent is worked out from its length in the chunk the same way whether
+the parser decodes it from strings or, in fixed buffer mode, from its SentenceBuffer.
+Run from the repository root: python3 -m pytest tests
+or on the MicroPython unix port: micropython tests/test_time_sync.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+sys.path.insert(0, 'benchmarks')
+
+from mgps.nmea_parser import NmeaParser
+from mgps.time_sync import TimeSync
+from workload import framed
+
+RMC = framed('GPRMC,081836.000,A,3751.6500,S,14507.3600,E,000.0,360.0,130998,011.3,E')
+GGA = framed('GPGGA,081836.000,3751.6500,S,14507.3600,E,1,08,0.9,545.4,M,46.9,M,,')
+READ_TICKS = 100000
+
+
+def synced(parser):
+    sync = TimeSync(parser)
+    # A single read that ended with the receiver drained: the last byte went out as the read started
+    sync.feed((RMC + GGA).encode(), READ_TICKS)
+    return sync
+
+
+def test_sentence_length_in_every_mode():
+    # RMC from '$' to the CRC digits, then the rest of the chunk up to the final LF
+    sent_ms = (len(RMC) - 2 + len(GGA) - 1) * synced(NmeaParser()).byte_us // 1000
+    for parser in (NmeaParser(), NmeaParser(fixed_point=True), NmeaParser(fixed_buffer=True)):
+        sync = synced(parser)
+        assert parser.sentence_length == len(GGA) - 2
+        assert sync.updates == 1
+        assert sync.reference_ticks == READ_TICKS - sent_ms, parser.fixed_point
+        assert (sync.reference_seconds, sync.reference_ms) == (parser.epoch_seconds, 0)
+
+
+def test_update_sentence_length():
+    parser = NmeaParser()
+    for character in RMC:
+        parser.update(character)
+    assert parser.sentence_length == len(RMC) - 2
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(name, 'passed')